@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from littledarwin.JavaParse import JavaParse
+
+
+def findJavaFiles(paths):
+    """
+    Lists the Java files under the given files and directories.
+
+    :param paths:
+    :type paths: list
+    :return:
+    :rtype: list
+    """
+    javaFiles = list()
+    for path in paths:
+        if os.path.isfile(path):
+            javaFiles.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for fileName in sorted(files):
+                if fileName.endswith(".java"):
+                    javaFiles.append(os.path.join(root, fileName))
+    return javaFiles
+
+
+def parseAll(sources, twoStage):
+    """
+    Parses each source file once.
+
+    :param sources: the contents of the files
+    :type sources: list
+    :param twoStage: whether to try SLL prediction first
+    :type twoStage: bool
+    :return: the time it took, the binary trees, and the number of files that needed the LL stage
+    :rtype: tuple
+    """
+    javaParse = JavaParse()
+    trees = list()
+    startTime = time.perf_counter()
+    for sourceCode in sources:
+        try:
+            tree = javaParse.parse(sourceCode, twoStage=twoStage)
+        except Exception:
+            tree = None
+        trees.append(tree)
+    elapsed = time.perf_counter() - startTime
+    return elapsed, [None if tree is None else javaParse.tree2Binary(tree) for tree in trees], javaParse.sllFailures
+
+
+def main(args):
+    optionParser = OptionParser(
+        usage="%prog [options] PATH...",
+        description="Compares the time JavaParse.parse takes with full LL prediction and with SLL prediction first, "
+        "on the Java files under the given paths, and checks that both give the same trees.",
+    )
+    optionParser.add_option(
+        "-r", "--rounds", type="int", action="store", dest="rounds", default=3,
+        help="Number of times each mode parses the files. The best time is reported. Default is 3.",
+    )
+    optionParser.add_option(
+        "--warm", action="store_true", dest="warm", default=False,
+        help="Parse the files once before timing, so that the prediction cache of ANTLR is filled.",
+    )
+    (options, paths) = optionParser.parse_args(args[1:])
+
+    if len(paths) == 0 or options.rounds < 1:
+        optionParser.print_help()
+        return 1
+
+    javaFiles = findJavaFiles(paths)
+    sources = list()
+    for javaFile in javaFiles:
+        with open(javaFile, encoding="utf-8", errors="surrogateescape") as sourceFile:
+            sources.append(sourceFile.read())
+    print("Files:", len(sources), "Size:", sum(len(sourceCode) for sourceCode in sources), "characters")
+
+    if options.warm:
+        parseAll(sources, twoStage=False)
+
+    # the modes take turns, so that neither one gets all of the cache the other filled.
+    times = {False: list(), True: list()}
+    trees = dict()
+    sllFailures = 0
+    for round in range(options.rounds):
+        for twoStage in (False, True) if round % 2 == 0 else (True, False):
+            elapsed, trees[twoStage], failures = parseAll(sources, twoStage)
+            times[twoStage].append(elapsed)
+            if twoStage:
+                sllFailures = failures
+
+    mismatches = [javaFile for javaFile, ll, twoStage in zip(javaFiles, trees[False], trees[True]) if ll != twoStage]
+    for javaFile in mismatches:
+        print("Different trees:", javaFile)
+
+    llTime = min(times[False])
+    twoStageTime = min(times[True])
+    print("LL:        {:.3f}s".format(llTime))
+    print("SLL, LL:   {:.3f}s ({} files needed the LL stage)".format(twoStageTime, sllFailures))
+    print("Speedup:   {:.2f}x".format(llTime / twoStageTime if twoStageTime > 0 else 0))
+    return 1 if len(mismatches) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,392 @@
+import os
+import shutil
+import time
+
+from littledarwin.IncrementalBuild import IncrementalBuild
+from littledarwin.SharedFunctions import early_kill_patterns, getCommand, timeoutAlternative
+from littledarwin.TestRunnerDaemon import TestRunnerDaemon, TestRunnerError
+
+
+class BuildBackend:
+    """
+    Builds and tests a single mutant inside a workspace. The build phase picks one backend for the whole run:
+
+    - "build": runs the build (and test) commands of the project's build system for every mutant.
+    - "incremental": compiles only the mutated class with javac and runs the tests with JUnitCore.
+    - "direct": compiles only the mutated class with javac and runs the covered test methods with the JUnit
+      console launcher.
+
+    build() and test() return the same (isKilled, returncode, output, timeDelta) tuple as timeoutAlternative.
+    """
+
+    name = None
+
+    def __init__(self, options, resultsPath):
+        """
+
+        :param options: the parsed command line options
+        :type options:
+        :param resultsPath: the LittleDarwinResults directory
+        :type resultsPath: str
+        """
+        self.options = options
+        self.resultsPath = os.path.abspath(resultsPath)
+        # steps that run tests stop as soon as their output shows a failing test.
+        self.killPatterns = None
+        if options.isEarlyKillActive == True:
+            self.killPatterns = early_kill_patterns(options.fail_string, options.killPatterns)
+
+    @staticmethod
+    def create(options, resultsPath):
+        """
+        Returns the backend selected with --backend.
+
+        :param options:
+        :type options:
+        :param resultsPath:
+        :type resultsPath: str
+        :return:
+        :rtype: BuildBackend
+        """
+        for backend in (BuildSystemBackend, IncrementalBackend, DirectBackend):
+            if backend.name == options.backend:
+                return backend(options, resultsPath)
+        raise ValueError("Unknown backend: " + str(options.backend))
+
+    @property
+    def buildsUncoveredMutants(self):
+        """
+        :return: True if uncovered mutants are still built (so that a build failure can kill them)
+        :rtype: bool
+        """
+        return False
+
+    def prepare(self, buildDir):
+        """
+        Called once after the initial build.
+
+        :param buildDir:
+        :type buildDir: str
+        :return: False if the backend cannot be used
+        :rtype: bool
+        """
+        return True
+
+    def setUpWorkspace(self, workspace):
+        """
+        Called once for every workspace before any mutant is evaluated in it.
+
+        :param workspace:
+        :type workspace: Workspace
+        """
+        pass
+
+    def tearDownWorkspace(self, workspace):
+        """
+        Called once for every workspace after all mutants are evaluated.
+
+        :param workspace:
+        :type workspace: Workspace
+        """
+        pass
+
+    def build(self, workspace, targetFile, replacementFile, test_names, result):
+        """
+        Builds the mutant that was copied to targetFile.
+
+        :param workspace:
+        :type workspace: Workspace
+        :param targetFile: the mutated source file inside the workspace
+        :type targetFile: str
+        :param replacementFile: the mutant file in the results directory
+        :type replacementFile: str
+        :param test_names: the tests selected by coverage, or None without coverage
+        :type test_names: list
+        :param result: the verdict of the mutant, the backend adds the time it spends on preparation to it. Steps
+            that run only the tests, without the build system, use its "timeout".
+        :type result: dict
+        :return:
+        :rtype: tuple
+        """
+        raise NotImplementedError
+
+    def test(self, workspace, targetFile, replacementFile, test_names, result):
+        """
+        Runs the tests on a mutant that was built successfully.
+
+        :return: None if the build step already ran the tests
+        :rtype: tuple
+        """
+        raise NotImplementedError
+
+    def saveArtifacts(self, workspace, replacementFile):
+        """
+        Copies backend specific files that describe the run next to the mutant.
+
+        :param workspace:
+        :type workspace: Workspace
+        :param replacementFile:
+        :type replacementFile: str
+        """
+        pass
+
+
+class BuildSystemBackend(BuildBackend):
+    """
+    Runs the project's own build system for every mutant. With coverage, the covered tests are written into the
+    build file of the workspace before each run.
+    """
+
+    name = "build"
+
+    @property
+    def separateTestSuite(self):
+        return self.options.testCommand != "***dummy***"
+
+    @property
+    def isMaven(self):
+        return getCommand(self.options.buildCommand)[0].endswith("mvn")
+
+    @property
+    def buildsUncoveredMutants(self):
+        return self.separateTestSuite
+
+    def prepareBuildFile(self, workspace, replacementFile, test_names, result):
+        """
+        Writes the selected tests into the build file of the workspace.
+        """
+        line_coverage = workspace.lineCoverage
+        s_time = time.time()
+        if self.isMaven:
+            line_coverage.add_tests_to_pom_xml(
+                include_tests_file=line_coverage.include_file_add,
+                report_path=replacementFile + "-test_reports",
+                covered_tests=test_names,
+                subsumption=self.options.isSubsumptionActive,
+            )
+        elif getCommand(self.options.buildCommand)[0].endswith("ant"):
+            line_coverage.add_tests_to_build_xml(
+                junit_target=self.options.junitTargetName,
+                report_path=replacementFile + "-test_reports",
+                covered_tests=test_names,
+                subsumption=self.options.isSubsumptionActive,
+                fail_fast=self.options.isFailFastActive,
+            )
+        # TODO to be implemented for gradle
+        # elif(options.buildCommand.split(",")[0] == "gradle"):
+        #     line_coverage.add_tests_to_gradle(
+        #         build_gradle_file=os.path.join(options.buildPath, "build.gradle"),
+        #         junit_target=options.junitTargetName,
+        #         covered_tests=test_names,
+        #     )
+        result["prepareBuildTime"] += time.time() - s_time
+
+    def mavenOptions(self):
+        """
+        :return: the extra arguments passed to maven when the tests are run
+        :rtype: list
+        """
+        mavenOptions = list()
+        if self.options.isCoverageActive == True:
+            mavenOptions.append("-DfailIfNoTests=false")
+        if self.options.isFailFastActive == True:
+            mavenOptions.append("-Dsurefire.skipAfterFailureCount=1")
+        return mavenOptions
+
+    def build(self, workspace, targetFile, replacementFile, test_names, result):
+        commandString = workspace.mapCommand(getCommand(self.options.buildCommand))
+        if not self.separateTestSuite:
+            if self.isMaven:
+                commandString += self.mavenOptions()
+            if self.options.isCoverageActive == True:
+                self.prepareBuildFile(workspace, replacementFile, test_names, result)
+        return timeoutAlternative(
+            commandString,
+            workingDirectory=workspace.buildDir,
+            # the build system starts and compiles in the same command, so the adaptive timeout is not used.
+            timeout=int(self.options.timeout),
+            failMessage=self.options.fail_string,
+            killPatterns=None if self.separateTestSuite else self.killPatterns,
+        )
+
+    def test(self, workspace, targetFile, replacementFile, test_names, result):
+        if not self.separateTestSuite:
+            return None
+        testCommandString = workspace.mapCommand(getCommand(self.options.testCommand))
+        testWorkingDirectory = workspace.testDir
+        if self.isMaven:
+            testCommandString += self.mavenOptions()
+        if self.options.isCoverageActive == True:
+            testWorkingDirectory = workspace.buildDir
+            self.prepareBuildFile(workspace, replacementFile, test_names, result)
+        testResult = timeoutAlternative(
+            testCommandString,
+            workingDirectory=testWorkingDirectory,
+            timeout=int(self.options.timeout),
+            failMessage=self.options.fail_string,
+            killPatterns=self.killPatterns,
+        )
+        if self.options.isCoverageActive == True:
+            shutil.copy2(
+                workspace.lineCoverage.include_file_add,
+                os.path.splitext(replacementFile)[0] + ".include",
+            )
+        return testResult
+
+    def saveArtifacts(self, workspace, replacementFile):
+        if self.options.isCoverageActive == True:
+            shutil.copyfile(
+                workspace.lineCoverage.build_file_path,
+                os.path.splitext(replacementFile)[0] + ".xml",
+            )
+
+
+class IncrementalBackend(BuildBackend):
+    """
+    Compiles only the mutated compilation unit into an overlay directory and runs the tests with JUnitCore (or
+    with a warm test runner per workspace, see TestRunnerDaemon).
+    """
+
+    name = "incremental"
+
+    def __init__(self, options, resultsPath):
+        super().__init__(options, resultsPath)
+        self.incrementalBuild = None
+
+    def prepare(self, buildDir):
+        self.incrementalBuild = IncrementalBuild(
+            buildDir, self.resultsPath, timeout=int(self.options.initial_timeout)
+        )
+        if not self.incrementalBuild.prepare():
+            return False
+        if self.options.isTestDaemonActive == True:
+            return TestRunnerDaemon.compile_runner(
+                self.incrementalBuild,
+                os.path.join(self.resultsPath, "testrunner"),
+                timeout=int(self.options.initial_timeout),
+            )
+        return True
+
+    def overlayPath(self, workspace):
+        """
+        :return: the directory the mutated classes of this workspace are compiled into
+        :rtype: str
+        """
+        return os.path.join(self.resultsPath, "overlay", workspace.name)
+
+    def setUpWorkspace(self, workspace):
+        if self.options.isTestDaemonActive == True:
+            # the runner is started when the first mutant needs it.
+            workspace.testRunner = TestRunnerDaemon(
+                self.incrementalBuild,
+                os.path.join(self.resultsPath, "testrunner"),
+                workspace.buildDir,
+                startup_timeout=int(self.options.initial_timeout),
+            )
+
+    def tearDownWorkspace(self, workspace):
+        if workspace.testRunner is not None:
+            workspace.testRunner.stop()
+            workspace.testRunner = None
+
+    def build(self, workspace, targetFile, replacementFile, test_names, result):
+        IncrementalBuild.reset_overlay(self.overlayPath(workspace))
+        return timeoutAlternative(
+            self.incrementalBuild.compile_command(targetFile, self.overlayPath(workspace)),
+            workingDirectory=workspace.buildDir,
+            timeout=int(self.options.timeout),
+            failMessage=self.options.fail_string,
+        )
+
+    def test(self, workspace, targetFile, replacementFile, test_names, result):
+        if workspace.testRunner is not None:
+            # a runner that failed is started again once. if it fails again, the workspace runs its tests without
+            # it from then on. a failing runner never decides the verdict of a mutant.
+            for attempt in range(2):
+                try:
+                    return workspace.testRunner.run(
+                        self.overlayPath(workspace),
+                        self.incrementalBuild.select_test_classes(test_names),
+                        timeout=result["timeout"],
+                        failMessage=self.options.fail_string,
+                        failFast=self.options.isFailFastActive,
+                    )
+                except TestRunnerError as e:
+                    error = e
+            print(
+                "The test runner of " + workspace.name + " failed (" + str(error).splitlines()[0]
+                + "), the tests run without it from now on."
+            )
+            self.tearDownWorkspace(workspace)
+        return timeoutAlternative(
+            self.testCommand(workspace, test_names),
+            workingDirectory=workspace.buildDir,
+            timeout=result["timeout"],
+            failMessage=self.options.fail_string,
+            killPatterns=self.killPatterns,
+        )
+
+    def testCommand(self, workspace, test_names):
+        """
+        :return: the command that runs the selected tests against the overlay of the workspace
+        :rtype: list
+        """
+        return self.incrementalBuild.test_command(self.overlayPath(workspace), test_names)
+
+
+class DirectBackend(IncrementalBackend):
+    """
+    Like the incremental backend, but runs the tests with the JUnit console launcher. The launcher can select
+    single test methods, so only the methods that cover the mutant are run.
+    """
+
+    name = "direct"
+    LAUNCHER_JAR_PREFIX = "junit-platform-console-standalone"
+
+    def __init__(self, options, resultsPath):
+        super().__init__(options, resultsPath)
+        self.launcherPath = None
+
+    def prepare(self, buildDir):
+        if not super().prepare(buildDir):
+            return False
+        if self.options.junitLauncherPath != "***dummy***":
+            self.launcherPath = os.path.abspath(self.options.junitLauncherPath)
+        else:
+            for dependency in self.incrementalBuild.dependencies:
+                if os.path.basename(dependency).startswith(self.LAUNCHER_JAR_PREFIX):
+                    self.launcherPath = dependency
+                    break
+        if self.launcherPath is None or not os.path.isfile(self.launcherPath):
+            print(
+                "Cannot find the JUnit console launcher. Add "
+                + self.LAUNCHER_JAR_PREFIX
+                + " to the test dependencies or pass its path with --junit-launcher."
+            )
+            return False
+        return True
+
+    def testCommand(self, workspace, test_names):
+        command = [
+            IncrementalBuild.java_tool("java"),
+            "-jar",
+            self.launcherPath,
+            "--disable-banner",
+            "--details=summary",
+            "--class-path",
+            self.incrementalBuild.classpath(self.overlayPath(workspace)),
+        ]
+        if IncrementalBuild.selects_all_tests(test_names):
+            return command + ["--scan-class-path", self.incrementalBuild.test_classes_path]
+        # the launcher runs the selectors in the given order, so a prioritized order is kept.
+        for test_name in dict.fromkeys(test_name[0] for test_name in test_names):
+            if test_name == IncrementalBuild.NOT_COVERED_MARKER:
+                continue
+            className, _, methodName = test_name.replace("/", ".").partition("#")
+            # parameterized and repeated tests are reported as "method[1]" or "method(int)".
+            methodName = methodName.split("[")[0].split("(")[0]
+            if methodName == "":
+                command += ["--select-class", className]
+            else:
+                command += ["--select-method", className + "#" + methodName]
+        return command
@@ -0,0 +1,85 @@
+class CoverageIndex:
+    """
+    The coverage of the project, read from the test_coverage table once. Every test gets a bit, and each line of a
+    file maps to the bitset of the tests covering it, so the tests of a mutant are found with a few ORs. The rows of
+    the sentinel tests ("-", "?" and "*") become flags of the line instead of bits.
+
+    The index is not changed after it is built, so parallel workers can share it.
+    """
+
+    # none of the lines has coverage information.
+    NOT_INSTRUMENTED = 1
+    # "-": the line is instrumented, but no test covers it.
+    NOT_COVERED = 2
+    # "?": the line is covered, but the test is not known.
+    NO_TEST = 4
+    # "*": there is no information about the tests of the line.
+    NO_INFO = 8
+
+    SENTINEL_FLAGS = {"-": NOT_COVERED, "?": NO_TEST, "*": NO_INFO}
+
+    def __init__(self, database):
+        """
+
+        :param database:
+        :type database: Database
+        """
+        self.testNames = list()
+        self.lines = dict()
+        testBits = dict()
+        for fileName, lineNo, testID, qualifiedName in database.fetch_coverage_index():
+            lineEntry = self.lines.setdefault(fileName, dict()).setdefault(int(lineNo), [0, 0])
+            if qualifiedName in self.SENTINEL_FLAGS:
+                lineEntry[1] |= self.SENTINEL_FLAGS[qualifiedName]
+                continue
+            if testID not in testBits:
+                testBits[testID] = len(self.testNames)
+                self.testNames.append(qualifiedName)
+            lineEntry[0] |= 1 << testBits[testID]
+        self.allTestNames = database.fetch_all_coverage()
+
+    def lookup(self, fileName, lines):
+        """
+        :param fileName: the mutated source file
+        :type fileName: str
+        :param lines: comma separated line numbers
+        :type lines: str
+        :return: the bitset of the tests covering any of the lines, and the flags of the lines
+        :rtype: tuple
+        """
+        bits = 0
+        flags = 0
+        found = False
+        fileLines = self.lines.get(fileName, dict())
+        for line in str(lines).split(","):
+            if line.strip() == "":
+                continue
+            lineEntry = fileLines.get(int(line))
+            if lineEntry is not None:
+                found = True
+                bits |= lineEntry[0]
+                flags |= lineEntry[1]
+        if not found:
+            flags |= self.NOT_INSTRUMENTED
+        return bits, flags
+
+    def tests(self, bits, flags=0):
+        """
+        :param bits: a bitset returned by lookup
+        :type bits: int
+        :param flags: the flags returned by lookup. "?" and "*" are added to the result for the flags they stand for,
+            the way the build files expect them.
+        :type flags: int
+        :return: the tests as tuples of their qualified names, like Database.fetch_coverage returns them
+        :rtype: list
+        """
+        tests = list()
+        while bits:
+            lowestBit = bits & -bits
+            tests.append((self.testNames[lowestBit.bit_length() - 1],))
+            bits ^= lowestBit
+        if flags & self.NO_TEST:
+            tests.append(("?",))
+        if flags & self.NO_INFO:
+            tests.append(("*",))
+        return tests
@@ -1,5 +1,4 @@
 import sqlite3
-import dill
 from littledarwin.SharedFunctions import getAllInstantiableSubclasses
 from littledarwin.SharedFunctions import MutationOperator
 
@@ -16,6 +15,17 @@ class Database:
     RES_ID_SURVIVED_MUTANT = 1
     RES_ID_UNCOVERED = -2
 
+    # version of the indexes and other additions to the tables, kept in PRAGMA user_version.
+    SCHEMA_VERSION = 1
+    INDEXES = (
+        ("mutation_file_id", "mutation", "file_id"),
+        ("mutant_mutation_id", "mutant", "mutation_id"),
+        ("mutant_id", "mutant", "id"),
+        ("test_coverage_file_line", "test_coverage", "file_id, line_no"),
+        ("mutant_test_mutant_id", "mutant_test", "mutant_id"),
+        ("file_name", "file", "name"),
+    )
+
     def insert_file(self, file_name):
         return self.insert_data("file", "name", [file_name])
 
@@ -29,13 +39,13 @@ class Database:
         lineNo,
         replacementText,
         mutation_operator_id,
-        node_json=[],
+        node_json=None,
         new_node_id=[],
         new_node_type=[],
         is_compile_time=0,
         object_=None
     ):
-        return self.insert_data(
+        return self.insert_or_queue(
             "mutation",
             "id, file_id, node_id, startPos, endPos, lineNo, replacementText, mutation_operator_id, new_node_json, new_node_id, new_node_type, compile_time, object",
             [
@@ -47,7 +57,7 @@ class Database:
                 lineNo,
                 replacementText,
                 mutation_operator_id,
-                repr(node_json),
+                node_json,
                 repr(new_node_id),
                 repr(new_node_type),
                 str(is_compile_time),
@@ -56,19 +66,85 @@ class Database:
         )
 
     def insert_mutant(self, mutant_id, mutation_id):
-        return self.insert_data("mutant", "id, mutation_id", [mutant_id, mutation_id])
+        return self.insert_or_queue("mutant", "id, mutation_id", [mutant_id, mutation_id])
 
     def __init__(self, db_name):
         self.conn = sqlite3.connect(db_name)
         self.cursor = self.conn.cursor()
+        # with a write-ahead log, a commit does not have to sync the database file itself.
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.in_transaction = False
+        # rows of the mutation and mutant tables written inside a transaction: table -> (columns, rows)
+        self.queued_rows = dict()
+        self.operator_ids = None
+        self.upgrade_schema()
+
+    def upgrade_schema(self):
+        """
+        Adds the indexes to a database written by an older version. Nothing is done for a database whose tables are
+        not created yet, create_tables calls this again.
+        """
+        self.cursor.execute("PRAGMA user_version")
+        if self.cursor.fetchone()[0] >= self.SCHEMA_VERSION:
+            return
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {row[0] for row in self.cursor.fetchall()}
+        if not all(table_name in tables for _, table_name, _ in self.INDEXES):
+            return
+        for index_name, table_name, columns in self.INDEXES:
+            self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{index_name} ON {table_name} ({columns})")
+        self.cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def begin_transaction(self):
+        """
+        Until commit_transaction, rows are not committed one by one, and mutation and mutant rows are queued and
+        written with executemany.
+        """
+        self.in_transaction = True
+
+    def commit_transaction(self):
+        self.flush()
+        self.in_transaction = False
+        self.conn.commit()
+
+    def flush(self):
+        """
+        Writes the queued rows, without committing them.
+        """
+        for table_name, (columns, rows) in self.queued_rows.items():
+            value_holder = ",".join(["?"] * len(rows[0]))
+            self.cursor.executemany(
+                f"INSERT INTO {table_name} ({columns}) VALUES({value_holder})", rows
+            )
+        self.queued_rows = dict()
+
+    def insert_or_queue(self, table_name, columns, values):
+        if not self.in_transaction:
+            return self.insert_data(table_name, columns, values)
+        self.queued_rows.setdefault(table_name, (columns, list()))[1].append(tuple(values))
+        return values[0]
+
+    def fetch_operator_id(self, operator_name):
+        """
+        :return: the id of a mutation operator, from a map that is read from the database once
+        :rtype: int
+        """
+        if self.operator_ids is None:
+            self.cursor.execute("SELECT name, MIN(id) FROM mutation_operator GROUP BY name")
+            self.operator_ids = dict(self.cursor.fetchall())
+        return self.operator_ids[operator_name]
 
     def create_tables(self):
+        self.begin_transaction()
         self.create_table("mutation_operator",
                           "id INTEGER PRIMARY KEY, name TEXT")
         # self.create_trigger_for_mutantion_operator()
         subclasses = getAllInstantiableSubclasses(MutationOperator)
         for subclass in subclasses:
             self.insert_data("mutation_operator", "name", [subclass.__name__])
+        self.operator_ids = None
 
         self.create_table(
             "mutant",
@@ -101,6 +177,16 @@ class Database:
             "mutant_test",
             "mutant_id INTEGER, test_id INTEGER, result INTEGER, time TEXT,message TEXT",
         )
+        self.create_table(
+            "test_time",
+            "qualified_name TEXT PRIMARY KEY, time REAL",
+        )
+        self.create_table(
+            "mutant_result",
+            "mutant_id INTEGER PRIMARY KEY, status TEXT, tests_run INTEGER, compile_time REAL, prepare_build_time REAL",
+        )
+        self.commit_transaction()
+        self.upgrade_schema()
 
     def create_table(self, table_name, columns):
         query = f"CREATE TABLE IF NOT EXISTS {table_name} ({columns})"
@@ -111,7 +197,8 @@ class Database:
         query = f"INSERT INTO {table_name} ({columns}) VALUES({value_holder})"
         try:
             self.cursor.execute(query, (values))
-            self.conn.commit()
+            if not self.in_transaction:
+                self.conn.commit()
         except Exception as e:
             print(str(e) + " in " + query)
             return False
@@ -127,7 +214,8 @@ class Database:
         query = f"INSERT INTO {table_name} ({columns}) VALUES({value_holder})"
         try:
             self.cursor.executemany(query, values)
-            self.conn.commit()
+            if not self.in_transaction:
+                self.conn.commit()
         except Exception as e:
             print(e)
             return False
@@ -141,8 +229,11 @@ class Database:
         query = "SELECT name as file_name, object from mutation JOIN mutant on mutant.mutation_id=mutation.id JOIN file on mutation.file_id=file.id WHERE mutation.compile_time=1"
         self.cursor.execute(query)
         results = self.cursor.fetchall()
+        # imported here, JavaMutate imports this module.
+        from littledarwin.JavaMutate import Mutation
+
         for res in results:
-            compile_mutations.append((res[0], dill.loads(res[1])))
+            compile_mutations.append((res[0], Mutation.decode(res[1])))
         return compile_mutations
 
     def construct_mutant_dict(self):
@@ -163,25 +254,94 @@ class Database:
         self.cursor.execute(query)
         return self.cursor.fetchall()
 
-    def fetch_data(self, table_name, columns="*", condition=None):
+    def fetch_data(self, table_name, columns="*", condition=None, parameters=()):
+        self.flush()
         query = f"SELECT {columns} FROM {table_name}"
         if condition:
             query += f" WHERE {condition}"
-        self.cursor.execute(query)
+        self.cursor.execute(query, parameters)
         return self.cursor.fetchall()
 
     def fetch_coverage(self, file_name, line_no):
-        query = f"SELECT test.qualified_name from test_coverage JOIN file on file.id=test_coverage.file_id JOIN test on test.id=test_coverage.test_id WHERE file.name='{file_name}' AND test_coverage.line_no IN ({line_no})"
-        self.cursor.execute(query)
+        # line_no is a comma separated list of lines, each one is bound to its own parameter.
+        lines = [int(line) for line in str(line_no).split(",") if line.strip() != ""]
+        line_holder = ",".join(["?"] * len(lines))
+        query = f"SELECT test.qualified_name from test_coverage JOIN file on file.id=test_coverage.file_id JOIN test on test.id=test_coverage.test_id WHERE file.name=? AND test_coverage.line_no IN ({line_holder})"
+        self.cursor.execute(query, [file_name] + lines)
         file_coverage = self.cursor.fetchall()
         return file_coverage
 
+    def fetch_coverage_index(self):
+        query = "SELECT file.name, test_coverage.line_no, test.id, test.qualified_name from test_coverage JOIN file on file.id=test_coverage.file_id JOIN test on test.id=test_coverage.test_id ORDER BY test.id"
+        self.cursor.execute(query)
+        return self.cursor.fetchall()
+
     def fetch_all_coverage(self):
-        query = f"SELECT test.qualified_name from test where test.id!=-2"
+        query = "SELECT test.qualified_name from test where test.id!=-2"
         self.cursor.execute(query)
         file_coverage = self.cursor.fetchall()
         return file_coverage
 
+    def insert_test_times(self, values):
+        self.create_table("test_time", "qualified_name TEXT PRIMARY KEY, time REAL")
+        self.cursor.execute("DELETE FROM test_time")
+        self.cursor.executemany(
+            "INSERT OR REPLACE INTO test_time (qualified_name, time) VALUES(?,?)", values
+        )
+        self.conn.commit()
+
+    def fetch_test_times(self):
+        self.create_table("test_time", "qualified_name TEXT PRIMARY KEY, time REAL")
+        self.cursor.execute("SELECT qualified_name, time FROM test_time")
+        return dict(self.cursor.fetchall())
+
+    def insert_mutant_result(self, mutant_id, status, tests_run, compile_time, prepare_build_time):
+        # committed right away, so that an interrupted build phase can be resumed.
+        self.create_table(
+            "mutant_result",
+            "mutant_id INTEGER PRIMARY KEY, status TEXT, tests_run INTEGER, compile_time REAL, prepare_build_time REAL",
+        )
+        self.cursor.execute(
+            "INSERT OR REPLACE INTO mutant_result (mutant_id, status, tests_run, compile_time, prepare_build_time) VALUES(?,?,?,?,?)",
+            (mutant_id, status, tests_run, compile_time, prepare_build_time),
+        )
+        self.conn.commit()
+
+    def fetch_mutant_results(self):
+        self.create_table(
+            "mutant_result",
+            "mutant_id INTEGER PRIMARY KEY, status TEXT, tests_run INTEGER, compile_time REAL, prepare_build_time REAL",
+        )
+        self.cursor.execute(
+            "SELECT mutant_id, status, tests_run, compile_time, prepare_build_time FROM mutant_result"
+        )
+        return {row[0]: row[1:] for row in self.cursor.fetchall()}
+
+    def fetch_mutant_test_results(self):
+        query = "SELECT mutant_id, result FROM mutant_test"
+        self.cursor.execute(query)
+        return self.cursor.fetchall()
+
+    def fetch_killing_tests(self, mutant_id=None):
+        # the same rows the subsumption graph is built from: the tests that failed or errored on a mutant.
+        query = "SELECT mutant_id, test_id FROM mutant_test WHERE result NOT IN (?, ?, ?)"
+        parameters = (self.RES_ID_SURVIVED_MUTANT, self.RES_ID_BUILD_FAILURE, self.RES_ID_UNCOVERED)
+        if mutant_id is not None:
+            query += " AND mutant_id = ?"
+            parameters += (mutant_id,)
+        self.cursor.execute(query, parameters)
+        return self.cursor.fetchall()
+
+    def fetch_kill_history(self):
+        query = "SELECT file.name, mutation.lineNo, mutation.mutation_operator_id, test.qualified_name FROM mutant_test JOIN mutant ON mutant.id = mutant_test.mutant_id JOIN mutation ON mutation.id = mutant.mutation_id JOIN file ON file.id = mutation.file_id JOIN test ON test.id = mutant_test.test_id WHERE mutant_test.result IN (?, ?) AND mutant_test.test_id >= 0"
+        self.cursor.execute(query, (self.RES_ID_KILLED_BY_FAILURE_MUTANT, self.RES_ID_KILLED_BY_ERROR_MUTANT))
+        return self.cursor.fetchall()
+
+    def fetch_mutant_operators(self):
+        query = "SELECT mutant.id, mutation.mutation_operator_id FROM mutant JOIN mutation ON mutation.id = mutant.mutation_id"
+        self.cursor.execute(query)
+        return self.cursor.fetchall()
+
     def fetch_mutated_files_count(self):
         query = "SELECT DISTINCT SUM(COUNT(*)) OVER() AS total_count FROM file JOIN mutation ON file.id = mutation.file_id GROUP BY file.name ORDER BY file.name"
         self.cursor.execute(query)
@@ -215,25 +375,25 @@ class Database:
         return mutants
 
     def fetch_file_mutant_by_mutation_ID(self, mutation_id):
-        query = f"SELECT file.name as name, mutant.id as id, group_concat(mutation.lineNo , ',') as lineNo FROM file JOIN mutation ON file.id = mutation.file_id JOIN mutant ON mutant.mutation_id = mutation.id WHERE mutation_id= '{mutation_id}' GROUP BY mutant.id ORDER BY file.name"
-        self.cursor.execute(query)
+        query = f"SELECT file.name as name, mutant.id as id, group_concat(mutation.lineNo , ',') as lineNo FROM file JOIN mutation ON file.id = mutation.file_id JOIN mutant ON mutant.mutation_id = mutation.id WHERE mutation_id=? GROUP BY mutant.id ORDER BY file.name"
+        self.cursor.execute(query, (mutation_id,))
         sqlLiteDB_File_Mutant = self.cursor.fetchall()
         return sqlLiteDB_File_Mutant
 
     def fetch_file_mutant(self, file_name):
-        query = f"SELECT file.name as name, mutant.id as id, group_concat(mutation.lineNo , ',') as lineNo FROM file JOIN mutation ON file.id = mutation.file_id JOIN mutant ON mutant.mutation_id = mutation.id WHERE file.name = '{file_name}' GROUP BY mutant.id ORDER BY file.name"
-        self.cursor.execute(query)
+        query = f"SELECT file.name as name, mutant.id as id, group_concat(mutation.lineNo , ',') as lineNo FROM file JOIN mutation ON file.id = mutation.file_id JOIN mutant ON mutant.mutation_id = mutation.id WHERE file.name=? GROUP BY mutant.id ORDER BY file.name"
+        self.cursor.execute(query, (file_name,))
         sqlLiteDB_File_Mutant = self.cursor.fetchall()
         return sqlLiteDB_File_Mutant
 
     def fetch_file_mutant_with_id(self, file_name, mutant_id):
-        query = f"SELECT file.name as name, mutant.id as id, group_concat(mutation.lineNo , ',') as lineNo FROM file JOIN mutation ON file.id = mutation.file_id JOIN mutant ON mutant.mutation_id = mutation.id WHERE file.name = '{file_name}' and mutant.id = '{mutant_id}'GROUP BY mutant.id ORDER BY file.name"
-        self.cursor.execute(query)
+        query = f"SELECT file.name as name, mutant.id as id, group_concat(mutation.lineNo , ',') as lineNo FROM file JOIN mutation ON file.id = mutation.file_id JOIN mutant ON mutant.mutation_id = mutation.id WHERE file.name=? and mutant.id=? GROUP BY mutant.id ORDER BY file.name"
+        self.cursor.execute(query, (file_name, mutant_id))
         sqlLiteDB_File_Mutant = self.cursor.fetchall()
         return sqlLiteDB_File_Mutant
 
     def update_file_json(self, file_name, json):
-        query = f"UPDATE file SET json = ? WHERE name = ?"
+        query = "UPDATE file SET json = ? WHERE name = ?"
         self.cursor.execute(query, (json, file_name))
         self.conn.commit()
 
@@ -242,12 +402,12 @@ class Database:
         else:
             return False
 
-    def update_data(self, table_name, set_values, condition=None):
+    def update_data(self, table_name, set_values, condition=None, parameters=()):
         query = f"UPDATE {table_name} SET {set_values}"
         if condition:
             query += f" WHERE {condition}"
         try:
-            self.cursor.execute(query)
+            self.cursor.execute(query, parameters)
             self.conn.commit()
         except Exception as e:
             print(e)
@@ -257,13 +417,15 @@ class Database:
         else:
             return False
 
-    def delete_data(self, table_name, condition=None):
+    def delete_data(self, table_name, condition=None, parameters=()):
         query = f"DELETE FROM {table_name}"
         if condition:
             query += f" WHERE {condition}"
         try:
-            self.cursor.execute(query)
-            self.conn.commit()
+            self.flush()
+            self.cursor.execute(query, parameters)
+            if not self.in_transaction:
+                self.conn.commit()
         except:
             return False
 
@@ -273,4 +435,6 @@ class Database:
             return False
 
     def close_connection(self):
+        if self.in_transaction:
+            self.commit_transaction()
         self.conn.close()
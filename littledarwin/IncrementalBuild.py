@@ -0,0 +1,214 @@
+import os
+import shutil
+
+from littledarwin.SharedFunctions import timeoutAlternative
+
+
+class IncrementalBuild:
+    """
+    Builds mutants without going through the build system. The project is built once with the initial build
+    command, the resolved classpath is cached, and for every mutant only the mutated compilation unit is compiled
+    with javac into an overlay directory. The overlay comes first on the classpath when the tests are run, so the
+    mutated classes shadow the original ones.
+    """
+
+    # the class name patterns surefire runs by default
+    TEST_CLASS_SUFFIXES = ("Test", "Tests", "TestCase")
+    # the coverage markers of lines whose tests are not known: "?" (covered by an unknown test) and "*" (no coverage
+    # information). "-" (not covered) adds no tests.
+    UNKNOWN_TEST_MARKERS = ("?", "*")
+    NOT_COVERED_MARKER = "-"
+
+    def __init__(self, project_path, cache_path, timeout=60):
+        """
+
+        :param project_path: the maven project directory
+        :type project_path: str
+        :param cache_path: where the cached classpath is stored
+        :type cache_path: str
+        :param timeout: timeout for resolving the classpath
+        :type timeout: int
+        """
+        self.project_path = os.path.abspath(project_path)
+        self.cache_path = os.path.abspath(cache_path)
+        self.timeout = timeout
+        self.classes_path = os.path.join(self.project_path, "target", "classes")
+        self.test_classes_path = os.path.join(self.project_path, "target", "test-classes")
+        self.classpath_file = os.path.join(self.cache_path, "classpath.txt")
+        self.dependencies = []
+        self.test_classes = []
+
+    @staticmethod
+    def java_tool(name):
+        """
+        Returns the path to a JDK tool, preferring JAVA_HOME over PATH.
+
+        :param name: "java" or "javac"
+        :type name: str
+        :return:
+        :rtype: str
+        """
+        java_home = os.environ.get("JAVA_HOME")
+        if java_home is not None:
+            for tool in (name, name + ".exe"):
+                if os.path.isfile(os.path.join(java_home, "bin", tool)):
+                    return os.path.join(java_home, "bin", tool)
+        return name
+
+    def prepare(self):
+        """
+        Resolves the dependency classpath of the project (reusing the cached one if the pom did not change since it
+        was resolved), and collects the test classes compiled by the initial build.
+
+        :return: True if the project is ready to be built incrementally
+        :rtype: bool
+        """
+        if not os.path.isdir(self.classes_path) or not os.path.isdir(self.test_classes_path):
+            print(
+                "Incremental build needs compiled classes in "
+                + self.classes_path
+                + " and "
+                + self.test_classes_path
+                + ". Make sure the initial build compiles the tests."
+            )
+            return False
+        pom_path = os.path.join(self.project_path, "pom.xml")
+        if not os.path.isfile(self.classpath_file) or (
+            os.path.isfile(pom_path)
+            and os.path.getmtime(pom_path) > os.path.getmtime(self.classpath_file)
+        ):
+            os.makedirs(self.cache_path, exist_ok=True)
+            isKilled, returncode, output, timeDelta = timeoutAlternative(
+                [
+                    "mvn",
+                    "-q",
+                    "dependency:build-classpath",
+                    "-Dmdep.outputFile=" + self.classpath_file,
+                ],
+                workingDirectory=self.project_path,
+                timeout=self.timeout,
+            )
+            if isKilled or returncode or not os.path.isfile(self.classpath_file):
+                print("Resolving the classpath failed:\n" + str(output))
+                return False
+        with open(self.classpath_file, "r") as f:
+            self.dependencies = [
+                entry for entry in f.read().strip().split(os.pathsep) if entry != ""
+            ]
+        self.test_classes = self.find_test_classes()
+        return True
+
+    def find_test_classes(self):
+        """
+        Returns the fully qualified names of the compiled test classes that surefire would run by default.
+
+        :return:
+        :rtype: list
+        """
+        test_classes = []
+        for root, dirs, files in os.walk(self.test_classes_path):
+            for file_name in files:
+                if not file_name.endswith(".class") or "$" in file_name:
+                    continue
+                class_name = file_name[: -len(".class")]
+                if class_name.startswith("Test") or class_name.endswith(self.TEST_CLASS_SUFFIXES):
+                    relative_path = os.path.relpath(os.path.join(root, class_name), self.test_classes_path)
+                    test_classes.append(relative_path.replace(os.sep, "."))
+        return sorted(test_classes)
+
+    def classpath(self, overlay_path):
+        """
+        :param overlay_path: the directory holding the mutated classes
+        :type overlay_path: str
+        :return: the classpath with the overlay in front of the original classes
+        :rtype: str
+        """
+        return os.pathsep.join(
+            [overlay_path, self.test_classes_path, self.classes_path] + self.dependencies
+        )
+
+    @staticmethod
+    def reset_overlay(overlay_path):
+        """
+        Empties the overlay directory before the next mutant is compiled into it.
+
+        :param overlay_path:
+        :type overlay_path: str
+        """
+        shutil.rmtree(overlay_path, ignore_errors=True)
+        os.makedirs(overlay_path, exist_ok=True)
+
+    def compile_command(self, source_file, overlay_path):
+        """
+        Returns the javac command that compiles only the mutated compilation unit into the overlay directory.
+        Other classes are resolved from the compiled project and are not compiled again.
+
+        :param source_file: the mutated source file
+        :type source_file: str
+        :param overlay_path:
+        :type overlay_path: str
+        :return:
+        :rtype: list
+        """
+        return [
+            self.java_tool("javac"),
+            "-nowarn",
+            "-implicit:none",
+            "-sourcepath",
+            "",
+            "-d",
+            overlay_path,
+            "-cp",
+            os.pathsep.join([self.classes_path] + self.dependencies),
+            source_file,
+        ]
+
+    def test_command(self, overlay_path, covered_tests=None):
+        """
+        Returns the command that runs the tests against the overlay with JUnitCore.
+
+        :param overlay_path:
+        :type overlay_path: str
+        :param covered_tests: the tests selected by coverage (tuples of "class#method"), or None to run all tests
+        :type covered_tests: list
+        :return:
+        :rtype: list
+        """
+        return [
+            self.java_tool("java"),
+            "-cp",
+            self.classpath(overlay_path),
+            "org.junit.runner.JUnitCore",
+        ] + self.select_test_classes(covered_tests)
+
+    @staticmethod
+    def selects_all_tests(covered_tests):
+        """
+        :param covered_tests: the tests selected by coverage (tuples of "class#method"), or None
+        :type covered_tests: list
+        :return: whether all the tests have to run, because there is no coverage information or some of the tests
+            covering the mutant are not known
+        :rtype: bool
+        """
+        return (
+            covered_tests is None
+            or "" in covered_tests
+            or any(test_name[0] in IncrementalBuild.UNKNOWN_TEST_MARKERS for test_name in covered_tests)
+        )
+
+    def select_test_classes(self, covered_tests=None):
+        """
+        :param covered_tests: the tests selected by coverage (tuples of "class#method"), or None to run all tests
+        :type covered_tests: list
+        :return: the test classes to run, in the order they first appear in covered_tests
+        :rtype: list
+        """
+        if self.selects_all_tests(covered_tests):
+            return list(self.test_classes)
+        return list(
+            dict.fromkeys(
+                test_name[0].split("#")[0].replace("/", ".")
+                for test_name in covered_tests
+                if test_name[0] != self.NOT_COVERED_MARKER
+            )
+        )
@@ -1,4 +1,5 @@
 import copy
+import struct
 import sys
 from math import log10
 from random import shuffle
@@ -10,7 +11,7 @@ from antlr4.tree.Tree import TerminalNodeImpl
 from littledarwin.JavaParse import JavaParse
 from littledarwin.JavaParser import JavaParser
 from littledarwin.Database import Database
-from littledarwin.SharedFunctions import getAllInstantiableSubclasses
+from littledarwin.SharedFunctions import getMutationOperators
 from littledarwin.SharedFunctions import MutationOperator
 from itertools import combinations
 from operator import itemgetter
@@ -30,6 +31,14 @@ class Mutation(object):
     # STYLE_DELETE = "delete"
     applied_node_id = 0
 
+    # the binary form written by encode: a header with the positions, ids and texts, followed by the changed nodes.
+    ENCODING_MAGIC = b"LDM"
+    ENCODING_VERSION = 2
+    ENCODING_HEADER = struct.Struct("<3sBqiiii")
+    ENCODING_NODE = struct.Struct("<qB")
+    ENCODING_STYLES = (STYLE_REPLACE, STYLE_APPEND)
+    javaParse = None
+
     def __init__(
         self,
         startPos: int,
@@ -62,11 +71,106 @@ class Mutation(object):
 
         Mutation.mutation_dict[mutationID] = (
             applied_node_id, applied_node_new, applied_mutation_style)
+        self.encodedNodes = None
+
+    def encode(self) -> bytes:
+        """
+        Returns the mutation in a compact binary form, which the database stores instead of a pickle. The changed
+        nodes are written after the header with their styles, followed by their new subtrees (in the format of
+        JavaParse.trees2Binary), so that decode can leave them until they are needed.
+
+        :return: the encoded mutation
+        :rtype: bytes
+        """
+        if Mutation.javaParse is None:
+            Mutation.javaParse = JavaParse()
+        nodeIndexes, nodes, styles = Mutation.mutation_dict.get(self.mutationID, (None, None, None))
+        encoded = [
+            Mutation.ENCODING_HEADER.pack(
+                Mutation.ENCODING_MAGIC,
+                Mutation.ENCODING_VERSION,
+                self.mutationID,
+                self.startPos,
+                self.endPos,
+                self.lineNumber,
+                self.nodeID,
+            )
+        ]
+        for text in (self.mutatorType, self.replacementText, self.color):
+            text = text.encode("utf-8")
+            encoded.append(struct.pack("<I", len(text)) + text)
+        nodeCount = 0 if nodeIndexes is None else len(nodeIndexes)
+        encoded.append(struct.pack("<I", nodeCount))
+        for i in range(nodeCount):
+            encoded.append(
+                Mutation.ENCODING_NODE.pack(int(nodeIndexes[i]), Mutation.ENCODING_STYLES.index(styles[i]))
+            )
+        if nodeCount > 0:
+            encoded.append(Mutation.javaParse.trees2Binary(nodes))
+        return b"".join(encoded)
+
+    @staticmethod
+    def decode(encoded: bytes):
+        """
+        Reads a mutation written by encode. The changed nodes are only decoded when the mutation is applied.
+
+        :param encoded:
+        :type encoded: bytes
+        :return: the mutation
+        :rtype: Mutation
+        """
+        encoded = bytes(encoded)
+        if len(encoded) < Mutation.ENCODING_HEADER.size or not encoded.startswith(Mutation.ENCODING_MAGIC):
+            raise ValueError("Not an encoded mutation. Run the mutation phase again to rebuild the database.")
+        magic, version, mutationID, startPos, endPos, lineNumber, nodeID = Mutation.ENCODING_HEADER.unpack_from(
+            encoded)
+        if version != Mutation.ENCODING_VERSION:
+            raise ValueError("Unsupported mutation encoding version: " + str(version))
+        offset = Mutation.ENCODING_HEADER.size
+        texts = list()
+        for _ in range(3):
+            (length,) = struct.unpack_from("<I", encoded, offset)
+            offset += 4
+            texts.append(encoded[offset:offset + length].decode("utf-8"))
+            offset += length
+        # __init__ would replace the entry of the mutation in mutation_dict.
+        mutation = Mutation.__new__(Mutation)
+        mutation.startPos = startPos
+        mutation.endPos = endPos
+        mutation.lineNumber = lineNumber
+        mutation.nodeID = nodeID
+        mutation.mutationID = mutationID
+        mutation.mutatorType, mutation.replacementText, mutation.color = texts
+        mutation.encodedNodes = encoded[offset:]
+        return mutation
+
+    def appliedNodes(self):
+        """
+        Returns the indexes of the nodes the mutation changes, their new subtrees, and the style of each change. The
+        nodes of a decoded mutation are decoded here the first time they are needed.
+
+        :return:
+        :rtype: tuple
+        """
+        if self.mutationID not in Mutation.mutation_dict and getattr(self, "encodedNodes", None) is not None:
+            if Mutation.javaParse is None:
+                Mutation.javaParse = JavaParse()
+            encoded = self.encodedNodes
+            (nodeCount,) = struct.unpack_from("<I", encoded)
+            offset = 4
+            nodeIndexes, nodes, styles = list(), list(), list()
+            for _ in range(nodeCount):
+                nodeIndex, style = Mutation.ENCODING_NODE.unpack_from(encoded, offset)
+                offset += Mutation.ENCODING_NODE.size
+                nodeIndexes.append(nodeIndex)
+                styles.append(Mutation.ENCODING_STYLES[style])
+            if nodeCount > 0:
+                nodes = Mutation.javaParse.binary2Trees(encoded[offset:])
+            Mutation.mutation_dict[self.mutationID] = (nodeIndexes, nodes, styles)
+        return Mutation.mutation_dict[self.mutationID]
 
     def apply_mutation_in_place(self, original_tree):
-        list_node_indexes = Mutation.mutation_dict[self.mutationID][0]
-        list_nodes = Mutation.mutation_dict[self.mutationID][1]
-        list_styles = Mutation.mutation_dict[self.mutationID][2]
+        list_node_indexes, list_nodes, list_styles = self.appliedNodes()
         app_inds = list()
         app_nodes = list()
 
@@ -114,9 +218,7 @@ class Mutation(object):
         return (app_inds, app_nodes)
 
     def apply_reverse_mutation_in_place(self, mutated_tree, app_inds=None, app_nodes=None):
-        list_node_indexes = Mutation.mutation_dict[self.mutationID][0]
-        list_nodes = Mutation.mutation_dict[self.mutationID][1]
-        list_styles = Mutation.mutation_dict[self.mutationID][2]
+        list_node_indexes, list_nodes, list_styles = self.appliedNodes()
 
         list_rev_node_indexes = Mutation.reverse_mutation_dict[
             self.mutationID][0] if app_inds is None else app_inds
@@ -350,6 +452,7 @@ class RemoveMethod(MutationOperator):
 
     instantiable = True
     metaTypes = ["Method", "All"]
+    nodeType = JavaParser.MethodBodyContext
 
     def __init__(
         self,
@@ -359,9 +462,10 @@ class RemoveMethod(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "RemoveMethod"
         self.color = "#FF00D4"
         self.mutableNodesWithTypes = list()
@@ -379,12 +483,6 @@ class RemoveMethod(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self, search_children=True):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.MethodBodyContext, search_children=search_children
-        )
-
     def filterCriteria(self):
         """ """
         for node in self.allNodes:
@@ -686,6 +784,7 @@ class RemoveNullCheck(MutationOperator):
 
     instantiable = True
     metaTypes = ["Null", "All"]
+    nodeType = JavaParser.ExpressionContext
 
     def __init__(
         self,
@@ -695,9 +794,10 @@ class RemoveNullCheck(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "RemoveNullCheck"
         self.color = "#ADD8E6"
         self.mutation_id = mutation_id
@@ -715,12 +815,6 @@ class RemoveNullCheck(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self, search_children=True):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.ExpressionContext, search_children=search_children
-        )
-
     def filterCriteria(self):
         """ """
         for node in self.allNodes:
@@ -824,6 +918,7 @@ class NullifyObjectInitialization(MutationOperator):
 
     instantiable = True
     metaTypes = ["Null", "All"]
+    nodeType = JavaParser.CreatorContext
 
     def __init__(
         self,
@@ -833,9 +928,10 @@ class NullifyObjectInitialization(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "NullifyObjectInitialization"
         self.color = "#F08080"
         self.findNodes(search_children=search_children)
@@ -851,12 +947,6 @@ class NullifyObjectInitialization(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self, search_children=True):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.CreatorContext, search_children=search_children
-        )
-
     def filterCriteria(self):
         """ """
         for node in self.allNodes:
@@ -929,6 +1019,7 @@ class NullifyReturnValue(MutationOperator):
 
     instantiable = True
     metaTypes = ["Null", "All"]
+    nodeType = TerminalNodeImpl
 
     def __init__(
         self,
@@ -938,9 +1029,10 @@ class NullifyReturnValue(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "NullifyReturnValue"
         self.color = "#E0FFFF"
         self.findNodes(search_children=search_children)
@@ -957,12 +1049,6 @@ class NullifyReturnValue(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self, search_children=True):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, TerminalNodeImpl, search_children=search_children
-        )
-
     def filterCriteria(self):
         """ """
         for node in self.allNodes:
@@ -1050,6 +1136,7 @@ class NullifyInputVariable(MutationOperator):
 
     instantiable = True
     metaTypes = ["Null", "All"]
+    nodeType = JavaParser.MethodDeclarationContext
 
     def __init__(
         self,
@@ -1059,9 +1146,10 @@ class NullifyInputVariable(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "NullifyInputVariable"
         self.color = "#90EE90"
         self.findNodes(search_children=search_children)
@@ -1078,12 +1166,6 @@ class NullifyInputVariable(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self, search_children=True):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.MethodDeclarationContext, search_children=search_children
-        )
-
     def filterCriteria(self, search_children=True):
         """ """
 
@@ -1276,6 +1358,32 @@ def findNodesWithMutationID(tree, mutationID):
     return nodes
 
 
+def indexNodesByMutationID(tree):
+    """
+    Gathers the nodes of a tree by mutation id in one walk. The nodes of an id are in the order findNodesWithMutationID
+    returns them in, as long as the tree does not change.
+
+    :param tree:
+    :type tree:
+    :return: the list of nodes of each mutation id
+    :rtype: dict
+    """
+    nodes = dict()
+    if tree is None:
+        return nodes
+    children = [tree]
+    while len(children):
+        child = children.pop()
+        try:
+            children.extend(child.getChildren())
+            mutationIDs = str(child.mutationID).split(",")
+            for child_mutationID in mutationIDs:
+                nodes.setdefault(child_mutationID, list()).append(child)
+        except Exception as e:
+            pass
+    return nodes
+
+
 def findNodeAt(tree, line, column):
     """
     :param tree:
@@ -1302,6 +1410,10 @@ def findNodeAt(tree, line, column):
 
 
 def replaceNodes(toNode, fromNode):
+    # the node keeps its place, the nodes below it are taken out of the tree or put into it.
+    nodeTable = getattr(toNode, "nodeTable", None)
+    if nodeTable is not None:
+        nodeTable.invalidate(toNode)
     if (hasattr(toNode, "applied_node_id")):
         del toNode.applied_node_id
     if (hasattr(toNode, "mutationID")):
@@ -1327,6 +1439,8 @@ def replaceNodes(toNode, fromNode):
     if (hasattr(fromNode, "children")):
         for child in fromNode.children:
             toNode.addChild(child)
+    if nodeTable is not None:
+        nodeTable.invalidate(toNode)
 
 
 def recursiveCloneANTLRNodeAndItsChildren(node):
@@ -1372,6 +1486,7 @@ class TraditionalMutationOperator(MutationOperator):
     """ """
 
     metaTypes = ["Traditional", "All"]
+    nodeType = JavaParser.ExpressionContext
 
     def __init__(
         self,
@@ -1381,20 +1496,16 @@ class TraditionalMutationOperator(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children: bool = True
+        search_children: bool = True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "GenericTraditionalMutationOperator"
         self.mutation_id = mutation_id
 
-    def findNodes(self, search_children=True):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.ExpressionContext, search_children=search_children
-        )
-
     def filterCriteriaBinaryExpression(
         self, node: JavaParser.ExpressionContext, symbolList: List[str]
     ):
@@ -1531,10 +1642,12 @@ class ArithmeticOperatorReplacementBinary(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ArithmeticOperatorReplacementBinary"
         self.color = "#FFB6C1"
@@ -1598,10 +1711,12 @@ class RelationalOperatorReplacement(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "RelationalOperatorReplacement"
         self.color = "#FFA07A"
@@ -1662,10 +1777,12 @@ class ConditionalOperatorReplacement(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ConditionalOperatorReplacement"
         self.color = "#87CEFA"
@@ -1722,10 +1839,12 @@ class LogicalOperatorReplacement(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "LogicalOperatorReplacement"
         self.color = "#F0E68C"
@@ -1782,10 +1901,12 @@ class AssignmentOperatorReplacementShortcut(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "AssignmentOperatorReplacementShortcut"
         self.color = "#B0C4DE"
@@ -1859,10 +1980,12 @@ class ArithmeticOperatorReplacementUnary(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ArithmeticOperatorReplacementUnary"
         self.color = "#DDA0DD"
@@ -1918,10 +2041,12 @@ class ConditionalOperatorDeletion(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id, sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ConditionalOperatorDeletion"
         self.color = "#FFD700"
@@ -1974,10 +2099,12 @@ class ArithmeticOperatorReplacementShortcut(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id,  sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id,  sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ArithmeticOperatorReplacementShortcut"
         self.color = "#FF00FF"
@@ -2078,10 +2205,12 @@ class ShiftOperatorReplacement(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
-        search_children=True
+        search_children=True,
+        candidateNodes: Dict[type, list] = None
     ):
         super().__init__(
-            mutation_id,  sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            mutation_id,  sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ShiftOperatorReplacement"
         self.color = "#9ACD32"
@@ -2286,19 +2415,25 @@ class JavaMutate(object):
         :type metaTypes:
         """
         self.mutationOperators.clear()
-        for MO in getAllInstantiableSubclasses(mutationOperator):
-            for metaType in metaTypes:
-                if metaType in MO.metaTypes:
-                    mO = MO(
-                        mutation_id,
-                        self.sourceTree,
-                        self.sourceCode,
-                        self.javaParseObject,
-                        generateMutants,
-                        generateMutations,
-                    )
-                    self.mutationOperators.append(mO)
-                    mutation_id = mO.mutation_id
+        operatorClasses = [
+            MO for MO in getMutationOperators(mutationOperator) for metaType in metaTypes if metaType in MO.metaTypes
+        ]
+        # the nodes of all the operators are found in one walk of the tree.
+        candidateNodes = self.javaParseObject.seekAllNodesOfTypes(
+            self.sourceTree, set(MO.nodeType for MO in operatorClasses if MO.nodeType is not None)
+        )
+        for MO in operatorClasses:
+            mO = MO(
+                mutation_id,
+                self.sourceTree,
+                self.sourceCode,
+                self.javaParseObject,
+                generateMutants,
+                generateMutations,
+                candidateNodes=candidateNodes,
+            )
+            self.mutationOperators.append(mO)
+            mutation_id = mO.mutation_id
 
     def countMutants(self, metaTypes: List[str] = ["Traditional"]):
         """
@@ -3042,7 +3177,7 @@ class JavaMutate(object):
         mutationTypeCount = dict()
         if database is not None:
             file_id = database.fetch_data(
-                "file", columns="id", condition=f"name = '{self.file_name}'"
+                "file", columns="id", condition="name = ?", parameters=(self.file_name,)
             )[0][0]
         self.instantiateMutationOperators(
             last_mutation_id, metaTypes, mutationOperator=mutationOperator)
@@ -3064,12 +3199,7 @@ class JavaMutate(object):
                         )
                         last_mutation_id = mutation.mutationID
                         if database is not None:
-                            operator_id = database.fetch_data(
-                                "mutation_operator",
-                                "id",
-                                f"name = '{mutation.mutatorType}'",
-                            )
-                            operator_id = operator_id[0][0]
+                            operator_id = database.fetch_operator_id(mutation.mutatorType)
                             database.insert_mutation(
                                 mutation.mutationID,
                                 file_id,
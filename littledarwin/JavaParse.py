@@ -2,6 +2,9 @@ from typing import Dict
 
 from antlr4 import *
 from antlr4.InputStream import InputStream
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener
+from antlr4.error.Errors import ParseCancellationException
 from antlr4.error.ErrorStrategy import BailErrorStrategy
 from antlr4.tree.Tree import TerminalNodeImpl
 import antlr4.tree.Tree as Tree_
@@ -9,7 +12,14 @@ import inspect
 
 from littledarwin.JavaLexer import JavaLexer
 from littledarwin.JavaParser import JavaParser
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+import gc
 import json
+import struct
+import sys
+import zlib
 
 try:
     import graphviz
@@ -36,6 +46,171 @@ class LittleDarwinErrorStrategy(BailErrorStrategy):
         super().recover(parser, exception)
 
 
+class NodeTable(object):
+    """
+    Finds the nodes of a numbered tree by their nodeIndex without walking the tree. numerify fills the table, and
+    replaceNodes marks the indexes of the nodes it takes out of the tree or puts into it as stale: the nodes can then
+    have copies with the same index, and are found by walking the tree as before.
+
+    As long as the tree is not changed, the table also keeps the order getNode walks the tree in, and the methods,
+    constructors and classes of the tree by their in_time and out_time intervals.
+    """
+
+    def __init__(self):
+        self.nodes = dict()
+        self.parents = dict()
+        self.stale = set()
+        self.root = None
+        self.changed = False
+        # whether every node has its in_time and out_time.
+        self.timed = True
+        self.walkOrder = None
+        self.walkPositions = None
+        # the lookupTable of getNode that holds the nodes of walkOrder up to walkedLength.
+        self.walkedLookupTable = None
+        self.walkedLength = 0
+        self.intervals = None
+
+    def add(self, node, parent):
+        """
+
+        :param node: a numbered node
+        :type node:
+        :param parent: the parent of the node, or None for the root
+        :type parent:
+        """
+        if node.nodeIndex in self.nodes:
+            self.stale.add(node.nodeIndex)
+        if parent is None and self.root is None:
+            self.root = node
+        self.nodes[node.nodeIndex] = node
+        self.parents[id(node)] = parent
+        node.nodeTable = self
+        if "in_time" not in node.__dict__ or "out_time" not in node.__dict__:
+            self.timed = False
+
+    def isIntact(self):
+        """
+        :return: whether the tree is as it was numbered, with one node for each index
+        :rtype: bool
+        """
+        return not self.changed and len(self.stale) == 0
+
+    def find(self, tree, index):
+        """
+
+        :param tree: the root of the subtree to search
+        :type tree:
+        :param index:
+        :type index: int
+        :return: the node with the index, or None if it is not known to be the first one in the subtree
+        :rtype:
+        """
+        if index in self.stale:
+            return None
+        node = self.nodes.get(index)
+        ancestor = node
+        while ancestor is not None:
+            if ancestor is tree:
+                return node
+            ancestor = self.parents.get(id(ancestor))
+        return None
+
+    def invalidate(self, tree):
+        """
+        Marks the indexes below a node as stale, except the index of the node itself, which is still found before
+        its copies. replaceNodes calls it before and after it replaces the children of the node.
+
+        :param tree:
+        :type tree:
+        """
+        self.changed = True
+        stack = list(tree.children) if getattr(tree, "children", None) is not None else []
+        while len(stack) > 0:
+            node = stack.pop()
+            if hasattr(node, "nodeIndex") and self.nodes.get(node.nodeIndex) is not tree:
+                self.stale.add(node.nodeIndex)
+            # the nodes put into the tree are watched as well.
+            node.nodeTable = self
+            if getattr(node, "children", None) is not None:
+                stack.extend(node.children)
+
+    def walk(self, lookupTable, index):
+        """
+        Does what the walk of getNode from the root does to an intact tree: every node up to the one with the index is
+        added to the lookupTable, unless its index is already there. The nodes that an earlier walk added are not
+        visited again.
+
+        :param lookupTable: the lookupTable of getNode
+        :type lookupTable: dict
+        :param index:
+        :type index: int
+        :return: the node with the index, or None
+        :rtype:
+        """
+        if self.walkOrder is None:
+            self.walkOrder = list()
+            self.walkPositions = dict()
+            stack = [self.root]
+            while len(stack) > 0:
+                node = stack.pop()
+                if hasattr(node, "nodeIndex"):
+                    self.walkPositions.setdefault(node.nodeIndex, len(self.walkOrder))
+                self.walkOrder.append(node)
+                if node.getChildCount() != 0:
+                    stack.extend(node.children)
+        if lookupTable is not self.walkedLookupTable:
+            self.walkedLookupTable = lookupTable
+            self.walkedLength = 0
+
+        position = self.walkPositions.get(index)
+        end = len(self.walkOrder) if position is None else position + 1
+        for node in self.walkOrder[self.walkedLength:end]:
+            if hasattr(node, "nodeIndex") and node.nodeIndex not in lookupTable:
+                lookupTable[node.nodeIndex] = node
+        self.walkedLength = max(self.walkedLength, end)
+        return None if position is None else self.walkOrder[position]
+
+    def enclosing(self, nodeType, node):
+        """
+        Finds the closest ancestor of a node of the tree that is a method, a constructor or a class declaration, by
+        a binary search of the intervals of those declarations.
+
+        :param nodeType: MethodDeclarationContext, ConstructorDeclarationContext or ClassDeclarationContext
+        :type nodeType: type
+        :param node: a node of the tree
+        :type node:
+        :return: the declaration, or None
+        :rtype:
+        """
+        if self.intervals is None:
+            self.intervals = dict(
+                (declarationType, (list(), list(), list(), list()))
+                for declarationType in JavaParse.DECLARATION_TYPES
+            )
+            # the intervals are nested or apart, so the declarations that hold the last one are on the stack.
+            stacks = dict((declarationType, list()) for declarationType in JavaParse.DECLARATION_TYPES)
+            for declaration in sorted(
+                (declaration for declaration in self.nodes.values() if type(declaration) in self.intervals),
+                key=lambda declaration: declaration.in_time,
+            ):
+                starts, ends, parents, declarations = self.intervals[type(declaration)]
+                stack = stacks[type(declaration)]
+                while len(stack) > 0 and ends[stack[-1]] < declaration.in_time:
+                    stack.pop()
+                parents.append(stack[-1] if len(stack) > 0 else -1)
+                stack.append(len(starts))
+                starts.append(declaration.in_time)
+                ends.append(declaration.out_time)
+                declarations.append(declaration)
+
+        starts, ends, parents, declarations = self.intervals[nodeType]
+        position = bisect_left(starts, node.in_time) - 1
+        while position >= 0 and ends[position] <= node.in_time:
+            position = parents[position]
+        return declarations[position] if position >= 0 else None
+
+
 class JavaParse(object):
     """ """
 
@@ -44,40 +219,168 @@ class JavaParse(object):
 
     MUTATION_TYPE_COMPILE_TIME = 6
     max_depth = 0
+    # the declarations that getMethodNameForNode looks for among the ancestors of a node.
+    DECLARATION_TYPES = (
+        JavaParser.MethodDeclarationContext,
+        JavaParser.ConstructorDeclarationContext,
+        JavaParser.ClassDeclarationContext,
+    )
+    # the terminals that add a path to the cyclomatic complexity of a method.
+    BRANCH_KEYWORDS = frozenset(("if", "case", "for", "while", "catch", "&&", "||", "?", "foreach"))
+    # the clock of the in_time and out_time intervals of numerify, shared by all the trees.
+    numerifyTimer = [0]
+    # the terminals after which a statement expression or a for loop control no longer passes its mutation type to
+    # its children.
+    NUMERIFY_RESET_TOKENS = frozenset(('=', '|=', '*=', '/=', '+=', '^=', '-=', '(', 'new', '['))
+
+    # the binary tree format written by trees2Binary.
+    BINARY_TREE_MAGIC = b"LDT"
+    BINARY_TREE_VERSION = 1
+    BINARY_TREE_HEADER = struct.Struct("<3sBIIIIII")
+    # the node attributes that are kept, in the order of their bits in the attribute masks.
+    BINARY_TREE_ATTRIBUTES = ("nodeIndex", "contextID", "mutationID", "mutationType", "node_depth", "applied_node_id")
 
     def __init__(self, verbose=False):
         self.verbose = verbose
         self.lookupTable = dict()
+        # the number of files the SLL prediction of parse could not parse.
+        self.sllFailures = 0
         self.generate_dict_of_classes()
 
     # antlr-based parser
-    def parse(self, fileContent):
+    def parse(self, fileContent, twoStage=True):
         """
+        Parses a file in two stages by default: first with the SLL prediction of ANTLR, which is faster and gives the
+        same tree as the full LL prediction whenever it succeeds, and only if it fails, again with LL prediction. The
+        syntax errors are reported by the second stage.
 
         :param fileContent:
         :type fileContent:
+        :param twoStage: whether to try SLL prediction first
+        :type twoStage: bool
         :return:
         :rtype:
         """
         lexer = JavaLexer(InputStream(fileContent))
         parser = JavaParser(CommonTokenStream(lexer))
-        parser._errHandler = LittleDarwinErrorStrategy()
-        tree = parser.compilationUnit()
+        tree = None
+        if twoStage:
+            parser._interp.predictionMode = PredictionMode.SLL
+            parser._errHandler = BailErrorStrategy()
+            parser.removeErrorListeners()
+            try:
+                tree = parser.compilationUnit()
+            except ParseCancellationException:
+                self.sllFailures += 1
+                # the tokens are kept, so the lexer does not run again.
+                parser.reset()
+                parser.addErrorListener(ConsoleErrorListener.INSTANCE)
+                parser._interp.predictionMode = PredictionMode.LL
+        if tree is None:
+            parser._errHandler = LittleDarwinErrorStrategy()
+            tree = parser.compilationUnit()
         self.lookupTable = dict()
         (tree, json_result, index) = self.numerify(tree, 0, 0, 0)
         # self.numerify(tree)
 
         return tree
 
-    def numerify(self, tree, index, contextID, mutationType, depth=0, timer=[0]):
+    def numerify(self, tree, index, contextID, mutationType, depth=0, timer=None, withJSON=False):
         """
+        Numbers the nodes of a tree in preorder, and sets their nodeIndex, mutationType, contextID and node_depth,
+        along with the in_time and out_time intervals that is_ancestor compares. The tree is walked once, without
+        recursion.
 
         :param tree:
         :type tree:
-        :return:
-        :rtype:
+        :param timer: the clock of the in_time and out_time intervals, shared by all the trees by default
+        :type timer: list
+        :param withJSON: whether to describe the numbered tree in a JSON-like dictionary
+        :type withJSON: bool
+        :return: the tree, its description if asked for, and the last index. The NodeTable of the tree is set as its
+            nodeTable.
+        :rtype: tuple
+        """
+        if timer is None:
+            timer = JavaParse.numerifyTimer
+
+        context = self._numerifyNode(tree, index, contextID, mutationType, depth, timer)
+        if context is None:
+            return None
+        contextID, mutationType = context
+        nodeTable = NodeTable()
+        nodeTable.add(tree, None)
+        json_result = self._numerifyJSON(tree) if withJSON else None
+        if isinstance(tree, TerminalNodeImpl):
+            text = tree.getText()
+            tree.node_depth = depth - 1 if text == "return" else depth
+            tree.out_time = timer[0]
+            if withJSON:
+                json_result["text"] = text
+            return (tree, json_result, index)
+
+        # the frames of the rules being walked: the node, the position of its next child, the context and mutation
+        # type passed to its children, its depth, its description, its text as long as it could still be "return",
+        # and whether a failing child stopped the walk of the rest of its children.
+        returnLength = len("return")
+        stack = [[tree, 0, contextID, mutationType, depth, json_result, "", False]]
+        while len(stack) > 0:
+            frame = stack[-1]
+            node, position, contextID, mutationType, depth, json_result = frame[:6]
+            children = node.children
+            if not frame[7] and children is not None and position < len(children):
+                frame[1] = position + 1
+                child = children[position]
+                index += 1
+                try:
+                    (childContextID, childMutationType) = self._numerifyNode(
+                        child, index, contextID, mutationType, depth + 1, timer
+                    )
+                except Exception as e:
+                    print(e)
+                    frame[7] = True
+                    continue
+                nodeTable.add(child, node)
+                childJSON = self._numerifyJSON(child) if withJSON else None
+                if withJSON:
+                    json_result["children"].append(childJSON)
+                if isinstance(child, TerminalNodeImpl):
+                    text = child.getText()
+                    child.node_depth = depth if text == "return" else depth + 1
+                    child.out_time = timer[0]
+                    if withJSON:
+                        childJSON["text"] = text
+                    if mutationType in (2, 5) and text in JavaParse.NUMERIFY_RESET_TOKENS:
+                        frame[3] = 0
+                    if frame[6] is not None:
+                        frame[6] += text
+                        if len(frame[6]) > returnLength:
+                            frame[6] = None
+                else:
+                    stack.append([child, 0, childContextID, childMutationType, depth + 1, childJSON, "", False])
+                continue
+
+            stack.pop()
+            text = frame[6]
+            if frame[7]:
+                # the children after the failing one were not walked.
+                text = node.getText()
+            node.node_depth = depth - 1 if text == "return" else depth
+            node.out_time = timer[0]
+            timer[0] += 1
+            if len(stack) > 0 and stack[-1][6] is not None:
+                parentText = stack[-1][6] + text if text is not None else None
+                stack[-1][6] = parentText if parentText is not None and len(parentText) <= returnLength else None
+
+        return (tree, json_result, index)
+
+    def _numerifyNode(self, tree, index, contextID, mutationType, depth, timer):
         """
+        Numbers a node before its children.
 
+        :return: the context and mutation type of its children, or None if there is no node
+        :rtype: tuple
+        """
         if (depth > self.max_depth):
             self.max_depth = depth
 
@@ -94,94 +397,92 @@ class JavaParse(object):
         except:
             assert False
         timer[0] += 1
-        if isinstance(tree, JavaParser.ConstantExpressionContext):
-            mutationType = JavaParse.MUTATION_TYPE_COMPILE_TIME
-        if isinstance(tree, JavaParser.MemberDeclarationContext):
-            # check for variables in function as well. localVariableDeclaration
-            for child in tree.parentCtx.getChildren():
-                if isinstance(child, JavaParser.ModifierContext):
-                    if child.getText() == "final":
-                        mutationType = JavaParse.MUTATION_TYPE_COMPILE_TIME
-        if isinstance(tree, JavaParser.InterfaceBodyDeclarationContext):
-            # check for variables in function as well. localVariableDeclaration
-            for child in tree.getChildren():
-                if isinstance(child, JavaParser.ModifierContext):
-                    if child.getText() == "final":
-                        mutationType = JavaParse.MUTATION_TYPE_COMPILE_TIME
-        if isinstance(tree, JavaParser.ExpressionContext):
-            if mutationType == 0 or mutationType == 7:
+        if isinstance(tree, TerminalNodeImpl):
+            # the return keyword is found by its token, rather than by the text of every node.
+            if tree.symbol.text == "return":
                 mutationType = 1
-        if isinstance(tree, JavaParser.StatementExpressionContext):
-            mutationType = 2
-        if isinstance(tree, JavaParser.CreatorContext):
+                tree.parentCtx.mutationType = 1
+                tree.parentCtx.getChild(1).mutationType = 8
+        else:
+            if isinstance(tree, JavaParser.ConstantExpressionContext):
+                mutationType = JavaParse.MUTATION_TYPE_COMPILE_TIME
+            if isinstance(tree, JavaParser.MemberDeclarationContext):
+                # check for variables in function as well. localVariableDeclaration
+                for child in tree.parentCtx.getChildren():
+                    if isinstance(child, JavaParser.ModifierContext):
+                        if child.getText() == "final":
+                            mutationType = JavaParse.MUTATION_TYPE_COMPILE_TIME
+            if isinstance(tree, JavaParser.InterfaceBodyDeclarationContext):
+                # check for variables in function as well. localVariableDeclaration
+                for child in tree.getChildren():
+                    if isinstance(child, JavaParser.ModifierContext):
+                        if child.getText() == "final":
+                            mutationType = JavaParse.MUTATION_TYPE_COMPILE_TIME
+            if isinstance(tree, JavaParser.ExpressionContext):
+                if mutationType == 0 or mutationType == 7:
+                    mutationType = 1
+            if isinstance(tree, JavaParser.StatementExpressionContext):
+                mutationType = 2
+            if isinstance(tree, JavaParser.CreatorContext):
 
-            mutationType = 10
-            tree.parentCtx.mutationType = 10
-        if isinstance(tree, JavaParser.ExpressionListContext):
-            if mutationType != 5:
+                mutationType = 10
+                tree.parentCtx.mutationType = 10
+            if isinstance(tree, JavaParser.ExpressionListContext):
+                if mutationType != 5:
 
-                mutationType = 3
-        if isinstance(tree, JavaParser.VariableInitializerContext):
-            if mutationType != JavaParse.MUTATION_TYPE_COMPILE_TIME:
+                    mutationType = 3
+            if isinstance(tree, JavaParser.VariableInitializerContext):
+                if mutationType != JavaParse.MUTATION_TYPE_COMPILE_TIME:
 
-                mutationType = 4
-        if isinstance(tree, JavaParser.ForUpdateContext) or isinstance(tree, JavaParser.ForInitContext):
+                    mutationType = 4
+            if isinstance(tree, JavaParser.ForUpdateContext) or isinstance(tree, JavaParser.ForInitContext):
 
-            mutationType = 5
-        if isinstance(tree, JavaParser.MethodBodyContext):
+                mutationType = 5
+            if isinstance(tree, JavaParser.MethodBodyContext):
 
-            mutationType = 7
-        if isinstance(tree, JavaParser.MethodDeclarationContext):
+                mutationType = 7
+            if isinstance(tree, JavaParser.MethodDeclarationContext):
 
-            mutationType = 9
-        if isinstance(tree, TerminalNodeImpl):
-            if tree.symbol.text == "return":
-                mutationType = 1
-                tree.parentCtx.mutationType = 1
-                tree.parentCtx.getChild(1).mutationType = 8
+                mutationType = 9
 
-        json_result = dict()
-        json_result["type"] = type(tree).__name__
         tree.nodeIndex = index
-        json_result["nodeIndex"] = index
-
         if (not hasattr(tree, "mutationType")):
             tree.mutationType = mutationType
         else:
             mutationType = tree.mutationType
-        json_result["mutationType"] = tree.mutationType
-
         tree.contextID = contextID
-        if (tree.getText() == "return"):
-            tree.node_depth = depth-1
-        else:
-            tree.node_depth = depth
-        json_result["contextID"] = contextID
-        if isinstance(tree, TerminalNodeImpl):
-            json_result["text"] = tree.getText()
-            tree.out_time = timer[0]
-            return (tree, json_result, index)
-        else:
+        return (contextID, mutationType)
+
+    @staticmethod
+    def _numerifyJSON(tree):
+        json_result = dict()
+        json_result["type"] = type(tree).__name__
+        json_result["nodeIndex"] = tree.nodeIndex
+        json_result["mutationType"] = tree.mutationType
+        json_result["contextID"] = tree.contextID
+        if not isinstance(tree, TerminalNodeImpl):
             json_result["text"] = "None"
-        json_result["children"] = list()
+            json_result["children"] = list()
+        return json_result
 
-        try:
-            for child in tree.getChildren():
-                index += 1
-                (child, json_result_child, index) = self.numerify(
-                    child, index, contextID, mutationType, depth=depth+1, timer=timer
-                )
-                if (mutationType == 2 or mutationType == 5):
-                    if isinstance(child, TerminalNodeImpl):
-                        if (child.getText() == '=' or child.getText() == '|=' or child.getText() == '*=' or child.getText() == '/=' or child.getText() == '+=' or child.getText() == '^=' or child.getText() == '-=' or child.getText() == '(' or child.getText() == "new" or child.getText() == '['):
-                            mutationType = 0
-
-                json_result["children"].append(json_result_child)
-        except Exception as e:
-            print(e)
-        tree.out_time = timer[0]
-        timer[0] += 1
-        return (tree, json_result, index)
+    def indexNodes(self, tree):
+        """
+        Fills the NodeTable of a tree that was numbered elsewhere, such as a tree read from the parse cache.
+
+        :param tree:
+        :type tree:
+        :return:
+        :rtype: NodeTable
+        """
+        nodeTable = NodeTable()
+        stack = [(tree, None)]
+        while len(stack) > 0:
+            node, parent = stack.pop()
+            if hasattr(node, "nodeIndex"):
+                nodeTable.add(node, parent)
+            if not isinstance(node, TerminalNodeImpl) and node.children is not None:
+                stack.extend((child, node) for child in reversed(node.children))
+        return nodeTable
 
     def is_ancestor(self, node_parent, node_child):
         return node_parent.in_time <= node_child.in_time and node_child.out_time <= node_parent.out_time
@@ -223,6 +524,38 @@ class JavaParse(object):
 
         return resultList
 
+    def seekAllNodesOfTypes(self, tree, nodeTypes):
+        """
+        Does what seekAllNodes does for several node types at once, in a single walk of the tree.
+
+        :param tree:
+        :type tree:
+        :param nodeTypes:
+        :type nodeTypes: iterable
+        :return: the nodes of each type, in the order seekAllNodes returns them
+        :rtype: dict
+        """
+        resultLists = dict((nodeType, list()) for nodeType in nodeTypes)
+        # the result lists a node goes to, by the class of the node.
+        matchingLists = dict()
+        seekStack = [tree]
+
+        while len(seekStack) > 0:
+            node = seekStack.pop()
+            nodeClass = type(node)
+            if nodeClass not in matchingLists:
+                matchingLists[nodeClass] = [
+                    resultList for nodeType, resultList in resultLists.items() if isinstance(node, nodeType)
+                ]
+            for resultList in matchingLists[nodeClass]:
+                resultList.append(node)
+            try:
+                seekStack.extend(node.getChildren())
+            except AttributeError:
+                pass
+
+        return resultLists
+
     # Deprecated
     def seek(self, tree, type):
         """
@@ -292,6 +625,7 @@ class JavaParse(object):
 
     def findNodeInSubtree(tree, index, index_identifier="nodeIndex"):
         """
+        Finds a node by its nodeIndex in the NodeTable of the tree when it can, and walks the subtree otherwise.
 
         :param tree:
         :type tree:
@@ -300,6 +634,11 @@ class JavaParse(object):
         :return:
         :rtype:
         """
+        if index_identifier == "nodeIndex" and getattr(tree, "nodeTable", None) is not None:
+            node = tree.nodeTable.find(tree, index)
+            if node is not None:
+                return node
+
         stack = list()
         stack.append(tree)
 
@@ -327,6 +666,10 @@ class JavaParse(object):
         if index in self.lookupTable:
             return self.lookupTable[index]
 
+        nodeTable = getattr(tree, "nodeTable", None)
+        if nodeTable is not None and nodeTable.root is tree and nodeTable.isIntact():
+            return nodeTable.walk(self.lookupTable, index)
+
         stack = list()
         stack.append(tree)
 
@@ -395,21 +738,60 @@ class JavaParse(object):
         :return:
         :rtype:
         """
-        methodBodyList = self.seekAllNodes(tree, JavaParser.MethodBodyContext)
-        methodBodyList.extend(
-            self.seekAllNodes(tree, JavaParser.ConstructorBodyContext)
-        )
-
         lines = set()
 
-        for methodBody in methodBodyList:
-            terminalNodeList = self.seekAllNodes(methodBody, TerminalNodeImpl)
-            for terminalNode in terminalNodeList:
-                if terminalNode.symbol.line != None:
-                    lines.add(terminalNode.symbol.line)
+        for methodBody, methodLines, cyclomaticComplexity in self.getMethodBodyMetrics(tree):
+            lines.update(methodLines)
+        lines.discard(None)
 
         return sorted(lines)
 
+    def getMethodBodyMetrics(self, tree) -> list:
+        """
+        Walks a tree once, and measures each method and constructor body on the way: the lines of its tokens, and its
+        cyclomatic complexity as getCyclomaticComplexity counts it. The tokens of a nested body count for the bodies
+        around it as well.
+
+        :param tree:
+        :type tree:
+        :return: the method bodies and then the constructor bodies, each in the order seekAllNodes finds them, along
+            with their lines and cyclomatic complexity
+        :rtype: list
+        """
+        methodBodies = list()
+        constructorBodies = list()
+        openBodies = list()
+        # marks the end of the nodes of a body on the stack.
+        bodyEnd = object()
+        seekStack = [tree]
+
+        while len(seekStack) > 0:
+            node = seekStack.pop()
+            if node is bodyEnd:
+                openBodies.pop()
+                continue
+            if isinstance(node, TerminalNodeImpl):
+                isBranch = node.getText() in JavaParse.BRANCH_KEYWORDS
+                for body in openBodies:
+                    body[1].add(node.symbol.line)
+                    if isBranch:
+                        body[2] += 1
+                continue
+            if isinstance(node, JavaParser.MethodBodyContext) or isinstance(node, JavaParser.ConstructorBodyContext):
+                body = [node, set(), 1]
+                if isinstance(node, JavaParser.MethodBodyContext):
+                    methodBodies.append(body)
+                else:
+                    constructorBodies.append(body)
+                openBodies.append(body)
+                seekStack.append(bodyEnd)
+            try:
+                seekStack.extend(node.getChildren())
+            except AttributeError:
+                pass
+
+        return [tuple(body) for body in methodBodies + constructorBodies]
+
     def getLinesOfCodePerMethod(self, tree: JavaParser.CompilationUnitContext) -> dict:
         """
 
@@ -418,19 +800,9 @@ class JavaParse(object):
         :return:
         :rtype:
         """
-        methodBodyList = self.seekAllNodes(tree, JavaParser.MethodBodyContext)
-        methodBodyList.extend(
-            self.seekAllNodes(tree, JavaParser.ConstructorBodyContext)
-        )
-
         linesOfCodePerMethod = dict()
 
-        for methodBody in methodBodyList:
-            lines = set()
-            terminalNodeList = self.seekAllNodes(methodBody, TerminalNodeImpl)
-            for terminalNode in terminalNodeList:
-                lines.add(terminalNode.symbol.line)
-
+        for methodBody, lines, cyclomaticComplexity in self.getMethodBodyMetrics(tree):
             linesOfCodePerMethod[
                 self.getMethodNameForNode(tree, methodBody.nodeIndex)
             ] = len(lines)
@@ -439,6 +811,8 @@ class JavaParse(object):
 
     def getText(self, tree: RuleContext):
         """
+        Writes the tokens of a tree in order, separated by spaces, except after the angle brackets of type arguments.
+        The tree is walked with a stack, so the time is linear in its size.
 
         :param tree:
         :type tree:
@@ -449,21 +823,26 @@ class JavaParse(object):
             return None
 
         resultList = []
-        childQueue = [tree]
+        childStack = [tree]
 
-        while len(childQueue) > 0:
-            child = childQueue.pop(0)
+        while len(childStack) > 0:
+            child = childStack.pop()
 
             if isinstance(child, TerminalNodeImpl):
-                if (str(child.getText()) != ">" and str(child.getText()) != "<"):
-                    resultList.append(str(child.getText()+" "))
+                text = child.getText()
+                if (str(text) != ">" and str(text) != "<"):
+                    resultList.append(str(text + " "))
                 else:
-                    resultList.append(str(child.getText()))
+                    resultList.append(str(text))
+                continue
 
             try:
-                childQueue[0:0] = child.getChildren()
+                children = list(child.getChildren())
             except AttributeError:
-                pass
+                continue
+            # the first child is popped first.
+            children.reverse()
+            childStack.extend(children)
 
         return "".join(resultList)
 
@@ -527,30 +906,42 @@ class JavaParse(object):
         """
         methodName = None
         node = self.getNode(tree, nodeIndex)
-        methodDeclaration = self.seekFirstMatchingParent(
-            node, JavaParser.MethodDeclarationContext
+        nodeTable = getattr(node, "nodeTable", None)
+        byInterval = (
+            nodeTable is not None
+            and nodeTable.isIntact()
+            and nodeTable.timed
+            and nodeTable.nodes.get(getattr(node, "nodeIndex", None)) is node
         )
+        if byInterval:
+            # the declarations around the node are found by their intervals instead of climbing the tree.
+            seekParent = nodeTable.enclosing
+        else:
+            seekParent = lambda nodeType, node: self.seekFirstMatchingParent(node, nodeType)
+
+        methodDeclaration = seekParent(JavaParser.MethodDeclarationContext, node)
         if methodDeclaration is None:
-            methodDeclaration = self.seekFirstMatchingParent(
-                node, JavaParser.ConstructorDeclarationContext
-            )
+            methodDeclaration = seekParent(JavaParser.ConstructorDeclarationContext, node)
         if methodDeclaration is None:
             return "***not in a method***"
 
-        for index in range(0, len(methodDeclaration.children)):
-            if isinstance(
-                methodDeclaration.children[index], JavaParser.FormalParametersContext
-            ):
-                assert isinstance(
-                    methodDeclaration.children[index - 1], TerminalNodeImpl
-                )
-                methodName = methodDeclaration.children[
-                    index - 1
-                ].symbol.text + self.getText(methodDeclaration.children[index])
-
-        classDeclaration = self.seekFirstMatchingParent(
-            node, JavaParser.ClassDeclarationContext
-        )
+        if byInterval and "signature" in methodDeclaration.__dict__:
+            methodName = methodDeclaration.signature
+        else:
+            for index in range(0, len(methodDeclaration.children)):
+                if isinstance(
+                    methodDeclaration.children[index], JavaParser.FormalParametersContext
+                ):
+                    assert isinstance(
+                        methodDeclaration.children[index - 1], TerminalNodeImpl
+                    )
+                    methodName = methodDeclaration.children[
+                        index - 1
+                    ].symbol.text + self.getText(methodDeclaration.children[index])
+            if byInterval:
+                methodDeclaration.signature = methodName
+
+        classDeclaration = seekParent(JavaParser.ClassDeclarationContext, node)
         if classDeclaration is None:
             return methodName
 
@@ -641,15 +1032,10 @@ class JavaParse(object):
         assert isinstance(tree, JavaParser.CompilationUnitContext)
         cyclomaticComplexityPerMethod = dict()
 
-        methodBodyList = self.seekAllNodes(tree, JavaParser.MethodBodyContext)
-        methodBodyList.extend(
-            self.seekAllNodes(tree, JavaParser.ConstructorBodyContext)
-        )
-
-        for methodBody in methodBodyList:
+        for methodBody, lines, cyclomaticComplexity in self.getMethodBodyMetrics(tree):
             cyclomaticComplexityPerMethod[
                 self.getMethodNameForNode(tree, methodBody.nodeIndex)
-            ] = self.getCyclomaticComplexity(methodBody)
+            ] = cyclomaticComplexity
 
         return cyclomaticComplexityPerMethod
 
@@ -751,6 +1137,213 @@ class JavaParse(object):
         result = generate_dict(tree)
         return json.dumps(result, separators=(',', ': '))
 
+    def tree2Binary(self, tree):
+        """
+        Returns the tree in the binary format read by binary2Tree.
+
+        :param tree:
+        :type tree:
+        :return:
+        :rtype: bytes
+        """
+        return self.trees2Binary([tree])
+
+    def binary2Tree(self, data):
+        """
+
+        :param data: a tree written by tree2Binary
+        :type data: bytes
+        :return:
+        :rtype:
+        """
+        return self.binary2Trees(data)[0]
+
+    def trees2Binary(self, trees):
+        """
+        Serialises a list of trees into a compact binary form. The nodes of all trees are written in preorder as flat
+        arrays: the id of the node type, the position of the parent (-1 for a root), the text of terminal nodes as
+        an index into a string table, and a mask of the attributes the node has, followed by their values. Unlike
+        tree2JSON_DFS, it does not recurse, so deep trees are fine.
+
+        :param trees:
+        :type trees: list
+        :return:
+        :rtype: bytes
+        """
+        typeIDs = dict()
+        stringIDs = dict()
+        nodeTypes = array("i")
+        parents = array("i")
+        texts = array("i")
+        masks = bytearray()
+        stringMasks = bytearray()
+        values = array("q")
+        attributes = [(attribute, 1 << bit) for bit, attribute in enumerate(self.BINARY_TREE_ATTRIBUTES)]
+
+        stack = [(tree, -1) for tree in reversed(trees)]
+        while len(stack) > 0:
+            node, parent = stack.pop()
+            position = len(nodeTypes)
+            nodeType = node.__class__
+            if nodeType not in typeIDs:
+                typeIDs[nodeType] = len(typeIDs)
+            nodeTypes.append(typeIDs[nodeType])
+            parents.append(parent)
+
+            mask = 0
+            stringMask = 0
+            nodeAttributes = node.__dict__
+            for attribute, bit in attributes:
+                if attribute in nodeAttributes:
+                    value = nodeAttributes[attribute]
+                    mask |= bit
+                    if isinstance(value, str):
+                        stringMask |= bit
+                        value = stringIDs.setdefault(value, len(stringIDs))
+                    values.append(value)
+            masks.append(mask)
+            stringMasks.append(stringMask)
+
+            if isinstance(node, TerminalNodeImpl):
+                texts.append(stringIDs.setdefault(node.symbol.text, len(stringIDs)))
+            else:
+                texts.append(-1)
+                if node.children is not None:
+                    stack.extend((child, position) for child in reversed(node.children))
+
+        typeNames = [str(nodeType) for nodeType in typeIDs]
+        strings = list(stringIDs)
+        # the tables are stored as one text each, with the lengths (in characters) of their strings.
+        tables = list()
+        for table in (typeNames, strings):
+            lengths = array("I", [len(string) for string in table])
+            tables.append((lengths, "".join(table).encode("utf-8", errors="surrogatepass")))
+        arrays = [nodeTypes, parents, texts, values, tables[0][0], tables[1][0]]
+        if sys.byteorder == "big":
+            for numbers in arrays:
+                numbers.byteswap()
+
+        body = b"".join(
+            [numbers.tobytes() for numbers in arrays]
+            + [bytes(masks), bytes(stringMasks), tables[0][1], tables[1][1]]
+        )
+        return self.BINARY_TREE_HEADER.pack(
+            self.BINARY_TREE_MAGIC,
+            self.BINARY_TREE_VERSION,
+            len(nodeTypes),
+            len(values),
+            len(typeNames),
+            len(strings),
+            len(tables[0][1]),
+            len(tables[1][1]),
+        ) + zlib.compress(body, 1)
+
+    def binary2Trees(self, data):
+        """
+        Reads the trees written by trees2Binary.
+
+        :param data:
+        :type data: bytes
+        :return:
+        :rtype: list
+        """
+        data = bytes(data)
+        if len(data) < self.BINARY_TREE_HEADER.size or not data.startswith(self.BINARY_TREE_MAGIC):
+            raise ValueError("Not a binary tree. Run the mutation phase again to rebuild the database.")
+        (
+            magic,
+            version,
+            nodeCount,
+            valueCount,
+            typeCount,
+            stringCount,
+            typeBytes,
+            stringBytes,
+        ) = self.BINARY_TREE_HEADER.unpack_from(data)
+        if version != self.BINARY_TREE_VERSION:
+            raise ValueError("Unsupported binary tree version: " + str(version))
+        body = zlib.decompress(data[self.BINARY_TREE_HEADER.size:])
+
+        offset = 0
+        arrays = list()
+        for typeCode, count in (
+            ("i", nodeCount),
+            ("i", nodeCount),
+            ("i", nodeCount),
+            ("q", valueCount),
+            ("I", typeCount),
+            ("I", stringCount),
+        ):
+            numbers = array(typeCode)
+            size = numbers.itemsize * count
+            numbers.frombytes(body[offset:offset + size])
+            if sys.byteorder == "big":
+                numbers.byteswap()
+            arrays.append(numbers)
+            offset += size
+        nodeTypes, parents, texts, values, typeLengths, stringLengths = arrays
+        masks = body[offset:offset + nodeCount]
+        offset += nodeCount
+        stringMasks = body[offset:offset + nodeCount]
+        offset += nodeCount
+        tables = list()
+        for lengths, size in ((typeLengths, typeBytes), (stringLengths, stringBytes)):
+            text = body[offset:offset + size].decode("utf-8", errors="surrogatepass")
+            offset += size
+            ends = list(accumulate(lengths))
+            tables.append([text[start:end] for start, end in zip([0] + ends[:-1], ends)])
+        typeNames, strings = tables
+
+        if len(JavaParse.Class_dict) == 0:
+            self.generate_dict_of_classes()
+        classes = [JavaParse.Class_dict[typeName] for typeName in typeNames]
+        # the attributes a mask stands for, with the bit that tells whether the value is a string.
+        maskAttributes = [
+            [
+                (attribute, 1 << bit)
+                for bit, attribute in enumerate(self.BINARY_TREE_ATTRIBUTES)
+                if mask & (1 << bit)
+            ]
+            for mask in range(1 << len(self.BINARY_TREE_ATTRIBUTES))
+        ]
+
+        nodes = list()
+        roots = list()
+        valueIndex = 0
+        # the nodes are only referenced from the tree, so there is nothing for the garbage collector to find while
+        # they are created, and its passes over the new objects would take longer than creating them.
+        isGCEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            for position in range(nodeCount):
+                nodeClass = classes[nodeTypes[position]]
+                parent = parents[position]
+                parentNode = nodes[parent] if parent >= 0 else None
+                if texts[position] >= 0:
+                    symbol = Token()
+                    symbol.text = strings[texts[position]]
+                    node = nodeClass(symbol)
+                    node.parentCtx = parentNode
+                else:
+                    node = nodeClass(None, parentNode)
+                # the attributes are not slots, writing them to __dict__ skips the __setattr__ of terminal nodes.
+                nodeAttributes = node.__dict__
+                for attribute, bit in maskAttributes[masks[position]]:
+                    value = values[valueIndex]
+                    valueIndex += 1
+                    if stringMasks[position] & bit:
+                        value = strings[value]
+                    nodeAttributes[attribute] = value
+                if parentNode is None:
+                    roots.append(node)
+                else:
+                    parentNode.addChild(node)
+                nodes.append(node)
+        finally:
+            if isGCEnabled:
+                gc.enable()
+        return roots
+
     def tree2DOT(self, tree):
         """
 
@@ -152,7 +152,7 @@ class LineCoverage:
         tree.write(self.build_file_path)
 
     def add_tests_to_build_xml(
-        self, junit_target, report_path, covered_tests=None, subsumption=False
+        self, junit_target, report_path, covered_tests=None, subsumption=False, fail_fast=False
     ):
         if covered_tests is None:
             covered_tests = []
@@ -168,6 +168,10 @@ class LineCoverage:
             test_element = ET.Element("test")
             test_element.set("name", test[:ind])
             test_element.set("methods", test[ind + 1:])
+            if fail_fast:
+                # stop the junit task at the first failing test.
+                test_element.set("haltonfailure", "true")
+                test_element.set("haltonerror", "true")
             if subsumption:
                 os.makedirs(os.path.join(report_path, test), exist_ok=True)
                 test_element.set(
@@ -717,6 +721,43 @@ class LineCoverage:
     def restore_the_build_file(self):
         shutil.move(self.build_file_path + ".bak", self.build_file_path)
 
+    def copy_to(self, project_path):
+        """
+        Returns a LineCoverage object for a copy of the project located at project_path. The build file of the copy
+        is pointed to its own include file, so that parallel workers can select tests independently.
+        """
+        build_file_path = str(
+            os.path.join(
+                project_path,
+                os.path.relpath(
+                    os.path.abspath(self.build_file_path),
+                    os.path.abspath(self.project_path),
+                ),
+            )
+        )
+        line_coverage = LineCoverage(
+            project_path=project_path,
+            clover_db_extractor_path=self.clover_db_extractor_path,
+            build_file_path=build_file_path,
+            build_type=self.build_type,
+            sqlDB_path=self.sqlDB_path,
+            D_args=self.D_args,
+            runAllTests=self.runAllTests,
+            timeout=self.timeout,
+        )
+        line_coverage.include_file_add = str(
+            os.path.join(project_path, "LittleDarwinResults", "include-tests.txt")
+        )
+        os.makedirs(os.path.dirname(line_coverage.include_file_add), exist_ok=True)
+        Path(line_coverage.include_file_add).touch()
+        if self.include_file_add is not None:
+            with open(build_file_path, "r") as f:
+                data = f.read()
+            data = data.replace(self.include_file_add, line_coverage.include_file_add)
+            with open(build_file_path, "w") as f:
+                f.write(data)
+        return line_coverage
+
     def __del__(self):
         # ! I moved restoring the original file to another function because of parallel run (I have to test this modification later)
         if self.tree_clover != None:
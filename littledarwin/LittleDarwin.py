@@ -26,7 +26,9 @@
 
 import datetime
 import io
+import math
 import os
+import queue
 
 # import shelve
 import shutil
@@ -36,23 +38,31 @@ import time
 from pathlib import Path
 import glob
 from optparse import OptionParser
-from littledarwin.SharedFunctions import parse_junit_xml, timeoutAlternative
+from littledarwin.SharedFunctions import parse_junit_xml, timeoutAlternative, normalize_test_name
 import importlib_resources as resources
 
 from littledarwin import License
 from littledarwin.LineCoverage import LineCoverage
 from littledarwin.JavaIO import JavaIO
-from littledarwin.original.JavaMutate_test_selection import JavaMutate
 from littledarwin.SharedFunctions import return_build_file
 from littledarwin.SharedFunctions import return_D_arguments, getCommand
 from littledarwin.Database import Database
+from littledarwin.Workspace import Workspace
+from littledarwin.BuildBackend import BuildBackend
+from littledarwin.IncrementalBuild import IncrementalBuild
+from littledarwin.TestPrioritizer import TestPrioritizer
+from littledarwin.CoverageIndex import CoverageIndex
+from littledarwin.MutantSubsumption import MutantSubsumption
+from littledarwin.TestReportReader import TestReportReader
+from littledarwin.ParseCache import ParseCache
+from littledarwin.MutantGenerator import MutantGenerator
+from joblib import Parallel, delayed
 
 import networkx as nx
 import matplotlib.pyplot as plt
 from colorama import Fore, Style
 
 # LittleDarwin modules
-from littledarwin.JavaParse import JavaParse
 from littledarwin.ReportGenerator import ReportGenerator
 
 import re
@@ -62,6 +72,17 @@ class LittleDarwin:
     littleDarwinVersion = "0.10.7"
     sqlDBPath = ""
     LittleDarwinResultsPath = ""
+    backend = None
+    prioritizer = None
+    testTimes = None
+    coverageIndex = None
+    # the subsumption graph, kept up to date during the build phase when subsumption analysis is active.
+    subsumption = None
+    testReportReader = None
+    MUTANT_SURVIVED = "survived"
+    MUTANT_UNCOVERED = "uncovered"
+    MUTANT_KILLED_BY_BUILD = "build failure"
+    MUTANT_KILLED_BY_TEST = "test failure"
 
     def find_tests_run(text):
         pattern = r"Tests run: (\d+)"
@@ -150,7 +171,11 @@ class LittleDarwin:
         """
         # creating our module objects.
         javaIO = JavaIO(options.isVerboseActive)
-        javaParse = JavaParse(options.isVerboseActive)
+        parseCache = None
+        if options.parseCachePath != "***dummy***":
+            parseCache = ParseCache(
+                options.parseCachePath, options.parseCacheSize * 1024 * 1024, self.littleDarwinVersion
+            )
         totalMutantCount = 0
         totalMutationCount = 0
 
@@ -187,54 +212,60 @@ class LittleDarwin:
         averageDensityDict = dict()
         if mutationDatabase2 is not None:
             mutationDatabase2.delete_data("mutant")
+            # the test results of the old mutants would be attributed to the new ones.
+            mutationDatabase2.delete_data("mutant_test")
+            mutationDatabase2.delete_data("mutant_result")
             mutationDatabase2.delete_data("mutation")
-        # go through each file, parse it, calculate all mutations, and generate files accordingly.
-        mutants = dict()
+        enabledMutators = ["Traditional"]
+
+        if options.isNullCheck:
+            enabledMutators = ["Null"]
+
+        if options.isAll:
+            enabledMutators = ["All"]
+
+        if options.isMethodLevel:
+            enabledMutators = ["Method"]
+
+        mutantGenerator = MutantGenerator(
+            javaIO,
+            enabledMutators,
+            higherOrder,
+            self.littleDarwinVersion,
+            parseCache,
+            options.numberOfJobs,
+            options.isVerboseActive,
+        )
+        # all the rows are written in one transaction.
+        mutationDatabase2.begin_transaction()
         for srcFile in javaIO.fileList:
+            mutationDatabase2.insert_file(srcFile)
+        fileIDs = dict()
+        for fileID, fileName in sorted(mutationDatabase2.fetch_data("file", columns="id, name")):
+            fileIDs.setdefault(fileName, fileID)
+
+        # go through each file, parse it, and calculate all mutations in the workers. the ids are assigned here, in
+        # the order of the files, and then the workers generate the files accordingly.
+        mutatedFiles = list()
+        loadedTrees = 0
+        for result in mutantGenerator.map(mutantGenerator.gatherFile, javaIO.fileList):
+            srcFile = result["file"]
             print(
                 "\n(" + str(fileCounter + 1) + "/" +
                 str(fileCount) + ") Source file: ",
                 srcFile,
             )
-            targetList = list()
-            mutationDatabase2.insert_file(srcFile)
-            try:
-                # parsing the source file into a tree.
-                sourceCode = javaIO.getFileContent(srcFile)
-                tree = javaParse.parse(sourceCode)
-                # a = javaParse.tree2JSON_DFS(tree)
-                # f = open("C:/img/treetostring.json", "w")
-                # f.write(repr(a))
-                # f.close()
-
-            except Exception as e:
+            if result["error"] is not None:
                 print("Error in parsing Java code, skipping the file.")
-                sys.stderr.write(str(e))
+                sys.stderr.write(result["error"])
                 continue
 
             fileCounter += 1
+            if result["loadedFromCache"]:
+                loadedTrees += 1
 
-            enabledMutators = ["Traditional"]
-
-            if options.isNullCheck:
-                enabledMutators = ["Null"]
-
-            if options.isAll:
-                enabledMutators = ["All"]
-
-            if options.isMethodLevel:
-                enabledMutators = ["Method"]
-
-            # apply mutations on the tree and receive the resulting mutants as a list of strings, and a detailed
-            # list of which operators created how many mutants.
-
-            javaMutate = JavaMutate(
-                tree, sourceCode, javaParse, srcFile, options.isVerboseActive
-            )
-            # gather mutations
-            mutantTypes = javaMutate.gatherMutations(
-                enabledMutators, mutationDatabase2, totalMutationCount
-            )
+            javaMutate = result["javaMutate"]
+            mutantTypes = result["mutantTypes"]
             print("--> Mutations found: ", len(javaMutate.mutations))
             for mutantType in mutantTypes.keys():
                 if mutantTypes[mutantType] > 0:
@@ -242,53 +273,41 @@ class LittleDarwin:
                 mutantTypeDatabase[mutantType] = mutantTypes[
                     mutantType
                 ] + mutantTypeDatabase.get(mutantType, 0)
-            totalMutationCount += len(javaMutate.mutations)
-            mutants[srcFile] = javaMutate.gatherAllMutantsUpToTheOrderOf(
-                cur_order=1,
-                order=higherOrder,
-                mutations=javaMutate.mutations,
-                generated_mutants=[],
-                id_counter=totalMutantCount,
-            )
-            javaMutate.mutants = mutants[srcFile]
+
+            MutantGenerator.assignIDs(javaMutate, totalMutationCount, totalMutantCount)
+            for mutation in javaMutate.mutations:
+                mutationDatabase2.insert_mutation(
+                    mutation.mutationID,
+                    fileIDs[srcFile],
+                    mutation.nodeID,
+                    mutation.startPos,
+                    mutation.endPos,
+                    mutation.lineNumber,
+                    mutation.replacementText,
+                    mutation_operator_id=mutationDatabase2.fetch_operator_id(mutation.mutatorType),
+                )
+            for mutant in javaMutate.mutants:
+                for mutation in mutant.mutationList:
+                    mutationDatabase2.insert_mutant(
+                        mutant_id=mutant.mutantID,
+                        mutation_id=mutation.mutationID,
+                    )
             # go through all mutant types, and add them in total. also output the info to the user.
-            totalMutantCount += len(mutants[srcFile])
-            # for each mutant, generate the file, and add it to the list.
+            totalMutationCount += len(javaMutate.mutations)
+            totalMutantCount += len(javaMutate.mutants)
             fileRelativePath = os.path.relpath(srcFile, javaIO.sourceDirectory)
-            densityReport = javaMutate.aggregateReport(
-                self.littleDarwinVersion)
             averageDensityDict[fileRelativePath] = javaMutate.averageDensity
-            aggregateComplexity = javaIO.getAggregateComplexityReport(
-                javaMutate.mutantsPerMethod,
-                javaParse.getCyclomaticComplexityAllMethods(tree),
-                javaParse.getLinesOfCodePerMethod(tree),
-            )
-            # ind = 0
-            for mutatedFile in mutants[srcFile]:
-                line_numbers = []
-                for i in range(len(mutatedFile.mutationList)):
-                    mutationDatabase2.insert_mutant(
-                        mutant_id=mutatedFile.mutantID,
-                        mutation_id=mutatedFile.mutationList[i].mutationID,
-                    )
-                    line_numbers.append(mutatedFile.mutationList[i].lineNumber)
-                mutatedFile.mutateCode()
-                targetList.append(
-                    (
-                        javaIO.generateNewFile(
-                            srcFile,
-                            mutatedFile,
-                            javaMutate.mutantsPerLine,
-                            densityReport,
-                            aggregateComplexity,
-                        ),
-                        line_numbers,
-                    )
-                )
-
-            del javaMutate
+            mutatedFiles.append(result)
 
+        mutationDatabase2.commit_transaction()
         mutationDatabase2.close_connection()
+        # for each mutant, generate the file.
+        for _ in mutantGenerator.map(mutantGenerator.writeMutants, mutatedFiles):
+            pass
+        if parseCache is not None:
+            # the workers add their entries to the cache on their own.
+            parseCache.checkSize()
+            print("\nParse cache: " + str(loadedTrees) + " trees loaded, " + str(fileCounter - loadedTrees) + " files parsed.")
         print("\nTotal mutations found: ", totalMutationCount)
         print("Total mutant found: ", totalMutantCount)
         if totalMutantCount == 0:
@@ -467,45 +486,86 @@ class LittleDarwin:
                 + " to find out why this happened."
             )
             sys.exit(3)
-        totalMutantCount = 0
-        totalMutantCounter = 0
+        self.backend = BuildBackend.create(options, self.LittleDarwinResultsPath)
+        if options.backend != "build":
+            print("Preparing the " + options.backend + " backend...", end=" ", flush=True)
+            if not self.backend.prepare(buildDir):
+                print("failed.\n")
+                sys.exit(3)
+            print("done.\n")
+        if options.isCoverageActive == True:
+            self.coverageIndex = CoverageIndex(mutationDatabase2)
+        if options.isPrioritizationActive == True:
+            self.prioritizer = TestPrioritizer(mutationDatabase2)
+        if options.isAdaptiveTimeoutActive == True:
+            self.testTimes = self.recordBaselineTestTimes(
+                mutationDatabase2, {buildDir, testDir if separateTestSuite else buildDir}
+            )
+            print(
+                "Baseline timings found for " + str(len(self.testTimes)) + " tests.\n"
+            )
+
         totalMutantCount = mutationDatabase2.fetch_mutated_files_count()
+        totalMutantCounter = 0
 
         startTime = time.time()
-        # running the build system for each mutant.
         search_time = 0
         prepare_build_time = 0
         tests_run_dict = dict()
-        for key in databaseKeys:
-            fileCounter += 1
 
+        # mutants are evaluated in workspaces. with a single job the project itself is the only workspace, otherwise
+        # every worker gets its own copy of the project, so that they don't overwrite each other's files.
+        mainWorkspace = Workspace(
+            buildDir, testDir if separateTestSuite else None, line_coverage
+        )
+        workspacesPath = os.path.abspath(
+            os.path.join(self.LittleDarwinResultsPath, "workspaces")
+        )
+        numberOfJobs = max(1, int(options.numberOfJobs))
+        if numberOfJobs > 1 and not (
+            mainWorkspace.contains(mainWorkspace.testDir)
+            and all(mainWorkspace.contains(key[0]) for key in databaseKeys)
+        ):
             print(
-                "("
-                + str(fileCounter)
-                + "/"
-                + str(mutationDatabaseLength)
-                + ") collecting results for ",
-                key[0],
+                "Source files and test project must be inside the build directory to run parallel jobs. Using a single job."
+            )
+            numberOfJobs = 1
+        if numberOfJobs > 1:
+            print(
+                "Creating " + str(numberOfJobs) + " worker workspaces...",
+                end=" ",
                 flush=True,
             )
-
-            mutantCount = key[1]
-            mutantCounter = 0
-
-            survivedList = list()
-            killedList = list()
-            uncoveredList = list()
-            buildFailureList = list()
-            testFailureList = list()
-
-            mutants = mutationDatabase2.fetch_file_mutant(key[0])
-
-            for mutant_file in mutants:
-
-                processBuildKilled = None
-                processBuildExitCode = None
-                processTestKilled = None
-                processTestExitCode = None
+            workspaces = Workspace.createWorkerWorkspaces(
+                mainWorkspace, workspacesPath, numberOfJobs
+            )
+            print("done.\n")
+        else:
+            workspaces = [mainWorkspace]
+        for workspace in workspaces:
+            self.backend.setUpWorkspace(workspace)
+
+        # the verdict of every mutant is committed as soon as it is known. when resuming, the mutants that already
+        # have one are not evaluated again.
+        finishedResults = dict()
+        if options.isResumeActive == True:
+            finishedResults = mutationDatabase2.fetch_mutant_results()
+        else:
+            mutationDatabase2.delete_data("mutant_result")
+        resumedResults = list()
+        if options.isSubsumptionActive:
+            # the test results are read into mutant_test as soon as a mutant is done, and the subsumption graph
+            #  grows with them, instead of reading all of them in the subsumption analysis phase.
+            self.subsumption = MutantSubsumption()
+            if options.isResumeActive != True:
+                mutationDatabase2.delete_data("mutant_test")
+
+        # fetch the mutants from the database, along with the tests that cover each of them.
+        mutantJobs = list()
+        for fileIndex, key in enumerate(databaseKeys):
+            for mutantIndex, mutant_file in enumerate(
+                mutationDatabase2.fetch_file_mutant(key[0])
+            ):
                 replacementFile = os.path.join(
                     mutantsPath,
                     os.path.relpath(
@@ -513,262 +573,130 @@ class LittleDarwin:
                     ),
                     str(mutant_file[1]) + ".java",
                 )
+                if mutant_file[1] in finishedResults:
+                    result = self.newResult(
+                        options,
+                        (
+                            fileIndex,
+                            mutantIndex,
+                            key[0],
+                            replacementFile,
+                            mutant_file[1],
+                            mutant_file[2],
+                            None,
+                        ),
+                    )
+                    (
+                        result["status"],
+                        result["testsRun"],
+                        result["compileTime"],
+                        result["prepareBuildTime"],
+                    ) = finishedResults[mutant_file[1]]
+                    resumedResults.append(result)
+                    continue
+                test_names = None
+                if options.isCoverageActive == True:
+                    s_time = time.time()
+                    test_names = self.selectTests(
+                        options, self.coverageIndex, key[0], mutant_file[2]
+                    )
+                    search_time += time.time() - s_time
+                mutantJobs.append(
+                    (
+                        fileIndex,
+                        mutantIndex,
+                        key[0],
+                        replacementFile,
+                        mutant_file[1],
+                        mutant_file[2],
+                        test_names,
+                    )
+                )
 
-                # replace the original file with the mutant
-                shutil.copyfile(replacementFile, key[0])
-                # let's make sure that runOutput is empty, and not None to begin with.
-                runOutput = str()
-                runOutputTest = str()
+        # running the build system for each mutant.
+        if numberOfJobs > 1:
+            workspacePool = queue.Queue()
+            for workspace in workspaces:
+                workspacePool.put(workspace)
+            parallel = Parallel(
+                n_jobs=numberOfJobs, prefer="threads", return_as="generator_unordered"
+            )
+            results = parallel(
+                delayed(self.buildMutantInPool)(options, workspacePool, mutantJob)
+                for mutantJob in mutantJobs
+            )
+        else:
+            results = (
+                self.buildMutant(options, mainWorkspace, mutantJob)
+                for mutantJob in mutantJobs
+            )
 
-                mutantCounter += 1
+        fileResults = [dict() for key in databaseKeys]
+        statusCount = dict()
+        for result in resumedResults:
+            fileResults[result["fileIndex"]][result["mutantIndex"]] = result
+            statusCount[result["status"]] = statusCount.get(result["status"], 0) + 1
+            compile_time += result["compileTime"]
+            prepare_build_time += result["prepareBuildTime"]
+            if result["testsRun"] is not None:
+                tests_run_dict[result["sourceFile"]] = (
+                    tests_run_dict.get(result["sourceFile"], 0) + result["testsRun"]
+                )
+        if len(resumedResults) > 0:
+            print("Resuming: " + str(len(resumedResults)) + " mutants already have a result.\n")
+        totalMutantCounter += len(resumedResults)
+        if self.subsumption is not None:
+            recordedMutants = {row[0] for row in mutationDatabase2.fetch_mutant_test_results()}
+            for result in resumedResults:
+                if result["mutantID"] not in recordedMutants:
+                    self.updateMutationTestTable(
+                        options, mutationDatabase2, file_name=result["sourceFile"], mutant_id=result["mutantID"]
+                    )
+            killingTests = dict()
+            for mutant_id, test_id in mutationDatabase2.fetch_killing_tests():
+                killingTests.setdefault(mutant_id, set()).add(test_id)
+            for mutant_id in sorted(killingTests.keys()):
+                self.subsumption.addMutant(mutant_id, killingTests[mutant_id])
+        try:
+            for result in results:
                 totalMutantCounter += 1
-                #  *************** uncomment for debugging purposes only ***************
-                # if (
-                #     key[0]!= "C:\\Users\\sajja\\Desktop\\THOMAS RESULTS\\commons-collections\\src\\main\\java\\org\\apache\\commons\\collections4\\ArrayStack.java"
-                # ):
-                #     continue
-
-                commandString = getCommand(options.buildCommand)
-                if separateTestSuite:
-                    testCommandString = getCommand(options.testCommand)
-                try:
-                    if options.isCoverageActive == False or (
-                        options.isCoverageActive == True and separateTestSuite == True
-                    ):
-
-                        s_time = time.time()
-                        processBuildKilled, processBuildExitCode, runOutput, time_delta = (
-                            timeoutAlternative(
-                                commandString,
-                                workingDirectory=buildDir,
-                                timeout=int(options.timeout),
-                                failMessage=options.fail_string,
-                            )
-                        )
-                        compile_time += time.time() - s_time
-                    elif (
-                        options.isCoverageActive == True and separateTestSuite == False
-                    ):
-
-                        lines = mutant_file[1]
-                        test_names = []
-                        s_time = time.time()
-                        test_names = mutationDatabase2.fetch_coverage(
-                            key[0], lines)
-                        search_time += time.time() - s_time
-
-                        # there is no instrumentation for this line, so we should run all
-                        if len(test_names) == 0:
-                            test_names = [""]
-
-                        while ("-",) in test_names:
-                            test_names.remove(("-",))
-
-                        if len(test_names) != 0:
-                            # print(replacementFile + "-test_reports")
-                            if getCommand(options.buildCommand)[0].endswith("mvn"):
-                                commandString.append("-DfailIfNoTests=false")
-                                s_time = time.time()
-                                line_coverage.add_tests_to_pom_xml(
-                                    include_tests_file=line_coverage.include_file_add,
-                                    report_path=replacementFile + "-test_reports",
-                                    covered_tests=test_names,
-                                    subsumption=options.isSubsumptionActive,
-                                )
-                                prepare_build_time += time.time() - s_time
-
-                            elif getCommand(options.buildCommand)[0].endswith("ant"):
-                                test_names = mutationDatabase2.fetch_all_coverage()
-                                s_time = time.time()
-                                line_coverage.add_tests_to_build_xml(
-                                    junit_target=options.junitTargetName,
-                                    report_path=replacementFile + "-test_reports",
-                                    covered_tests=test_names,
-                                    subsumption=options.isSubsumptionActive,
-                                )
-                                prepare_build_time += time.time() - s_time
-                            # TODO to be implemented for gradle
-                            # elif(options.buildCommand.split(",")[0] == "gradle"):
-                            #     line_coverage.add_tests_to_gradle(
-                            #         build_gradle_file=os.path.join(options.buildPath, "build.gradle"),
-                            #         junit_target=options.junitTargetName,
-                            #         covered_tests=test_names,
-                            #     )
-                            s_time = time.time()
-                            (
-                                processBuildKilled,
-                                processBuildExitCode,
-                                runOutput,
-                                time_delta
-                            ) = timeoutAlternative(
-                                commandString,
-                                workingDirectory=buildDir,
-                                timeout=int(options.timeout),
-                                failMessage=options.fail_string,
-                            )
-                            compile_time += time.time() - s_time
-                        else:
-                            processTestKilled = False
-                            processTestExitCode = 0
-                            runOutput = "not covered"
-                            uncoveredList.append(
-                                os.path.basename(replacementFile))
-                    # raise the same exception as the original check_output.
-                    if processBuildKilled or processBuildExitCode:
-                        buildFailureList.append(
-                            os.path.basename(replacementFile))
-                        raise subprocess.CalledProcessError(
-                            1 if processBuildKilled else processBuildExitCode,
-                            commandString,
-                            runOutput,
-                        )
-
-                    if separateTestSuite and options.isCoverageActive == False:
-                        s_time = time.time()
-                        (
-                            processTestKilled,
-                            processTestExitCode,
-                            runOutputTest,
-                            time_delta
-                        ) = timeoutAlternative(
-                            testCommandString,
-                            workingDirectory=testDir,
-                            timeout=int(options.timeout),
-                            failMessage=options.fail_string,
-                        )
-                        compile_time += time.time() - s_time
-                        # raise the same exception as the original check_output.
-                        if processTestKilled or processTestExitCode:
-                            out = LittleDarwin.find_tests_run(runOutputTest)
-                            out = [int(numeric_string)
-                                   for numeric_string in out]
-                            if mutant_file[0] not in tests_run_dict:
-                                tests_run_dict[mutant_file[0]] = 0
-                            tests_run_dict[mutant_file[0]] += sum(out)
-                            testFailureList.append(
-                                os.path.basename(replacementFile))
-                            raise subprocess.CalledProcessError(
-                                1 if processTestKilled else processTestExitCode,
-                                commandString,
-                                "\n".join(
-                                    [
-                                        runOutput,
-                                        "-----------------------------------------",
-                                        runOutputTest,
-                                    ]
-                                ),
-                                "utf-8",
-                            )
-                    elif separateTestSuite and options.isCoverageActive == True:
-                        lines = mutant_file[2]
-                        s_time = time.time()
-                        test_names = mutationDatabase2.fetch_coverage(
-                            key[0], lines)
-                        search_time += time.time() - s_time
-
-                        # there is no instrumentation for this line, so we should run all
-                        if len(test_names) == 0:
-                            test_names = [""]
-
-                        while ("-",) in test_names:
-                            test_names.remove(("-",))
-
-                        if len(test_names) != 0:
-                            # print(replacementFile + "-test_reports")
-                            if getCommand(options.buildCommand)[0].endswith("mvn"):
-                                testCommandString.append(
-                                    "-DfailIfNoTests=false")
-                                s_time = time.time()
-                                line_coverage.add_tests_to_pom_xml(
-                                    include_tests_file=line_coverage.include_file_add,
-                                    report_path=replacementFile + "-test_reports",
-                                    covered_tests=test_names,
-                                    subsumption=options.isSubsumptionActive,
-                                )
-                                prepare_build_time += time.time() - s_time
-                            elif getCommand(options.buildCommand)[0].endswith("ant"):
-                                test_names = mutationDatabase2.fetch_all_coverage()
-                                s_time = time.time()
-                                line_coverage.add_tests_to_build_xml(
-                                    junit_target=options.junitTargetName,
-                                    report_path=replacementFile + "-test_reports",
-                                    covered_tests=test_names,
-                                    subsumption=options.isSubsumptionActive,
-                                )
-                                prepare_build_time += time.time() - s_time
-                            # TODO to be implemented for gradle
-                            # elif(options.buildCommand.split(",")[0] == "gradle"):
-                            #     line_coverage.add_tests_to_gradle(
-                            #         build_gradle_file=os.path.join(options.buildPath, "build.gradle"),
-                            #         junit_target=options.junitTargetName,
-                            #         covered_tests=test_names,
-                            #     )
-                            s_time = time.time()
-                            (
-                                processTestKilled,
-                                processTestExitCode,
-                                runOutputTest,
-                                time_delta
-                            ) = timeoutAlternative(
-                                testCommandString,
-                                workingDirectory=buildDir,
-                                timeout=int(options.timeout),
-                                failMessage=options.fail_string,
-                            )
-                            shutil.copy2(line_coverage.include_file_add,
-                                         os.path.join(mutantsPath,  os.path.relpath(os.path.relpath(mutant_file[0]), options.sourcePath), str(mutant_file[1])+".include"))
-                            compile_time += time.time() - s_time
-                            if processTestKilled or processTestExitCode:
-                                out = LittleDarwin.find_tests_run(
-                                    runOutputTest)
-                                out = [int(numeric_string)
-                                       for numeric_string in out]
-                                if mutant_file[0] not in tests_run_dict:
-                                    tests_run_dict[mutant_file[0]] = 0
-                                tests_run_dict[mutant_file[0]] += sum(out)
-                                testFailureList.append(
-                                    os.path.basename(replacementFile)
-                                )
-                                raise subprocess.CalledProcessError(
-                                    1 if processTestKilled else processTestExitCode,
-                                    commandString,
-                                    "\n".join(
-                                        [
-                                            runOutput,
-                                            "-----------------------------------------",
-                                            runOutputTest,
-                                        ]
-                                    ),
-                                    "utf-8",
-                                )
-                        else:
-                            processTestKilled = False
-                            processTestExitCode = 0
-                            runOutputTest = "not covered"
-                            uncoveredList.append(
-                                os.path.basename(replacementFile))
-                    # if we are here, it means no exceptions happened, so lets add this to our success list.
-                    runOutput = (
-                        runOutput
-                        + "\n ----------------------------------------- \n"
-                        + runOutputTest
+                mutationDatabase2.insert_mutant_result(
+                    result["mutantID"],
+                    result["status"],
+                    result["testsRun"],
+                    result["compileTime"],
+                    result["prepareBuildTime"],
+                )
+                if len(fileResults[result["fileIndex"]]) == 0 and numberOfJobs == 1:
+                    print(
+                        "\n("
+                        + str(result["fileIndex"] + 1)
+                        + "/"
+                        + str(mutationDatabaseLength)
+                        + ") collecting results for ",
+                        result["sourceFile"],
+                        flush=True,
+                    )
+                fileResults[result["fileIndex"]][result["mutantIndex"]] = result
+                if self.subsumption is not None:
+                    self.updateMutationTestTable(
+                        options, mutationDatabase2, file_name=result["sourceFile"], mutant_id=result["mutantID"]
+                    )
+                    self.recordSubsumption(mutationDatabase2, result["mutantID"])
+                if self.prioritizer is not None and len(result["killingTests"]) > 0:
+                    self.prioritizer.recordKill(
+                        result["sourceFile"],
+                        result["mutantID"],
+                        result["lines"],
+                        result["killingTests"],
+                    )
+                statusCount[result["status"]] = statusCount.get(result["status"], 0) + 1
+                compile_time += result["compileTime"]
+                prepare_build_time += result["prepareBuildTime"]
+                if result["testsRun"] is not None:
+                    tests_run_dict[result["sourceFile"]] = (
+                        tests_run_dict.get(result["sourceFile"], 0) + result["testsRun"]
                     )
-                    if uncoveredList == []:
-                        survivedList.append(os.path.basename(replacementFile))
-                    elif uncoveredList[-1] != os.path.basename(replacementFile):
-                        survivedList.append(os.path.basename(replacementFile))
-                # putting two exceptions in one except clause, specially when one of them is not defined on some
-                # platforms does not look like a good idea; even though both of them do exactly the same thing.
-                except subprocess.CalledProcessError as exception:
-                    runOutput = exception.output
-                    # oops, error. let's add this to failure list.
-                    killedList.append(os.path.basename(replacementFile))
-                    # buildFailureList.append(os.path.basename(replacementFile))
-
-                targetTextOutputFile = os.path.splitext(replacementFile)[
-                    0] + ".txt"
-                targetXMLOutputFile = os.path.splitext(replacementFile)[
-                    0] + ".xml"
 
                 print(
                     "elapsed: "
@@ -777,7 +705,10 @@ class LittleDarwin:
                     + str(
                         datetime.timedelta(
                             seconds=int(
-                                (float(time.time() - startTime) / totalMutantCounter)
+                                (
+                                    float(time.time() - startTime)
+                                    / (totalMutantCounter - len(resumedResults))
+                                )
                                 * float(totalMutantCount - totalMutantCounter)
                             )
                         )
@@ -786,34 +717,53 @@ class LittleDarwin:
                     + str(totalMutantCounter)
                     + "/"
                     + str(totalMutantCount)
-                    + " current: "
-                    + str(mutantCounter)
-                    + "/"
-                    + str(mutantCount)
                     + " *** survived: "
-                    + str(len(survivedList))
+                    + str(statusCount.get(self.MUTANT_SURVIVED, 0))
                     + " - killed: "
-                    + str(len(killedList))
+                    + str(
+                        statusCount.get(self.MUTANT_KILLED_BY_BUILD, 0)
+                        + statusCount.get(self.MUTANT_KILLED_BY_TEST, 0)
+                    )
                     + " - uncovered: "
-                    + str(len(uncoveredList))
+                    + str(statusCount.get(self.MUTANT_UNCOVERED, 0))
+                    + (
+                        ""
+                        if self.subsumption is None
+                        else " - dominators: " + str(len(self.subsumption.dominatorMutants()))
+                    )
                     + "         \r",
                     end="\r",
                     flush=True,
                 )
+        finally:
+            for workspace in workspaces:
+                self.backend.tearDownWorkspace(workspace)
+            if numberOfJobs > 1:
+                Workspace.removeWorkerWorkspaces(workspacesPath)
+        print("\n\n")
+
+        for fileIndex, key in enumerate(databaseKeys):
+            if len(fileResults[fileIndex]) == 0:
+                continue
+            mutantCount = len(fileResults[fileIndex])
+            survivedList = list()
+            killedList = list()
+            uncoveredList = list()
+            buildFailureList = list()
+            testFailureList = list()
 
-                # writing the build output to disk.
-                with open(targetTextOutputFile, "w") as contentFile:
-                    contentFile.write(str(runOutput))
-                if options.isCoverageActive == True:
-                    shutil.copyfile(
-                        line_coverage.build_file_path, targetXMLOutputFile)
-                # if there's a cleanup option, execute it. the results will be ignored because we don't want our process
-                #  to be interrupted if there's nothing to clean up.
-                if options.cleanUp != "***dummy***":
-                    subprocess.call(getCommand(options.cleanUp), cwd=buildDir)
-                    if separateTestSuite:
-                        subprocess.call(
-                            getCommand(options.cleanUp), cwd=testDir)
+            for mutantIndex in sorted(fileResults[fileIndex].keys()):
+                result = fileResults[fileIndex][mutantIndex]
+                if result["status"] == self.MUTANT_SURVIVED:
+                    survivedList.append(result["mutantName"])
+                elif result["status"] == self.MUTANT_UNCOVERED:
+                    uncoveredList.append(result["mutantName"])
+                elif result["status"] == self.MUTANT_KILLED_BY_BUILD:
+                    buildFailureList.append(result["mutantName"])
+                    killedList.append(result["mutantName"])
+                else:
+                    testFailureList.append(result["mutantName"])
+                    killedList.append(result["mutantName"])
 
             # append the information for this file to the reports.
             textReportData.append(
@@ -833,15 +783,8 @@ class LittleDarwin:
                 + "\r\n"
             )
 
-            # we are done with the file. let's return it to the original state.
-            shutil.copyfile(
-                os.path.join(os.path.dirname(
-                    replacementFile), "original.java"),
-                key[0],
-            )
-
             targetHTMLOutputFile = os.path.join(
-                os.path.dirname(replacementFile), "index.html"
+                os.path.dirname(result["mutantFile"]), "index.html"
             )
 
             with open(targetHTMLOutputFile, "w") as contentFile:
@@ -868,8 +811,6 @@ class LittleDarwin:
                     targetHTMLOutputFile,
                 ]
             )
-
-            print("\n\n")
         # write final text report.
         textReportData.append(
             str(datetime.timedelta(seconds=int(time.time() - startTime)))
@@ -910,182 +851,360 @@ class LittleDarwin:
                 )
             )
 
+    def selectTests(self, options, coverageIndex, fileName, lines):
+        """
+        Returns the tests that cover the mutated lines. An empty list means the mutant is not covered.
+
+        :param options:
+        :type options:
+        :param coverageIndex:
+        :type coverageIndex: CoverageIndex
+        :param fileName: the mutated source file
+        :type fileName: str
+        :param lines: comma separated line numbers of the mutant
+        :type lines: str
+        :return: list of test names (as tuples), or [""] if there is no coverage information
+        :rtype: list
+        """
+        bits, flags = coverageIndex.lookup(fileName, lines)
+
+        # there is no instrumentation for this line, so we should run all
+        if flags & CoverageIndex.NOT_INSTRUMENTED:
+            test_names = [""]
+        else:
+            # lines that are instrumented but not covered ("-") add no tests.
+            test_names = coverageIndex.tests(bits, flags)
+
+        if len(test_names) != 0 and getCommand(options.buildCommand)[0].endswith(
+            "ant"
+        ):
+            test_names = list(coverageIndex.allTestNames)
+        return test_names
+
+    def recordBaselineTestTimes(self, mutationDatabase, directories):
+        """
+        Reads the time each test took from the JUnit reports of the initial build (or the coverage run), and stores
+        them in the database.
+
+        :param mutationDatabase:
+        :type mutationDatabase: Database
+        :param directories: the directories the reports are searched in
+        :type directories: set
+        :return: test name -> time in seconds
+        :rtype: dict
+        """
+        testTimes = dict()
+        for directory in directories:
+            for xmlFile in glob.glob(
+                os.path.join(directory, "**", "TEST-*.xml"), recursive=True
+            ):
+                if "LittleDarwinResults" in Path(xmlFile).parts:
+                    continue
+                for name, testTime, failureMessage, errorMessage in parse_junit_xml(
+                    xmlFile
+                ):
+                    try:
+                        testTime = float(str(testTime).replace(",", ""))
+                    except ValueError:
+                        continue
+                    name = normalize_test_name(name)
+                    testTimes[name] = testTimes.get(name, 0.0) + testTime
+        if len(testTimes) == 0:
+            # the reports were cleaned up by the build, fall back to the timings of an earlier run.
+            return mutationDatabase.fetch_test_times()
+        mutationDatabase.insert_test_times(list(testTimes.items()))
+        return testTimes
+
+    def mutantTimeout(self, options, test_names):
+        """
+        Returns the timeout of a mutant: a multiple of the baseline time of the tests it runs, plus a constant. The
+        global timeout is used if adaptive timeouts are off or some of the tests have no baseline time, and it is
+        also the upper limit.
+
+        :param options:
+        :type options:
+        :param test_names: the selected tests, or None without coverage
+        :type test_names: list
+        :return: timeout in seconds
+        :rtype: int
+        """
+        timeout = int(options.timeout)
+        if self.testTimes is None or len(self.testTimes) == 0:
+            return timeout
+        if IncrementalBuild.selects_all_tests(test_names):
+            # all tests run for lines whose tests are not known.
+            baselineTime = sum(self.testTimes.values())
+        else:
+            baselineTime = 0.0
+            for test_name in test_names:
+                if test_name[0] == IncrementalBuild.NOT_COVERED_MARKER:
+                    continue
+                testName = normalize_test_name(test_name[0])
+                if testName not in self.testTimes:
+                    return timeout
+                baselineTime += self.testTimes[testName]
+        return min(
+            timeout,
+            int(
+                math.ceil(
+                    float(options.timeoutFactor) * baselineTime
+                    + float(options.timeoutConstant)
+                )
+            ),
+        )
+
+    def newResult(self, options, mutantJob):
+        """
+        :param options:
+        :type options:
+        :param mutantJob: file index, mutant index, source file, mutant file, mutant id, mutated lines, and the
+            selected tests
+        :type mutantJob: tuple
+        :return: the verdict of a mutant that is not evaluated yet
+        :rtype: dict
+        """
+        fileIndex, mutantIndex, sourceFile, replacementFile, mutantID, lines, test_names = mutantJob
+        return {
+            "fileIndex": fileIndex,
+            "mutantIndex": mutantIndex,
+            "sourceFile": sourceFile,
+            "mutantFile": replacementFile,
+            "mutantName": os.path.basename(replacementFile),
+            "mutantID": mutantID,
+            "lines": lines,
+            "status": None,
+            "testsRun": None,
+            "killingTests": [],
+            "timeout": int(options.timeout),
+            "compileTime": 0,
+            "prepareBuildTime": 0,
+        }
+
+    def buildMutantInPool(self, options, workspacePool, mutantJob):
+        """
+        Takes a free workspace from the pool, evaluates the mutant in it, and gives the workspace back.
+
+        :param options:
+        :type options:
+        :param workspacePool:
+        :type workspacePool: queue.Queue
+        :param mutantJob:
+        :type mutantJob: tuple
+        :return:
+        :rtype: dict
+        """
+        workspace = workspacePool.get()
+        try:
+            return self.buildMutant(options, workspace, mutantJob)
+        finally:
+            workspacePool.put(workspace)
+
+    def buildMutant(self, options, workspace, mutantJob):
+        """
+        Copies a mutant into the workspace, builds and tests it with the selected backend, writes the output next
+        to the mutant, and puts the original file back.
+
+        :param options:
+        :type options:
+        :param workspace:
+        :type workspace: Workspace
+        :param mutantJob: file index, mutant index, source file, mutant file, mutant id, mutated lines, and the
+            selected tests
+        :type mutantJob: tuple
+        :return: the verdict of the mutant and the time spent on it
+        :rtype: dict
+        """
+        (
+            fileIndex,
+            mutantIndex,
+            sourceFile,
+            replacementFile,
+            mutantID,
+            lines,
+            test_names,
+        ) = mutantJob
+        result = self.newResult(options, mutantJob)
+        if self.prioritizer is not None:
+            # ordered here and not when the jobs are created, so that kills seen so far are taken into account.
+            test_names = self.prioritizer.prioritize(sourceFile, mutantID, lines, test_names)
+        result["timeout"] = self.mutantTimeout(options, test_names)
+        targetFile = workspace.mapPath(sourceFile)
+        isUncovered = options.isCoverageActive == True and len(test_names) == 0
+
+        # replace the original file with the mutant
+        shutil.copyfile(replacementFile, targetFile)
+        try:
+            # let's make sure that runOutput is empty, and not None to begin with.
+            runOutput = str()
+            runOutputTest = str()
+
+            if isUncovered and not self.backend.buildsUncoveredMutants:
+                runOutput = "not covered"
+                result["status"] = self.MUTANT_UNCOVERED
+            else:
+                s_time = time.time()
+                processBuildKilled, processBuildExitCode, runOutput, time_delta = (
+                    self.backend.build(
+                        workspace, targetFile, replacementFile, test_names, result
+                    )
+                )
+                result["compileTime"] += time.time() - s_time
+                if processBuildKilled or processBuildExitCode:
+                    result["status"] = self.MUTANT_KILLED_BY_BUILD
+                elif isUncovered:
+                    runOutputTest = "not covered"
+                    result["status"] = self.MUTANT_UNCOVERED
+
+            if result["status"] is None:
+                s_time = time.time()
+                testResult = self.backend.test(
+                    workspace, targetFile, replacementFile, test_names, result
+                )
+                result["compileTime"] += time.time() - s_time
+                if testResult is not None:
+                    (
+                        processTestKilled,
+                        processTestExitCode,
+                        runOutputTest,
+                        time_delta,
+                    ) = testResult
+                    if processTestKilled or processTestExitCode:
+                        result["testsRun"] = sum(
+                            int(numeric_string)
+                            for numeric_string in LittleDarwin.find_tests_run(
+                                runOutputTest
+                            )
+                        )
+                        result["status"] = self.MUTANT_KILLED_BY_TEST
+                        if self.prioritizer is not None:
+                            result["killingTests"] = TestPrioritizer.findKillingTests(
+                                replacementFile + "-test_reports"
+                            )
+
+            if result["status"] == self.MUTANT_KILLED_BY_TEST:
+                runOutput = "\n".join(
+                    [
+                        runOutput,
+                        "-----------------------------------------",
+                        runOutputTest,
+                    ]
+                )
+            elif result["status"] != self.MUTANT_KILLED_BY_BUILD:
+                # if we are here, it means the mutant was not killed.
+                runOutput = (
+                    runOutput
+                    + "\n ----------------------------------------- \n"
+                    + runOutputTest
+                )
+                if result["status"] is None:
+                    result["status"] = self.MUTANT_SURVIVED
+
+            # writing the build output to disk.
+            with open(os.path.splitext(replacementFile)[0] + ".txt", "w") as contentFile:
+                contentFile.write(str(runOutput))
+            self.backend.saveArtifacts(workspace, replacementFile)
+            # if there's a cleanup option, execute it. the results will be ignored because we don't want our process
+            #  to be interrupted if there's nothing to clean up.
+            if options.cleanUp != "***dummy***":
+                subprocess.call(getCommand(options.cleanUp), cwd=workspace.buildDir)
+                if options.testCommand != "***dummy***":
+                    subprocess.call(
+                        getCommand(options.cleanUp), cwd=workspace.testDir
+                    )
+        finally:
+            # we are done with the mutant. let's return the file to the original state.
+            shutil.copyfile(
+                os.path.join(os.path.dirname(replacementFile), "original.java"),
+                targetFile,
+            )
+
+        return result
+
     def subsumptionAnalysisPhase(self, options: object) -> None:
+        if self.subsumption is not None:
+            # the build phase already read the test results of every mutant.
+            self.writeSubsumptionGraph(options, self.subsumption)
+            return
         mutationDatabase = Database(self.sqlDBPath)
-        mutationDatabase.delete_data("mutant_test")
-
-        self.updateMutationTestTable(options, mutationDatabase)
+        if options.isResumeActive == True:
+            # keep the test results read so far, only the remaining mutants are read from their reports.
+            self.updateMutationTestTable(
+                options,
+                mutationDatabase,
+                skip_mutants={row[0] for row in mutationDatabase.fetch_mutant_test_results()},
+            )
+        else:
+            mutationDatabase.delete_data("mutant_test")
+            self.updateMutationTestTable(options, mutationDatabase)
         self.createMutantTestMatrix(options, mutationDatabase)
 
-    def updateMutationTestTable(self, options: object, mutationDatabase, file_name=None, mutant_id=None) -> None:
+    def updateMutationTestTable(self, options: object, mutationDatabase, file_name=None, mutant_id=None,
+                                skip_mutants=None) -> None:
         if file_name == None and mutant_id == None:
             file_muants = mutationDatabase.fetch_mutants()
         else:
             file_muants = mutationDatabase.fetch_file_mutant_with_id(
                 file_name=file_name, mutant_id=mutant_id)
-        tests = mutationDatabase.fetch_data("test")
-        test_dict = {}
-        for test in tests:
-            # At this stage we do not need to have test case method or class separated
-            test = list(test)
-            test[1] = test[1].replace("$", ".")
-            test[1] = test[1].replace("#", ".")
-            test_dict[test[1]] = test[0]
-
-        def return_values(file, debug=False):
-            '''
-            return values to be inserted to the db later.
-            '''
-            nonlocal test_dict
-
-            if debug:
-                print_str = "extracting test data from: " + file
-                print("".join(["-"] * len(print_str)))
-                print(print_str)
-            xml_files.append(file)
-            results = parse_junit_xml(file)
-
-            values = []
-            for result in results:
-                test_res = Database.RES_ID_SURVIVED_MUTANT
-                error_msg = ""
-                if result[2] != "":
-                    error_msg = result[2]
-                    test_res = Database.RES_ID_KILLED_BY_FAILURE_MUTANT
-                elif result[3] != "":
-                    error_msg = result[3]
-                    test_res = Database.RES_ID_KILLED_BY_ERROR_MUTANT
-
-                if result[0] in test_dict:
-                    values.append((file_mutant[1],
-                                   test_dict[result[0]],
-                                   test_res,
-                                   result[1],
-                                   error_msg))
-                else:
-                    values.append((file_mutant[1],
-                                   str(Database.NO_TEST),
-                                   test_res,
-                                   result[1],
-                                   error_msg))
-            return values
-
-        for file_mutant in file_muants:
-            fileRelativePath = os.path.join(
-                self.LittleDarwinResultsPath,
-                os.path.relpath(file_mutant[0], options.sourcePath),
-            )
-            directory = str(
-                os.path.join(
-                    fileRelativePath,
-                    str(file_mutant[1]) + ".java-test_reports",
-                )
-            )
-            xml_files = []
-            if os.path.exists(directory):
-                values = []
-                for xml_file in glob.glob(str(os.path.join(directory, "**", "*.xml")), recursive=True):
-                    values_ = return_values(xml_file)
-                    values.extend(values_)
-                mutationDatabase.insert_many(
-                    "mutant_test", "mutant_id, test_id, result, time, message", values)
-            else:
-                mutationDatabase.insert_data(
-                    "mutant_test",
-                    "mutant_id, test_id, result, time, message",
-                    [
-                        file_mutant[1],
-                        Database.NO_INFO,
-                        Database.RES_ID_BUILD_FAILURE,
-                        "0",
-                        "no results found. Most probably compilation error.",
-                    ],
+        if skip_mutants is not None:
+            file_muants = [
+                file_mutant for file_mutant in file_muants if file_mutant[1] not in skip_mutants
+            ]
+        if self.testReportReader is None:
+            # the test table does not change once the tests are known.
+            self.testReportReader = TestReportReader(mutationDatabase, options.numberOfJobs)
+        self.testReportReader.readReports(
+            mutationDatabase,
+            [
+                (
+                    file_mutant[1],
+                    os.path.join(
+                        self.LittleDarwinResultsPath,
+                        os.path.relpath(file_mutant[0], options.sourcePath),
+                        str(file_mutant[1]) + ".java-test_reports",
+                    ),
                 )
-        # use this sql query to get the records of the mutants that have caused compilation errors:
-        # SELECT * FROM mutant_test join mutant on mutant.id=mutant_test.mutant_id join mutation on mutation.id=mutant.mutation_id join mutation_operator on mutation_operator.id=mutation.mutation_operator_id WHERE result=-1;
+                for file_mutant in file_muants
+            ],
+        )
 
     def createMutantTestMatrix(self, options: object, mutationDatabase) -> None:
-        mutant_tests = mutationDatabase.fetch_data(
-            "mutant_test", "*", "result!=" +
-            str(Database.RES_ID_SURVIVED_MUTANT) +
-            " AND result!="+str(Database.RES_ID_BUILD_FAILURE) +
-            " AND result!="+str(Database.RES_ID_UNCOVERED)
-        )  # exclude surviving and build failure and uncovered ones
         mutant_test_dict = {}
-        test_mutant_dict = {}
-        for mutant_test in mutant_tests:
-            if mutant_test[0] not in mutant_test_dict:
-                mutant_test_dict[mutant_test[0]] = set()
-            mutant_test_dict[mutant_test[0]].add(mutant_test[1])
-            if mutant_test[1] not in test_mutant_dict:
-                test_mutant_dict[mutant_test[1]] = set()
-            test_mutant_dict[mutant_test[1]].add(mutant_test[0])
-        G = nx.DiGraph()
-        for mutant in mutant_test_dict.keys():
-            for mutant2 in mutant_test_dict.keys():
-                if G.has_node(str(mutant)) == False:
-                    G.add_node(str(mutant))
-                    G.nodes[str(mutant)]["label"] = str(mutant)
-
-                if G.has_node(str(mutant2)) == False:
-                    G.add_node(str(mutant2))
-                    G.nodes[str(mutant2)]["label"] = str(mutant2)
-
-                if mutant_test_dict[mutant].issubset(mutant_test_dict[mutant2]):
-                    if (
-                        str(mutant) != str(mutant2)
-                        and G.has_edge(str(mutant), str(mutant2)) == False
-                    ):
-                        if (
-                            mutant_test_dict[mutant] == mutant_test_dict[mutant2]
-                        ):  # equal test sets
-                            G.add_edge(str(mutant), str(mutant2), color="red")
-                            print(
-                                Fore.RED + str(mutant) +
-                                " ---> " + str(mutant2),
-                            )
-                            print(
-                                str(mutant_test_dict[mutant])
-                                + " ---> "
-                                + str(mutant_test_dict[mutant2])
-                            )
-                            print(Style.RESET_ALL)
-                        else:  # subset test sets
-                            G.add_edge(str(mutant), str(mutant2), color="blue")
-                            print(
-                                Fore.BLUE + str(mutant) +
-                                " ---> " + str(mutant2),
-                            )
-                            print(
-                                str(mutant_test_dict[mutant])
-                                + " ---> "
-                                + str(mutant_test_dict[mutant2])
-                            )
-                            print(Style.RESET_ALL)
-                        print("-----------------------------------")
-
-        for node in G.nodes:
-            for edge in G.edges(node):
-                if G.edges[edge[0], edge[1]]["color"] == "red":
-                    G.nodes[edge[0]]["label"] = (
-                        G.nodes[edge[0]]["label"] + ", " +
-                        G.nodes[edge[1]]["label"]
-                    )
-                    G = nx.contracted_nodes(
-                        G, edge[0], edge[1], self_loops=False)
-
-        TR = nx.transitive_reduction(G)
+        for mutant_id, test_id in mutationDatabase.fetch_killing_tests():
+            if mutant_id not in mutant_test_dict:
+                mutant_test_dict[mutant_id] = set()
+            mutant_test_dict[mutant_id].add(test_id)
+        self.writeSubsumptionGraph(options, MutantSubsumption(mutant_test_dict))
 
-        mapping = {}
-        for node in TR.nodes:
-            if TR.in_degree(node) == 0:
-                TR.nodes[node]["color"] = "green"
-                print(Fore.GREEN + " d(" + str(node) + ") =" +
-                      str(G.out_degree(node)))
-            mapping[node] = G.nodes[node]["label"]
+    def recordSubsumption(self, mutationDatabase, mutant_id) -> None:
+        """
+        Adds a mutant to the subsumption graph kept during the build phase, once its test results are in mutant_test.
 
+        :param mutationDatabase:
+        :type mutationDatabase: Database
+        :param mutant_id:
+        :type mutant_id: int
+        """
+        killingTests = [row[1] for row in mutationDatabase.fetch_killing_tests(mutant_id)]
+        if len(killingTests) > 0:
+            self.subsumption.addMutant(mutant_id, killingTests)
+
+    def writeSubsumptionGraph(self, options: object, subsumption) -> None:
+        edges = subsumption.reducedEdges()
+        if options.isVerboseActive:
+            for source, target in edges:
+                print(Fore.BLUE + subsumption.label(source) + " ---> " + subsumption.label(target))
+            print(Style.RESET_ALL)
+        minimalClasses = subsumption.minimalClasses()
+        for classIndex in minimalClasses:
+            print(Fore.GREEN + " d(" + subsumption.label(classIndex) + ") =" +
+                  str(subsumption.subsumedCount(classIndex)))
         print(Style.RESET_ALL)
-        TR = nx.relabel_nodes(TR, mapping)
+        print(
+            "Subsumption: " + str(sum(len(mutants) for mutants in subsumption.classes)) + " killed mutants, " +
+            str(len(subsumption.classes)) + " equivalence classes, " + str(len(minimalClasses)) + " minimal."
+        )
+
+        TR = subsumption.toGraph(edges)
         dot_string_alt = nx.nx_pydot.to_pydot(TR).to_string()
 
         nx.write_gml(
@@ -1229,6 +1348,119 @@ class LittleDarwin:
             default=60,
             help="Timeout value for the build process.",
         )
+        optionParser.add_option(
+            "-j",
+            "--jobs",
+            "--jobs-no",
+            type="int",
+            action="store",
+            dest="numberOfJobs",
+            default=1,
+            help="Number of mutants to build and test in parallel. Each job works on its own copy of the build directory. The mutation phase mutates this many source files in parallel.",
+        )
+        optionParser.add_option(
+            "--backend",
+            type="choice",
+            choices=["build", "incremental", "direct"],
+            action="store",
+            dest="backend",
+            default="build",
+            help="How mutants are built and tested: 'build' runs the build system, 'incremental' compiles only the mutated class and runs the tests with JUnitCore, 'direct' compiles only the mutated class and runs the covered test methods with the JUnit console launcher. The last two need Maven.",
+        )
+        optionParser.add_option(
+            "--incremental",
+            action="store_true",
+            dest="isIncrementalActive",
+            default=False,
+            help="Same as --backend=incremental.",
+        )
+        optionParser.add_option(
+            "--junit-launcher",
+            action="store",
+            dest="junitLauncherPath",
+            default="***dummy***",
+            help="Path to junit-platform-console-standalone.jar for the direct backend (default: look for it in the test dependencies).",
+        )
+        optionParser.add_option(
+            "--test-daemon",
+            action="store_true",
+            dest="isTestDaemonActive",
+            default=False,
+            help="Keep a warm JVM per job that runs the tests of each mutant (requires the incremental or direct backend).",
+        )
+        optionParser.add_option(
+            "--prioritize-tests",
+            action="store_true",
+            dest="isPrioritizationActive",
+            default=False,
+            help="Run the covering tests that killed mutants on the same line, method or operator before the others (requires coverage).",
+        )
+        optionParser.add_option(
+            "--fail-fast",
+            action="store_true",
+            dest="isFailFastActive",
+            default=False,
+            help="Stop testing a mutant at the first failing test.",
+        )
+        optionParser.add_option(
+            "--adaptive-timeout",
+            action="store_true",
+            dest="isAdaptiveTimeoutActive",
+            default=False,
+            help="Derive the timeout of the test run of each mutant from the baseline time of the tests it runs (requires the incremental or direct backend). The global timeout is the upper limit.",
+        )
+        optionParser.add_option(
+            "--timeout-factor",
+            action="store",
+            dest="timeoutFactor",
+            default=5.0,
+            type="float",
+            help="Adaptive timeout: multiple of the baseline test time (default: 5).",
+        )
+        optionParser.add_option(
+            "--timeout-constant",
+            action="store",
+            dest="timeoutConstant",
+            default=10,
+            type="int",
+            help="Adaptive timeout: seconds added for starting up the JVM (default: 10).",
+        )
+        optionParser.add_option(
+            "--early-kill",
+            action="store_true",
+            dest="isEarlyKillActive",
+            default=False,
+            help="Stop the tests of a mutant as soon as their output shows a failing test.",
+        )
+        optionParser.add_option(
+            "--kill-pattern",
+            action="append",
+            dest="killPatterns",
+            default=None,
+            help="Additional regular expression that marks a failing test in the output (with --early-kill). Can be given several times.",
+        )
+        optionParser.add_option(
+            "--resume",
+            action="store_true",
+            dest="isResumeActive",
+            default=False,
+            help="Continue an interrupted build phase: mutants that already have a result are not evaluated again.",
+        )
+        optionParser.add_option(
+            "--parse-cache",
+            action="store",
+            dest="parseCachePath",
+            default="***dummy***",
+            help="Keep the parse trees of the source files in this directory, so that the files that did not change are not parsed again by the next mutation phase.",
+        )
+        optionParser.add_option(
+            "--parse-cache-size",
+            type="int",
+            action="store",
+            dest="parseCacheSize",
+            default=1024,
+            help="Size limit of the parse cache in megabytes. The least recently used trees are removed first (default: 1024).",
+        )
         optionParser.add_option(
             "--cleanup",
             action="store",
@@ -1317,6 +1549,36 @@ class LittleDarwin:
         if options.initial_timeout is None:
             options.initial_timeout = int(options.timeout) * 2
 
+        if options.isIncrementalActive and options.backend == "build":
+            options.backend = "incremental"
+        if options.backend != "build" and not getCommand(options.buildCommand)[
+            0
+        ].endswith("mvn"):
+            print("The " + options.backend + " backend is only supported for Maven projects.")
+            sys.exit(4)
+        if options.isTestDaemonActive and options.backend == "build":
+            print("The test daemon can only be used with the incremental or direct backend.")
+            sys.exit(4)
+        if options.isAdaptiveTimeoutActive and options.backend == "build":
+            # the build system starts up and compiles in the same command that runs the tests.
+            print("Adaptive timeouts can only be used with the incremental or direct backend.")
+            sys.exit(4)
+        if options.isPrioritizationActive and not options.isCoverageActive:
+            print("Test prioritization needs the coverage information (--code_coverage).")
+            sys.exit(4)
+        if (options.isFailFastActive or options.isEarlyKillActive) and options.isSubsumptionActive:
+            print(
+                "Subsumption analysis needs the result of every test, it can't be used with --fail-fast or --early-kill."
+            )
+            sys.exit(4)
+        if options.killPatterns is not None:
+            for killPattern in options.killPatterns:
+                try:
+                    re.compile(killPattern)
+                except re.error as e:
+                    print("Invalid --kill-pattern " + repr(killPattern) + ": " + str(e))
+                    sys.exit(4)
+
         if options.whitelist != "***dummy***" and options.blacklist != "***dummy***":
             print("You can either define a whitelist or a blacklist but not both.")
             sys.exit(4)
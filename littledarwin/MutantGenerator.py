@@ -0,0 +1,147 @@
+from joblib import Parallel, delayed
+
+from littledarwin.JavaIO import JavaIO
+from littledarwin.JavaParse import JavaParse
+from littledarwin.original.JavaMutate_test_selection import JavaMutate
+
+
+class MutantGenerator:
+    """
+    Generates the mutants of the source files, in a process pool when there are several jobs. A file is mutated in
+    two steps: gatherFile parses it and gathers its mutations and mutants, and once the ids are assigned by
+    assignIDs, writeMutants writes the mutant files and the reports of the file.
+
+    The ids depend on the number of mutations and mutants of the files before, so the parent assigns them in the
+    order of the files. The mutants are therefore the same, whatever the number of jobs.
+    """
+
+    # below this many files, starting the worker processes takes longer than mutating them.
+    POOL_THRESHOLD = 8
+
+    def __init__(
+        self, javaIO, metaTypes, higherOrder, littleDarwinVersion, parseCache=None, numberOfJobs=1, verbose=False
+    ):
+        """
+
+        :param javaIO: the JavaIO object that listed the source files
+        :type javaIO: JavaIO
+        :param metaTypes: the types of mutation operators to use
+        :type metaTypes: list
+        :param higherOrder: the order of the mutants
+        :type higherOrder: int
+        :param littleDarwinVersion:
+        :type littleDarwinVersion: str
+        :param parseCache:
+        :type parseCache: ParseCache
+        :param numberOfJobs: the number of processes that mutate the files
+        :type numberOfJobs: int
+        :param verbose:
+        :type verbose: bool
+        """
+        # the list of files is not sent to the workers with every file.
+        self.javaIO = JavaIO(verbose)
+        self.javaIO.sourceDirectory = javaIO.sourceDirectory
+        self.javaIO.targetDirectory = javaIO.targetDirectory
+        self.metaTypes = metaTypes
+        self.higherOrder = higherOrder
+        self.littleDarwinVersion = littleDarwinVersion
+        self.parseCache = parseCache
+        self.numberOfJobs = max(1, int(numberOfJobs))
+        self.verbose = verbose
+
+    def map(self, function, items):
+        """
+        Calls a function on each item, in the worker processes if there are enough items.
+
+        :param function:
+        :type function: callable
+        :param items:
+        :type items: list
+        :return: the results, in the order of the items
+        :rtype: iterable
+        """
+        if self.numberOfJobs > 1 and len(items) >= self.POOL_THRESHOLD:
+            return Parallel(n_jobs=self.numberOfJobs, return_as="generator")(delayed(function)(item) for item in items)
+        return (function(item) for item in items)
+
+    def gatherFile(self, srcFile):
+        """
+        Parses a source file, and gathers its mutations and mutants. They are numbered from zero.
+
+        :param srcFile:
+        :type srcFile: str
+        :return: the file, the error that kept it from being parsed, the JavaMutate object with the mutations and
+            mutants, the number of mutations of each type, the complexity report, and whether the tree was loaded
+            from the parse cache
+        :rtype: dict
+        """
+        result = {"file": srcFile, "error": None, "loadedFromCache": False}
+        javaParse = JavaParse(self.verbose)
+        try:
+            # parsing the source file into a tree.
+            sourceCode = self.javaIO.getFileContent(srcFile)
+            if self.parseCache is None:
+                tree = javaParse.parse(sourceCode)
+            else:
+                hits = self.parseCache.hits
+                tree = self.parseCache.parse(javaParse, sourceCode)
+                result["loadedFromCache"] = self.parseCache.hits > hits
+        except Exception as e:
+            result["error"] = str(e)
+            return result
+
+        # apply mutations on the tree and receive the resulting mutants as a list of strings, and a detailed
+        # list of which operators created how many mutants.
+        javaMutate = JavaMutate(tree, sourceCode, javaParse, srcFile, self.verbose)
+        result["mutantTypes"] = javaMutate.gatherMutations(self.metaTypes)
+        javaMutate.mutants = javaMutate.gatherAllMutantsUpToTheOrderOf(
+            cur_order=1,
+            order=self.higherOrder,
+            mutations=javaMutate.mutations,
+            generated_mutants=[],
+            id_counter=0,
+        )
+        result["aggregateComplexity"] = self.javaIO.getAggregateComplexityReport(
+            javaMutate.mutantsPerMethod,
+            javaParse.getCyclomaticComplexityAllMethods(tree),
+            javaParse.getLinesOfCodePerMethod(tree),
+        )
+        javaMutate.detach()
+        result["javaMutate"] = javaMutate
+        return result
+
+    @staticmethod
+    def assignIDs(javaMutate, firstMutationID, firstMutantID):
+        """
+        Numbers the mutations and mutants of a file after those of the files before it.
+
+        :param javaMutate:
+        :type javaMutate: JavaMutate
+        :param firstMutationID:
+        :type firstMutationID: int
+        :param firstMutantID:
+        :type firstMutantID: int
+        """
+        for mutationID, mutation in enumerate(javaMutate.mutations, firstMutationID):
+            mutation.mutationID = mutationID
+        for mutant in javaMutate.mutants:
+            mutant.mutantID += firstMutantID
+
+    def writeMutants(self, result):
+        """
+        Writes the mutant files of a source file, along with its reports.
+
+        :param result: a result of gatherFile, whose ids are assigned
+        :type result: dict
+        """
+        javaMutate = result["javaMutate"]
+        densityReport = javaMutate.aggregateReport(self.littleDarwinVersion)
+        for mutant in javaMutate.mutants:
+            mutant.mutateCode()
+            self.javaIO.generateNewFile(
+                result["file"],
+                mutant,
+                javaMutate.mutantsPerLine,
+                densityReport,
+                result["aggregateComplexity"],
+            )
@@ -0,0 +1,198 @@
+import itertools
+
+import networkx as nx
+
+
+class MutantSubsumption:
+    """
+    Computes the subsumption relation between killed mutants from the tests that kill them. Mutants killed by the
+    same tests form one equivalence class, and a class subsumes another if its tests are a proper subset of the
+    other's. The classes no other class subsumes are the dominators, that is the dynamic minimal mutant set.
+
+    Each class keeps its killing tests as a bitset over the tests, and the classes that contain a test are kept as
+    a bitset over the classes. For every class, the classes it subsumes and the classes subsuming it are kept as
+    bitsets as well, so that mutants can be added one by one while the results arrive, and the dominators can be
+    queried at any time.
+    """
+
+    def __init__(self, killingTests=None):
+        """
+
+        :param killingTests: mutant id -> the tests that kill it
+        :type killingTests: dict
+        """
+        self.testBits = dict()
+        self.classesWithTest = list()
+        self.classOfTests = dict()
+        self.classes = list()
+        self.classBits = list()
+        # strict supersets of each class, i.e. the classes it subsumes.
+        self.superClasses = list()
+        # strict subsets of each class, i.e. the classes subsuming it.
+        self.subClasses = list()
+        self.dominators = 0
+        if killingTests is not None:
+            # adding the smaller test sets first keeps the class of a mutant set from ever being a subset of a
+            #  later one, and the mutants of a class in order.
+            for mutant in sorted(killingTests.keys(), key=lambda mutant: (len(set(killingTests[mutant])), mutant)):
+                self.addMutant(mutant, killingTests[mutant])
+
+    @staticmethod
+    def _lowestIndex(bits):
+        return (bits & -bits).bit_length() - 1
+
+    @staticmethod
+    def _indexes(bits):
+        # clearing the bits one by one would copy the whole integer every time.
+        digits = bin(bits)[:1:-1]
+        index = digits.find("1")
+        while index >= 0:
+            yield index
+            index = digits.find("1", index + 1)
+
+    def addMutant(self, mutant, tests):
+        """
+        Adds a killed mutant to the graph.
+
+        :param mutant: the mutant id
+        :type mutant: int
+        :param tests: the tests that kill the mutant
+        :type tests: iterable
+        :return: the index of the class of the mutant
+        :rtype: int
+        """
+        tests = frozenset(tests)
+        if tests in self.classOfTests:
+            classIndex = self.classOfTests[tests]
+            self.classes[classIndex].append(mutant)
+            return classIndex
+
+        classIndex = len(self.classes)
+        classBit = 1 << classIndex
+        bits = 0
+        superClasses = classBit - 1
+        sharingClasses = 0
+        for test in sorted(tests, key=str):
+            if test not in self.testBits:
+                self.testBits[test] = len(self.classesWithTest)
+                self.classesWithTest.append(0)
+            testIndex = self.testBits[test]
+            bits |= 1 << testIndex
+            superClasses &= self.classesWithTest[testIndex]
+            sharingClasses |= self.classesWithTest[testIndex]
+
+        # the classes subsumed by the new one are either looked up by every subset of its tests, or found among
+        #  the classes sharing a test with it, whichever is shorter.
+        candidates = sharingClasses & ~superClasses
+        if 1 << len(tests) < bin(candidates).count("1"):
+            subsets = (
+                self.classOfTests.get(frozenset(subset))
+                for size in range(1, len(tests))
+                for subset in itertools.combinations(tests, size)
+            )
+            subsets = [otherClass for otherClass in subsets if otherClass is not None]
+        else:
+            subsets = [
+                otherClass for otherClass in self._indexes(candidates) if self.classBits[otherClass] & ~bits == 0
+            ]
+        subClasses = 0
+        for otherClass in subsets:
+            subClasses |= 1 << otherClass
+            self.superClasses[otherClass] |= classBit
+        for otherClass in self._indexes(superClasses):
+            self.subClasses[otherClass] |= classBit
+        for testIndex in self._indexes(bits):
+            self.classesWithTest[testIndex] |= classBit
+
+        self.classOfTests[tests] = classIndex
+        self.classes.append([mutant])
+        self.classBits.append(bits)
+        self.superClasses.append(superClasses)
+        self.subClasses.append(subClasses)
+        if subClasses == 0:
+            self.dominators |= classBit
+        self.dominators &= ~superClasses
+        return classIndex
+
+    def label(self, classIndex):
+        """
+        :return: the mutants of a class, separated by commas
+        :rtype: str
+        """
+        return ", ".join(str(mutant) for mutant in sorted(self.classes[classIndex]))
+
+    def ordered(self, classIndexes):
+        """
+        Sorts classes by the number of their tests, then by their first mutant, so that the output does not depend on
+        the order the mutants were added in.
+
+        :param classIndexes:
+        :type classIndexes: iterable
+        :return:
+        :rtype: list
+        """
+        return sorted(classIndexes, key=lambda classIndex: (
+            bin(self.classBits[classIndex]).count("1"), min(self.classes[classIndex])))
+
+    def subsumedCount(self, classIndex):
+        """
+        :return: the number of classes a class subsumes, directly or not
+        :rtype: int
+        """
+        return bin(self.superClasses[classIndex]).count("1")
+
+    def reducedEdges(self):
+        """
+        Returns the edges of the transitive reduction: each class is connected to the minimal classes among those it
+        subsumes.
+
+        :return: pairs of class indexes
+        :rtype: list
+        """
+        edges = list()
+        for classIndex, superClasses in enumerate(self.superClasses):
+            remaining = superClasses
+            while remaining:
+                minimalClass = self._lowestIndex(remaining)
+                smaller = self.subClasses[minimalClass] & remaining
+                while smaller:
+                    minimalClass = self._lowestIndex(smaller)
+                    smaller = self.subClasses[minimalClass] & remaining
+                edges.append((classIndex, minimalClass))
+                remaining &= ~((1 << minimalClass) | self.superClasses[minimalClass])
+        return edges
+
+    def minimalClasses(self):
+        """
+        :return: the classes no other class subsumes
+        :rtype: list
+        """
+        return self.ordered(self._indexes(self.dominators))
+
+    def dominatorMutants(self):
+        """
+        :return: the mutants of the dominator classes, the dynamic minimal mutant set of the results so far
+        :rtype: list
+        """
+        return sorted(mutant for classIndex in self.minimalClasses() for mutant in self.classes[classIndex])
+
+    def toGraph(self, edges=None):
+        """
+        :param edges: the result of reducedEdges, if it is already computed
+        :type edges: list
+        :return: the transitive reduction of the subsumption graph, with a node per class labelled with its mutants.
+            The dominators are colored green.
+        :rtype: nx.DiGraph
+        """
+        if edges is None:
+            edges = self.reducedEdges()
+        order = self.ordered(range(len(self.classes)))
+        rank = {classIndex: position for position, classIndex in enumerate(order)}
+        graph = nx.DiGraph()
+        for classIndex in order:
+            graph.add_node(self.label(classIndex))
+        for source, target in sorted(edges, key=lambda edge: (rank[edge[0]], rank[edge[1]])):
+            graph.add_edge(self.label(source), self.label(target))
+        for classIndex in self.minimalClasses():
+            graph.nodes[self.label(classIndex)]["color"] = "green"
+        return graph
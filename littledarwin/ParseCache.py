@@ -0,0 +1,289 @@
+import hashlib
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+
+from antlr4.Token import CommonToken
+from antlr4.tree.Tree import TerminalNodeImpl
+
+from littledarwin.JavaParse import JavaParse
+from littledarwin.JavaParser import serializedATN
+
+
+class ParseCache:
+    """
+    Keeps the numbered parse trees of the source files on disk, so that a file that did not change since an earlier
+    run is not parsed again. An entry is found by the SHA-256 of the file content, the version of LittleDarwin and
+    the grammar.
+
+    An entry holds the tree in the binary format of JavaParse, followed by what that format leaves out: the tokens
+    of the nodes, whose positions the mutation operators read, and the times numerify visits the nodes at. When the
+    entries grow over the size limit, the least recently used ones are removed.
+
+    The times are stored relative to the root. numerify counts them on a timer shared by all the trees, and
+    is_ancestor compares nodes of different trees, so a loaded tree is moved to the current time and the timer is
+    advanced past it, as if the file had been parsed.
+    """
+
+    MAGIC = b"LDC"
+    VERSION = 1
+    # the size of the binary tree, the number of nodes and the number of tokens.
+    HEADER = struct.Struct("<3sBIII")
+    TOKEN_FIELDS = ("type", "channel", "start", "stop", "tokenIndex", "line", "column")
+    SUFFIX = ".tree"
+    # once the limit is reached, entries are removed until this fraction of it is used, so that the directory is not
+    # listed again for every new entry.
+    LOW_WATER_MARK = 0.9
+
+    def __init__(self, path, maxSize, version):
+        """
+
+        :param path: the cache directory
+        :type path: str
+        :param maxSize: the size limit of the cache in bytes
+        :type maxSize: int
+        :param version: the version of LittleDarwin
+        :type version: str
+        """
+        self.path = os.path.abspath(path)
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+        grammar = hashlib.sha256(repr(serializedATN()).encode("utf-8")).hexdigest()
+        self.salt = "\0".join(
+            [str(version), str(self.VERSION), str(JavaParse.BINARY_TREE_VERSION), grammar, ""]
+        ).encode("utf-8")
+        self.size = sum(size for modified, size, entryPath in self._entries())
+
+    def _entries(self):
+        entries = list()
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(self.SUFFIX):
+                try:
+                    status = entry.stat()
+                except OSError:
+                    continue
+                entries.append((status.st_mtime, status.st_size, entry.path))
+        return entries
+
+    def entryPath(self, sourceCode):
+        """
+        :return: the file of the entry of a source file
+        :rtype: str
+        """
+        key = hashlib.sha256(self.salt + sourceCode.encode("utf-8", errors="surrogatepass")).hexdigest()
+        return os.path.join(self.path, key + self.SUFFIX)
+
+    def parse(self, javaParse, sourceCode):
+        """
+        Returns the numbered tree of a source file, from the cache if possible. Otherwise the file is parsed and the
+        tree is added to the cache.
+
+        :param javaParse:
+        :type javaParse: JavaParse
+        :param sourceCode:
+        :type sourceCode: str
+        :return:
+        :rtype: JavaParser.CompilationUnitContext
+        """
+        entryPath = self.entryPath(sourceCode)
+        tree = None
+        try:
+            with open(entryPath, "rb") as entryFile:
+                tree = self.decode(javaParse, entryFile.read())
+            # the modification time orders the entries for eviction.
+            os.utime(entryPath)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # a damaged entry is replaced.
+            tree = None
+        if tree is not None:
+            self.hits += 1
+            javaParse.lookupTable = dict()
+            javaParse.indexNodes(tree)
+            return tree
+        tree = javaParse.parse(sourceCode)
+        self.misses += 1
+        self.store(entryPath, self.encode(javaParse, tree))
+        return tree
+
+    def store(self, entryPath, data):
+        """
+        Writes an entry, and removes the least recently used entries if the cache is over its limit.
+
+        :param entryPath:
+        :type entryPath: str
+        :param data:
+        :type data: bytes
+        """
+        temporaryPath = entryPath + "." + str(os.getpid())
+        try:
+            with open(temporaryPath, "wb") as entryFile:
+                entryFile.write(data)
+            os.replace(temporaryPath, entryPath)
+        except OSError:
+            # without a cache entry, the file is parsed again next time.
+            return
+        self.size += len(data)
+        if self.size > self.maxSize:
+            self.evict()
+
+    def checkSize(self):
+        """
+        Lists the cache again, and removes the least recently used entries if it is over its limit. The entries
+        written by other processes are only counted this way.
+        """
+        self.size = sum(size for modified, size, entryPath in self._entries())
+        if self.size > self.maxSize:
+            self.evict()
+
+    def evict(self):
+        entries = sorted(self._entries())
+        self.size = sum(size for modified, size, entryPath in entries)
+        for modified, size, entryPath in entries:
+            if self.size <= self.maxSize * self.LOW_WATER_MARK:
+                break
+            try:
+                os.remove(entryPath)
+            except OSError:
+                continue
+            self.size -= size
+
+    @staticmethod
+    def _numerifyTimer():
+        return JavaParse.numerifyTimer
+
+    @staticmethod
+    def _preorder(tree):
+        # the order trees2Binary writes the nodes in.
+        stack = [tree]
+        while len(stack) > 0:
+            node = stack.pop()
+            yield node
+            if not isinstance(node, TerminalNodeImpl) and node.children is not None:
+                stack.extend(reversed(node.children))
+
+    def encode(self, javaParse, tree):
+        """
+        :param javaParse:
+        :type javaParse: JavaParse
+        :param tree: a tree returned by JavaParse.parse
+        :type tree: JavaParser.CompilationUnitContext
+        :return: the cache entry of the tree
+        :rtype: bytes
+        """
+        treeData = javaParse.tree2Binary(tree)
+        tokenIDs = dict()
+        tokens = list()
+        # two tokens per node: the symbol of a terminal node, or the start and stop tokens of a rule.
+        tokenReferences = array("i")
+        times = array("q")
+        startTime = tree.in_time
+        nodeCount = 0
+        for node in self._preorder(tree):
+            nodeCount += 1
+            if isinstance(node, TerminalNodeImpl):
+                nodeTokens = (node.symbol, None)
+            else:
+                nodeTokens = (node.start, node.stop)
+            for token in nodeTokens:
+                if token is None:
+                    tokenReferences.append(-1)
+                    continue
+                if id(token) not in tokenIDs:
+                    tokenIDs[id(token)] = len(tokens)
+                    tokens.append(token)
+                tokenReferences.append(tokenIDs[id(token)])
+            nodeAttributes = node.__dict__
+            times.append(nodeAttributes["in_time"] - startTime if "in_time" in nodeAttributes else -1)
+            times.append(nodeAttributes["out_time"] - startTime if "out_time" in nodeAttributes else -1)
+
+        tokenFields = array("q", [getattr(token, field) for token in tokens for field in self.TOKEN_FIELDS])
+        texts = [token.text for token in tokens]
+        textLengths = array("I", [len(text) for text in texts])
+        arrays = [tokenReferences, times, tokenFields, textLengths]
+        if sys.byteorder == "big":
+            for numbers in arrays:
+                numbers.byteswap()
+        body = b"".join(
+            [numbers.tobytes() for numbers in arrays] + ["".join(texts).encode("utf-8", errors="surrogatepass")]
+        )
+        return (
+            self.HEADER.pack(self.MAGIC, self.VERSION, len(treeData), nodeCount, len(tokens))
+            + treeData
+            + zlib.compress(body, 1)
+        )
+
+    def decode(self, javaParse, data):
+        """
+        :param javaParse:
+        :type javaParse: JavaParse
+        :param data: a cache entry written by encode
+        :type data: bytes
+        :return: the tree, as JavaParse.parse returned it
+        :rtype: JavaParser.CompilationUnitContext
+        """
+        if len(data) < self.HEADER.size or not data.startswith(self.MAGIC):
+            raise ValueError("Not a parse cache entry.")
+        magic, version, treeSize, nodeCount, tokenCount = self.HEADER.unpack_from(data)
+        if version != self.VERSION:
+            raise ValueError("Unsupported parse cache version: " + str(version))
+        tree = javaParse.binary2Tree(data[self.HEADER.size:self.HEADER.size + treeSize])
+        body = zlib.decompress(data[self.HEADER.size + treeSize:])
+
+        offset = 0
+        arrays = list()
+        for typeCode, count in (
+            ("i", 2 * nodeCount),
+            ("q", 2 * nodeCount),
+            ("q", len(self.TOKEN_FIELDS) * tokenCount),
+            ("I", tokenCount),
+        ):
+            numbers = array(typeCode)
+            size = numbers.itemsize * count
+            numbers.frombytes(body[offset:offset + size])
+            if sys.byteorder == "big":
+                numbers.byteswap()
+            arrays.append(numbers)
+            offset += size
+        tokenReferences, times, tokenFields, textLengths = arrays
+        text = body[offset:].decode("utf-8", errors="surrogatepass")
+
+        tokens = list()
+        fieldCount = len(self.TOKEN_FIELDS)
+        ends = list(accumulate(textLengths))
+        for position, (start, end) in enumerate(zip([0] + ends[:-1], ends)):
+            token = CommonToken()
+            for field, value in zip(self.TOKEN_FIELDS, tokenFields[position * fieldCount:(position + 1) * fieldCount]):
+                setattr(token, field, value)
+            token.text = text[start:end]
+            tokens.append(token)
+
+        timer = self._numerifyTimer()
+        startTime = timer[0]
+        endTime = startTime
+        position = -1
+        for position, node in enumerate(self._preorder(tree)):
+            if position >= nodeCount:
+                break
+            first, second = tokenReferences[2 * position], tokenReferences[2 * position + 1]
+            if isinstance(node, TerminalNodeImpl):
+                node.symbol = tokens[first] if first >= 0 else None
+            else:
+                node.start = tokens[first] if first >= 0 else None
+                node.stop = tokens[second] if second >= 0 else None
+            nodeAttributes = node.__dict__
+            if times[2 * position] >= 0:
+                nodeAttributes["in_time"] = startTime + times[2 * position]
+            if times[2 * position + 1] >= 0:
+                nodeAttributes["out_time"] = startTime + times[2 * position + 1]
+                endTime = max(endTime, nodeAttributes["out_time"] + 1)
+        if position + 1 != nodeCount:
+            raise ValueError("The parse cache entry does not match its tree.")
+        timer[0] = endTime
+        return tree
@@ -1,7 +1,6 @@
 import sys
 import io
 import networkx as nx
-import dill
 import time
 import datetime
 import re
@@ -21,6 +20,10 @@ from littledarwin.JavaIO import JavaIO
 from littledarwin.JavaParse import JavaParse
 from littledarwin.JavaMutate import JavaMutate, LogicalOperatorReplacement, ConditionalOperatorReplacement, HOM
 from littledarwin.Database import Database
+from littledarwin.CoverageIndex import CoverageIndex
+from littledarwin.MutantSubsumption import MutantSubsumption
+from littledarwin.TestReportReader import TestReportReader
+from littledarwin.ParseCache import ParseCache
 from littledarwin.JavaParser import JavaParser
 from graphviz import Source
 from littledarwin.SharedFunctions import *
@@ -29,7 +32,24 @@ from littledarwin.JavaMutate import (
     recursiveCloneANTLRNodeAndItsChildren,
     replaceNodes,
     findNodeAt,
-    findNodesWithMutationID
+    findNodesWithMutationID,
+    indexNodesByMutationID
+)
+
+
+# the options of the build phase of the -q engine, which the schemata engine does not use.
+COVERAGE_ENGINE_OPTIONS = (
+    ("--backend", "backend"),
+    ("--incremental", "isIncrementalActive"),
+    ("--junit-launcher", "junitLauncherPath"),
+    ("--test-daemon", "isTestDaemonActive"),
+    ("--prioritize-tests", "isPrioritizationActive"),
+    ("--fail-fast", "isFailFastActive"),
+    ("--adaptive-timeout", "isAdaptiveTimeoutActive"),
+    ("--timeout-factor", "timeoutFactor"),
+    ("--timeout-constant", "timeoutConstant"),
+    ("--early-kill", "isEarlyKillActive"),
+    ("--kill-pattern", "killPatterns"),
 )
 
 
@@ -44,6 +64,109 @@ def parseCmdArgs(optionParser: OptionParser, mockArgs: list = None) -> object:
     :rtype:
     """
 
+    optionParser.add_option(
+        "--backend",
+        type="choice",
+        choices=["build", "incremental", "direct"],
+        action="store",
+        dest="backend",
+        default="build",
+        help="(-q engine only) How mutants are built and tested: 'build' runs the build system, 'incremental' compiles only the mutated class and runs the tests with JUnitCore, 'direct' compiles only the mutated class and runs the covered test methods with the JUnit console launcher. The last two need Maven.",
+    )
+    optionParser.add_option(
+        "--incremental",
+        action="store_true",
+        dest="isIncrementalActive",
+        default=False,
+        help="(-q engine only) Same as --backend=incremental.",
+    )
+    optionParser.add_option(
+        "--junit-launcher",
+        action="store",
+        dest="junitLauncherPath",
+        default="***dummy***",
+        help="(-q engine only) Path to junit-platform-console-standalone.jar for the direct backend (default: look for it in the test dependencies).",
+    )
+    optionParser.add_option(
+        "--test-daemon",
+        action="store_true",
+        dest="isTestDaemonActive",
+        default=False,
+        help="(-q engine only) Keep a warm JVM per job that runs the tests of each mutant (requires the incremental or direct backend).",
+    )
+    optionParser.add_option(
+        "--prioritize-tests",
+        action="store_true",
+        dest="isPrioritizationActive",
+        default=False,
+        help="(-q engine only) Run the covering tests that killed mutants on the same line, method or operator before the others (requires coverage).",
+    )
+    optionParser.add_option(
+        "--fail-fast",
+        action="store_true",
+        dest="isFailFastActive",
+        default=False,
+        help="(-q engine only) Stop testing a mutant at the first failing test.",
+    )
+    optionParser.add_option(
+        "--adaptive-timeout",
+        action="store_true",
+        dest="isAdaptiveTimeoutActive",
+        default=False,
+        help="(-q engine only) Derive the timeout of the test run of each mutant from the baseline time of the tests it runs (requires the incremental or direct backend). The global timeout is the upper limit.",
+    )
+    optionParser.add_option(
+        "--timeout-factor",
+        action="store",
+        dest="timeoutFactor",
+        default=5.0,
+        type="float",
+        help="(-q engine only) Adaptive timeout: multiple of the baseline test time (default: 5).",
+    )
+    optionParser.add_option(
+        "--timeout-constant",
+        action="store",
+        dest="timeoutConstant",
+        default=10,
+        type="int",
+        help="(-q engine only) Adaptive timeout: seconds added for starting up the JVM (default: 10).",
+    )
+    optionParser.add_option(
+        "--early-kill",
+        action="store_true",
+        dest="isEarlyKillActive",
+        default=False,
+        help="(-q engine only) Stop the tests of a mutant as soon as their output shows a failing test.",
+    )
+    optionParser.add_option(
+        "--kill-pattern",
+        action="append",
+        dest="killPatterns",
+        default=None,
+        help="(-q engine only) Additional regular expression that marks a failing test in the output (with --early-kill). Can be given several times.",
+    )
+    optionParser.add_option(
+        "--resume",
+        action="store_true",
+        dest="isResumeActive",
+        default=False,
+        help="Continue an interrupted build phase: mutants that already have a result are not evaluated again.",
+    )
+    optionParser.add_option(
+        "--parse-cache",
+        action="store",
+        dest="parseCachePath",
+        default="***dummy***",
+        help="Keep the parse trees of the source files in this directory, so that the files that did not change are not parsed again by the next mutation phase.",
+    )
+    optionParser.add_option(
+        "--parse-cache-size",
+        type="int",
+        action="store",
+        dest="parseCacheSize",
+        default=1024,
+        help="Size limit of the parse cache in megabytes. The least recently used trees are removed first (default: 1024).",
+    )
     optionParser.add_option(
         "--reset",
         action="store_true",
@@ -216,6 +339,8 @@ def parseCmdArgs(optionParser: OptionParser, mockArgs: list = None) -> object:
         help="Define order of mutation. Use -1 to dynamically adjust per class.",
     )
     optionParser.add_option(
+        "-j",
+        "--jobs",
         "--jobs-no",
         type="int",
         action="store",
@@ -291,6 +416,12 @@ def parseCmdArgs(optionParser: OptionParser, mockArgs: list = None) -> object:
 
     if options.initial_timeout is None:
         options.initial_timeout = int(options.timeout) * 2
+    if options.isSchemataActive:
+        defaults = optionParser.get_default_values()
+        for optionName, dest in COVERAGE_ENGINE_OPTIONS:
+            if getattr(options, dest) != getattr(defaults, dest):
+                print(optionName + " is only supported by the -q engine, not with --schemata.")
+                sys.exit(4)
     if options.whitelist != "***dummy***" and options.blacklist != "***dummy***":
         print("You can either define a whitelist or a blacklist but not both.")
         sys.exit(4)
@@ -327,183 +458,95 @@ class Schemata:
     clean_time = 0
     compile_time = 0
     test_time = 0
+    # the subsumption graph, kept up to date while the mutants run when subsumption analysis is active.
+    subsumption = None
+    testReportReader = None
 
     def subsumptionAnalysisPhase(self, options: object) -> None:
+        if self.subsumption is not None:
+            # the mutants were added as their results arrived.
+            self.writeSubsumptionGraph(options, self.subsumption)
+            return
         mutationDatabase = Database(self.sqlDBPath)
-        mutationDatabase.delete_data("mutant_test")
-
-        self.updateMutationTestTable(options, mutationDatabase)
+        if options.isResumeActive == True:
+            # keep the test results read so far, only the remaining mutants are read from their reports.
+            self.updateMutationTestTable(
+                options,
+                mutationDatabase,
+                skip_mutants={row[0] for row in mutationDatabase.fetch_mutant_test_results()},
+            )
+        else:
+            mutationDatabase.delete_data("mutant_test")
+            self.updateMutationTestTable(options, mutationDatabase)
         self.createMutantTestMatrix(options, mutationDatabase)
 
-    def updateMutationTestTable(self, options: object, mutationDatabase, file_name=None, mutant_id=None) -> None:
+    def updateMutationTestTable(self, options: object, mutationDatabase, file_name=None, mutant_id=None,
+                                skip_mutants=None) -> None:
         if file_name == None and mutant_id == None:
             file_muants = mutationDatabase.fetch_mutants()
         else:
             file_muants = mutationDatabase.fetch_file_mutant_with_id(
                 file_name=file_name, mutant_id=mutant_id)
-        tests = mutationDatabase.fetch_data("test")
-        test_dict = {}
-        for test in tests:
-            # At this stage we do not need to have test case method or class separated
-            test = list(test)
-            test[1] = test[1].replace("$", ".")
-            test[1] = test[1].replace("#", ".")
-            test_dict[test[1]] = test[0]
-
-        def return_values(file, debug=False):
-            '''
-            return values to be inserted to the db later.
-            '''
-            nonlocal test_dict
-
-            if debug:
-                print_str = "extracting test data from: " + file
-                print("".join(["-"] * len(print_str)))
-                print(print_str)
-            xml_files.append(file)
-            results = parse_junit_xml(file)
-
-            values = []
-            for result in results:
-                test_res = Database.RES_ID_SURVIVED_MUTANT
-                error_msg = ""
-                if result[2] != "":
-                    error_msg = result[2]
-                    test_res = Database.RES_ID_KILLED_BY_FAILURE_MUTANT
-                elif result[3] != "":
-                    error_msg = result[3]
-                    test_res = Database.RES_ID_KILLED_BY_ERROR_MUTANT
-
-                if result[0] in test_dict:
-                    values.append((file_mutant[1],
-                                   test_dict[result[0]],
-                                   test_res,
-                                   result[1],
-                                   error_msg))
-                else:
-                    values.append((file_mutant[1],
-                                   str(Database.NO_TEST),
-                                   test_res,
-                                   result[1],
-                                   error_msg))
-            return values
-
-        for file_mutant in file_muants:
-            fileRelativePath = os.path.join(
-                self.LittleDarwinResultsPath,
-                os.path.relpath(file_mutant[0], options.sourcePath),
-            )
-            directory = str(
-                os.path.join(
-                    fileRelativePath,
-                    str(file_mutant[1]) + "-test_reports",
-                )
-            )
-            xml_files = []
-            if os.path.exists(directory):
-                values = []
-                for xml_file in glob(str(os.path.join(directory, "**", "*.xml")), recursive=True):
-                    values_ = return_values(xml_file)
-                    values.extend(values_)
-                mutationDatabase.insert_many(
-                    "mutant_test", "mutant_id, test_id, result, time, message", values)
-            else:
-                mutationDatabase.insert_data(
-                    "mutant_test",
-                    "mutant_id, test_id, result, time, message",
-                    [
-                        file_mutant[1],
-                        Database.NO_INFO,
-                        Database.RES_ID_BUILD_FAILURE,
-                        "0",
-                        "no results found. Most probably compilation error.",
-                    ],
+        if skip_mutants is not None:
+            file_muants = [
+                file_mutant for file_mutant in file_muants if file_mutant[1] not in skip_mutants
+            ]
+        if self.testReportReader is None:
+            # the test table does not change once the tests are known.
+            self.testReportReader = TestReportReader(mutationDatabase, options.numberOfJobs)
+        self.testReportReader.readReports(
+            mutationDatabase,
+            [
+                (
+                    file_mutant[1],
+                    os.path.join(
+                        self.LittleDarwinResultsPath,
+                        os.path.relpath(file_mutant[0], options.sourcePath),
+                        str(file_mutant[1]) + "-test_reports",
+                    ),
                 )
-        # use this sql query to get the records of the mutants that have caused compilation errors:
-        # SELECT * FROM mutant_test join mutant on mutant.id=mutant_test.mutant_id join mutation on mutation.id=mutant.mutation_id join mutation_operator on mutation_operator.id=mutation.mutation_operator_id WHERE result=-1;
+                for file_mutant in file_muants
+            ],
+        )
 
     def createMutantTestMatrix(self, options: object, mutationDatabase) -> None:
-        mutant_tests = mutationDatabase.fetch_data(
-            "mutant_test", "*", "result!=" +
-            str(Database.RES_ID_SURVIVED_MUTANT) +
-            " AND result!="+str(Database.RES_ID_BUILD_FAILURE) +
-            " AND result!="+str(Database.RES_ID_UNCOVERED)
-        )  # exclude surviving and build failure and uncovered ones
         mutant_test_dict = {}
-        test_mutant_dict = {}
-        for mutant_test in mutant_tests:
-            if mutant_test[0] not in mutant_test_dict:
-                mutant_test_dict[mutant_test[0]] = set()
-            mutant_test_dict[mutant_test[0]].add(mutant_test[1])
-            if mutant_test[1] not in test_mutant_dict:
-                test_mutant_dict[mutant_test[1]] = set()
-            test_mutant_dict[mutant_test[1]].add(mutant_test[0])
-        G = nx.DiGraph()
-        for mutant in mutant_test_dict.keys():
-            for mutant2 in mutant_test_dict.keys():
-                if G.has_node(str(mutant)) == False:
-                    G.add_node(str(mutant))
-                    G.nodes[str(mutant)]["label"] = str(mutant)
-
-                if G.has_node(str(mutant2)) == False:
-                    G.add_node(str(mutant2))
-                    G.nodes[str(mutant2)]["label"] = str(mutant2)
-
-                if mutant_test_dict[mutant].issubset(mutant_test_dict[mutant2]):
-                    if (
-                        str(mutant) != str(mutant2)
-                        and G.has_edge(str(mutant), str(mutant2)) == False
-                    ):
-                        if (
-                            mutant_test_dict[mutant] == mutant_test_dict[mutant2]
-                        ):  # equal test sets
-                            G.add_edge(str(mutant), str(mutant2), color="red")
-                            print(
-                                Fore.RED + str(mutant) +
-                                " ---> " + str(mutant2),
-                            )
-                            print(
-                                str(mutant_test_dict[mutant])
-                                + " ---> "
-                                + str(mutant_test_dict[mutant2])
-                            )
-                            print(Style.RESET_ALL)
-                        else:  # subset test sets
-                            G.add_edge(str(mutant), str(mutant2), color="blue")
-                            print(
-                                Fore.BLUE + str(mutant) +
-                                " ---> " + str(mutant2),
-                            )
-                            print(
-                                str(mutant_test_dict[mutant])
-                                + " ---> "
-                                + str(mutant_test_dict[mutant2])
-                            )
-                            print(Style.RESET_ALL)
-                        print("-----------------------------------")
-
-        for node in G.nodes:
-            for edge in G.edges(node):
-                if G.has_edge(edge[0], edge[1]) and G.edges[edge[0], edge[1]]["color"] == "red":
-                    G.nodes[edge[0]]["label"] = (
-                        G.nodes[edge[0]]["label"] + ", " +
-                        G.nodes[edge[1]]["label"]
-                    )
-                    G = nx.contracted_nodes(
-                        G, edge[0], edge[1], self_loops=False)
+        for mutant_id, test_id in mutationDatabase.fetch_killing_tests():
+            if mutant_id not in mutant_test_dict:
+                mutant_test_dict[mutant_id] = set()
+            mutant_test_dict[mutant_id].add(test_id)
+        self.writeSubsumptionGraph(options, MutantSubsumption(mutant_test_dict))
 
-        TR = nx.transitive_reduction(G)
-
-        mapping = {}
-        for node in TR.nodes:
-            if TR.in_degree(node) == 0:
-                TR.nodes[node]["color"] = "green"
-                print(Fore.GREEN + " d(" + str(node) + ") =" +
-                      str(G.out_degree(node)))
-            mapping[node] = G.nodes[node]["label"]
+    def recordSubsumption(self, mutationDatabase, mutant_id) -> None:
+        """
+        Adds a mutant to the subsumption graph kept during the build phase, once its test results are in mutant_test.
 
+        :param mutationDatabase:
+        :type mutationDatabase: Database
+        :param mutant_id:
+        :type mutant_id: int
+        """
+        killingTests = [row[1] for row in mutationDatabase.fetch_killing_tests(mutant_id)]
+        if len(killingTests) > 0:
+            self.subsumption.addMutant(mutant_id, killingTests)
+
+    def writeSubsumptionGraph(self, options: object, subsumption) -> None:
+        edges = subsumption.reducedEdges()
+        if options.isVerboseActive:
+            for source, target in edges:
+                print(Fore.BLUE + subsumption.label(source) + " ---> " + subsumption.label(target))
+            print(Style.RESET_ALL)
+        minimalClasses = subsumption.minimalClasses()
+        for classIndex in minimalClasses:
+            print(Fore.GREEN + " d(" + subsumption.label(classIndex) + ") =" +
+                  str(subsumption.subsumedCount(classIndex)))
         print(Style.RESET_ALL)
-        TR = nx.relabel_nodes(TR, mapping)
+        print(
+            "Subsumption: " + str(sum(len(mutants) for mutants in subsumption.classes)) + " killed mutants, " +
+            str(len(subsumption.classes)) + " equivalence classes, " + str(len(minimalClasses)) + " minimal."
+        )
+
+        TR = subsumption.toGraph(edges)
         dot_string_alt = nx.nx_pydot.to_pydot(TR).to_string()
 
         nx.write_gml(
@@ -747,6 +790,10 @@ class Schemata:
             filterType=filterType,
             filterList=filterList,
         )
+        parse_cache = None
+        if options.parseCachePath != "***dummy***":
+            parse_cache = ParseCache(
+                options.parseCachePath, options.parseCacheSize * 1024 * 1024, self.littleDarwinVersion)
 
         fileCounter = 0
         fileCount = len(java_io.fileList)
@@ -754,6 +801,8 @@ class Schemata:
         # refreshing the database
         mutation_database.delete_data("mutant")
         mutation_database.delete_data("mutation")
+        # the test results of the old mutants would be attributed to the new ones.
+        mutation_database.delete_data("mutant_test")
 
         densityResultsPath = os.path.join(
             java_io.targetDirectory, "ProjectDensityReport.csv"
@@ -778,19 +827,25 @@ class Schemata:
             )
 
             file_mutations_dict[file] = dict()
+            # the rows of a file are written in one transaction.
+            mutation_database.begin_transaction()
 
             file_id = mutation_database.fetch_data(
-                "file", columns="id", condition=f"name = '{file}'"
+                "file", columns="id", condition="name = ?", parameters=(file,)
             )[0][0]
 
             try:
                 # parsing the source file into a tree.
                 java_parse = JavaParse(options.isVerboseActive)
                 source_code = java_io.getFileContent(file)
-                tree = java_parse.parse(source_code)
+                if parse_cache is None:
+                    tree = java_parse.parse(source_code)
+                else:
+                    tree = parse_cache.parse(java_parse, source_code)
             except Exception as e:
                 print("Error in parsing Java code, skipping the file.")
                 sys.stderr.write(str(e))
+                mutation_database.commit_transaction()
                 continue
             fileCounter += 1
 
@@ -888,21 +943,16 @@ class Schemata:
                                             mutationIDs_tmp != "") else str(mutation.mutationID)
                                     JavaParse.findNodeInSubtree(
                                         tree, mutation.nodeID).mutationID = mutationIDs_tmp
-                                operator_id = mutation_database.fetch_data(
-                                    "mutation_operator",
-                                    "id",
-                                    f"name = '{mutation.mutatorType}'",
-                                )
-                                operator_id = operator_id[0][0]
+                                operator_id = mutation_database.fetch_operator_id(mutation.mutatorType)
 
-                                new_node_jsons = []
+                                new_nodes = []
                                 new_node_ids = []
                                 new_node_types = []
                                 for i in range(len(mutation.mutation_dict[mutation.mutationID][0])):
                                     new_node_ids.append(
                                         mutation.mutation_dict[mutation.mutationID][0][i])
-                                    new_node_jsons.append(
-                                        java_parse.tree2JSON_DFS(mutation.mutation_dict[mutation.mutationID][1][i]))
+                                    new_nodes.append(
+                                        mutation.mutation_dict[mutation.mutationID][1][i])
                                     new_node_types.append(
                                         mutation.mutation_dict[mutation.mutationID][2][i])
 
@@ -915,12 +965,11 @@ class Schemata:
                                     mutation.lineNumber,
                                     mutation.replacementText,
                                     mutation_operator_id=operator_id,
-                                    node_json=new_node_jsons,
+                                    node_json=java_parse.trees2Binary(new_nodes),
                                     new_node_id=new_node_ids,
                                     new_node_type=new_node_types,
                                     is_compile_time=1 if is_overloaded else 0,
-                                    object_=dill.dumps(
-                                        mutation) if is_overloaded else None
+                                    object_=mutation.encode() if is_overloaded else None
                                 )
                                 # mutations_in_node[tuple_str].mutationID = tuple_str
                                 file_mutations_dict[file][mutation.mutationID] = mutation
@@ -942,12 +991,7 @@ class Schemata:
                                     # I use this so that when I generate higher order mutants I replace them in the same tree
                                     for mutation_ind in range(len(mutation_tuples)):
                                         mutation = mutation_tuples[mutation_ind]
-                                        operator_id = mutation_database.fetch_data(
-                                            "mutation_operator",
-                                            "id",
-                                            f"name = '{mutation.mutatorType}'",
-                                        )
-                                        operator_id = operator_id[0][0]
+                                        operator_id = mutation_database.fetch_operator_id(mutation.mutatorType)
 
                                         tuple_str += "," + \
                                             str(mutation.mutationID) if (
@@ -987,21 +1031,16 @@ class Schemata:
                                     print("mutation type: " +
                                           mutation.mutatorType)
 
-                                operator_id = mutation_database.fetch_data(
-                                    "mutation_operator",
-                                    "id",
-                                    f"name = '{mutation.mutatorType}'",
-                                )
-                                operator_id = operator_id[0][0]
+                                operator_id = mutation_database.fetch_operator_id(mutation.mutatorType)
 
-                                new_node_jsons = []
+                                new_nodes = []
                                 new_node_ids = []
                                 new_node_types = []
                                 for i in range(len(mutation.mutation_dict[mutation.mutationID][0])):
                                     new_node_ids.append(
                                         mutation.mutation_dict[mutation.mutationID][0][i])
-                                    new_node_jsons.append(
-                                        java_parse.tree2JSON_DFS(mutation.mutation_dict[mutation.mutationID][1][i]))
+                                    new_nodes.append(
+                                        mutation.mutation_dict[mutation.mutationID][1][i])
                                     new_node_types.append(
                                         mutation.mutation_dict[mutation.mutationID][2][i])
 
@@ -1014,12 +1053,12 @@ class Schemata:
                                     mutation.lineNumber,
                                     mutation.replacementText,
                                     mutation_operator_id=operator_id,
-                                    node_json=new_node_jsons,
+                                    node_json=java_parse.trees2Binary(new_nodes),
                                     new_node_id=new_node_ids,
                                     new_node_type=new_node_types,
                                     is_compile_time=1 if ((hasattr(replaced_node, "mutationType") and replaced_node.mutationType ==
                                                           JavaParse.MUTATION_TYPE_COMPILE_TIME) or mutation.nodeID in overloaded) else 0,
-                                    object_=dill.dumps(mutation) if ((hasattr(replaced_node, "mutationType") and replaced_node.mutationType ==
+                                    object_=mutation.encode() if ((hasattr(replaced_node, "mutationType") and replaced_node.mutationType ==
                                                                       JavaParse.MUTATION_TYPE_COMPILE_TIME) or mutation.nodeID in overloaded) else None
                                 )
 
@@ -1122,6 +1161,9 @@ class Schemata:
             # saving the file
             with open(file, "w",) as f:
                 # the last node is <EOF>
+                nodeTable = getattr(tree, "nodeTable", None)
+                if nodeTable is not None:
+                    nodeTable.changed = True
                 del tree.children[-1]
                 f.write(java_parse.getText(tree))
 
@@ -1173,6 +1215,7 @@ class Schemata:
                 with open(densityReportFile, "w") as densityFileHandle:
                     densityFileHandle.write(densityReport)
             trees_dict[os.path.abspath(file)] = tree
+            mutation_database.commit_transaction()
 
         # removing build failure causing mutations
         # running the build command
@@ -1308,12 +1351,13 @@ class Schemata:
                 targetDir, "mutant_schemata.java"))
             if not os.path.abspath(file) in trees_dict.keys():
                 continue
-            json_string = java_parse.tree2JSON_DFS(
-                trees_dict[os.path.abspath(file)])
-            mutation_database.update_file_json(file, json_string)
+            mutation_database.update_file_json(
+                file, java_parse.tree2Binary(trees_dict[os.path.abspath(file)]))
             shutil.copyfile(os.path.join(targetDir, "original.java"), file)
 
         print("-------------------------------------")
+        if parse_cache is not None:
+            print("Parse cache: " + str(parse_cache.hits) + " trees loaded, " + str(parse_cache.misses) + " files parsed.")
         print("\nTotal mutations found: ", sum(mutantTypes_project.values()))
         print("Build failure causing mutations found: ", len(build_failures))
         print("Compile time mutations found: ", len(compile_mutations_files))
@@ -1348,7 +1392,7 @@ class Schemata:
                              * float(totalMutantCount - totalMutantCounter)
                          )
                      )
-        ))
+        ) + ("" if self.subsumption is None else " dominators: " + str(len(self.subsumption.dominatorMutants()))))
 
         line_no += 1
         for file in res_dict.keys():
@@ -1425,6 +1469,9 @@ class Schemata:
             buildPath=os.path.abspath(build_directory),
         )
         function_calls = list()
+        coverage_index = None
+        if options.isCoverageActive:
+            coverage_index = CoverageIndex(mutation_db)
 
         # moving schemata to the main directory
         for file in java_io.fileList:
@@ -1442,22 +1489,49 @@ class Schemata:
             print("Running compile time mutants...", end=' ')
             for CTM in compile_mutations_files:
                 output = mutation_db.fetch_data(
-                    "file", "*", f"name = '{CTM[0]}'")
+                    "file", "*", "name = ?", (CTM[0],))
                 # source_code = java_io.getFileContent(CTM[0])
                 # tree = java_parse.parse(source_code)
                 if (CTM[0] in compile_mutations_trees.keys()):
                     continue
-                tree = java_parse.Json2Tree(output[0][2])
+                tree = java_parse.binary2Tree(output[0][2])
+                java_parse.indexNodes(tree)
                 compile_mutations_trees[CTM[0]] = tree
+            # the trees do not change until the mutations are applied, so each tree is walked once.
+            mutation_id_indexes = dict()
             for CTM in compile_mutations_files:
                 tree = compile_mutations_trees[CTM[0]]
-                expressionContexts = findNodesWithMutationID(
-                    tree, str(CTM[1].mutationID))
+                if CTM[0] not in mutation_id_indexes:
+                    mutation_id_indexes[CTM[0]] = indexNodesByMutationID(tree)
+                expressionContexts = mutation_id_indexes[CTM[0]].get(
+                    str(CTM[1].mutationID), [])
                 compile_mutations_[CTM[1].mutationID] = list()
                 for expression in expressionContexts:
                     compile_mutations_[CTM[1].mutationID].append([
                         CTM[1], expression])
         build_failure_mutants = mutation_db.fetch_build_failure_mutants()
+        # every verdict is committed to mutant_test as soon as it is known. when resuming, the mutants that already
+        # have one are not run again.
+        finished_mutants = dict()
+        if options.isResumeActive:
+            for finished_mutant_id, result in mutation_db.fetch_mutant_test_results():
+                if result in (Database.RES_ID_KILLED_BY_FAILURE_MUTANT, Database.RES_ID_KILLED_BY_ERROR_MUTANT):
+                    finished_mutants[finished_mutant_id] = Database.RES_ID_KILLED_MUTANT
+                else:
+                    finished_mutants.setdefault(finished_mutant_id, result)
+        if options.isCoverageActive and options.isSubsumptionActive:
+            # the test results of each mutant are read into mutant_test when it is done, so the subsumption graph
+            #  can grow with them.
+            self.subsumption = MutantSubsumption()
+            if options.isResumeActive:
+                killing_tests = dict()
+                for killed_mutant_id, test_id in mutation_db.fetch_killing_tests():
+                    killing_tests.setdefault(killed_mutant_id, set()).add(test_id)
+                for killed_mutant_id in sorted(killing_tests.keys()):
+                    self.subsumption.addMutant(killed_mutant_id, killing_tests[killed_mutant_id])
+            else:
+                # the results of an earlier run would be read again. build failures are found before the run.
+                mutation_db.delete_data("mutant_test", "result != ?", (Database.RES_ID_BUILD_FAILURE,))
         for file in mutants_dict.keys():
 
             targetDir = os.path.join(
@@ -1472,6 +1546,16 @@ class Schemata:
                     res_dict[record[0]]["buildFailureList"].append(
                         str(record[1]))
             for mutant_id in mutants_dict[file].keys():
+                if mutant_id in finished_mutants:
+                    # build failures are already in the lists.
+                    if finished_mutants[mutant_id] == Database.RES_ID_KILLED_MUTANT:
+                        res_dict[file]["testFailureList"].append(str(mutant_id))
+                        res_dict[file]["killedList"].append(str(mutant_id))
+                    elif finished_mutants[mutant_id] == Database.RES_ID_SURVIVED_MUTANT:
+                        res_dict[file]["survivedList"].append(str(mutant_id))
+                    elif finished_mutants[mutant_id] == Database.RES_ID_UNCOVERED:
+                        res_dict[file]["uncoveredList"].append(str(mutant_id))
+                    continue
                 subset = mutants_dict[file][mutant_id]
                 compile_again = list()
                 for mutation in subset:
@@ -1527,27 +1611,22 @@ class Schemata:
                             D_args = return_D_arguments(" ".join(test_command))
                         lines = mutation_db.fetch_file_mutant_by_mutation_ID(
                             mutant_id)
-                        test_names = list()
-                        for line in lines:
-                            test_names.extend(
-                                mutation_db.fetch_coverage(file, line[2]))
+                        bits, flags = coverage_index.lookup(
+                            file, ",".join(str(line[2]) for line in lines))
+                        # "-" and "?" are handled with the flags below.
+                        test_names = coverage_index.tests(
+                            bits, flags & ~CoverageIndex.NO_TEST)
                         # insturmented but not covered
-                        uncovered = False
-                        while ("-",) in test_names:
-                            uncovered = True
-                            test_names.remove(("-",))
+                        uncovered = flags & CoverageIndex.NOT_COVERED
                         if uncovered:
-                            if len(test_names) == 0:
+                            if len(test_names) == 0 and not flags & CoverageIndex.NO_TEST:
                                 res = (mutant_id, subset,
                                        Database.RES_ID_UNCOVERED, file)
                                 msg = "uncovered"
                                 res_dict[res[3]]["uncoveredList"].append(
                                     str(res[0]))
                                 continue
-                        no_test = False
-                        while ("?",) in test_names:
-                            no_test = True
-                            test_names.remove(("?",))
+                        no_test = bool(flags & CoverageIndex.NO_TEST)
                         if no_test:
                             if len(test_names) == 0:
                                 if (buildType == "mvn"):
@@ -1691,6 +1770,7 @@ class Schemata:
                             # if coverage is active then uptade the DB
                             self.updateMutationTestTable(
                                 options=options, mutationDatabase=mutation_db, file_name=file, mutant_id=mutant_id)
+                            self.recordSubsumption(mutation_db, mutant_id)
                     else:
                         if debug:
                             print("Survived: " + str(subset))
@@ -1714,6 +1794,7 @@ class Schemata:
                             # if coverage is active then uptade the DB
                             self.updateMutationTestTable(
                                 options=options, mutationDatabase=mutation_db, file_name=file, mutant_id=mutant_id)
+                            self.recordSubsumption(mutation_db, mutant_id)
                     # reverse the mutations after running the compile time mutant
                     for c_a in compile_again:
                         # compile_mutations_[mutation][1].reverse_mutation()
@@ -1747,21 +1828,19 @@ class Schemata:
                         shutil.copy2(buildFile, buildFile_)
                         lines = mutation_db.fetch_file_mutant_by_mutation_ID(
                             mutant_id)
-                        test_names = list()
-                        for line in lines:
-                            test_names.extend(
-                                mutation_db.fetch_coverage(file, line[2]))
+                        bits, flags = coverage_index.lookup(
+                            file, ",".join(str(line[2]) for line in lines))
+                        # "-" and "?" are handled with the flags below.
+                        test_names = coverage_index.tests(
+                            bits, flags & ~CoverageIndex.NO_TEST)
                         os.makedirs(
                             os.path.join(targetDir, str(
                                 mutant_id) + "-test_reports"),
                             exist_ok=True,
                         )
-                        uncovered = False
-                        while ("-",) in test_names:
-                            uncovered = True
-                            test_names.remove(("-",))
+                        uncovered = flags & CoverageIndex.NOT_COVERED
                         if uncovered:
-                            if len(test_names) == 0:
+                            if len(test_names) == 0 and not flags & CoverageIndex.NO_TEST:
                                 res = (mutant_id, subset,
                                        Database.RES_ID_UNCOVERED, file)
                                 msg = "uncovered"
@@ -1780,10 +1859,7 @@ class Schemata:
                                 )
                                 os.remove(buildFile_)
                                 continue
-                        no_test = False
-                        while ("?",) in test_names:
-                            no_test = True
-                            test_names.remove(("?",))
+                        no_test = bool(flags & CoverageIndex.NO_TEST)
                         if no_test:
                             if len(test_names) == 0:
                                 if (buildType == "mvn"):
@@ -1952,6 +2028,7 @@ class Schemata:
                     # if coverage is active then uptade the DB
                     self.updateMutationTestTable(
                         options=options, mutationDatabase=mutation_db, file_name=item[3], mutant_id=item[0])
+                    self.recordSubsumption(mutation_db, item[0])
                 self.print_results(res_dict, start_time)
                 refresh()
                 f.write(str(item[0]) + " : " + msg + "\n\r")
@@ -2098,8 +2175,10 @@ class Schemata:
             java_io = JavaIO(self.options.isVerboseActive)
             java_io.listFiles(targetPath=os.path.abspath(self.options.sourcePath), buildPath=os.path.abspath(
                 self.options.buildPath), filterType=self.filterType, filterList=self.filterList)
+            mutationDatabase2.begin_transaction()
             for f in java_io.fileList:
                 mutationDatabase2.insert_file(f)
+            mutationDatabase2.commit_transaction()
             build_command = getCommand(self.options.buildCommand)
             clean_command = getCommand(self.options.cleanUp)
             test_command = getCommand(self.options.testCommand)
@@ -2230,6 +2309,7 @@ class Schemata:
             print("--> Writing mutant data to the DB: ")
             for file in file_mutations_dict.keys():
                 print("----> " + file)
+                mutationDatabase2.begin_transaction()
                 for L in range(1, (MUTATION_ORDER + 1)):
                     for subset in itertools.combinations(file_mutations_dict[file].keys(), L):
                         mutant_ID += 1
@@ -2254,6 +2334,7 @@ class Schemata:
                                     ],
                                 )
                                 break
+                mutationDatabase2.commit_transaction()
             print("-------------------------------------")
         if self.options.isBuildActive:
             results = mutationDatabase2.fetch_mutations()
@@ -2261,15 +2342,9 @@ class Schemata:
             Mutation.mutation_dict = dict()
             for res in results:
                 Mutation.mutation_dict[int(res[0])] = (
-                    eval(res[9]), eval(res[8]), eval(res[10]))
-                for i in range(len(Mutation.mutation_dict[int(res[0])][0])):
-                    Mutation.mutation_dict[int(res[0])][1][i] = java_parse.Json2Tree(
-                        Mutation.mutation_dict[int(res[0])][1][i])
-
-                    Mutation.mutation_dict[int(res[0])][0][i] = int(
-                        Mutation.mutation_dict[int(res[0])][0][i])
-                    Mutation.mutation_dict[int(
-                        res[0])][2][i] = Mutation.mutation_dict[int(res[0])][2][i]
+                    [int(node_id) for node_id in eval(res[9])],
+                    java_parse.binary2Trees(res[8]) if res[8] is not None else [],
+                    eval(res[10]))
 
             mutants_dict_ = mutationDatabase2.construct_mutant_dict()
             compile_mutations_files = mutationDatabase2.construct_compile_mutations()
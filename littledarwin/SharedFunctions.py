@@ -1,3 +1,4 @@
+import asyncio
 import signal
 import platform
 import sys
@@ -20,6 +21,8 @@ class MutationOperator(object):
 
     instantiable = True
     metaTypes = ["Generic"]
+    # the type of the nodes findNodes looks for.
+    nodeType = None
 
     def __init__(
         self,
@@ -28,8 +31,11 @@ class MutationOperator(object):
         javaParseObject: JavaParse,
         generateMutants=False,
         generateMutations=True,
+        candidateNodes=None,
     ):
         self.sourceTree = sourceTree
+        # the nodes of each type in the tree, if they were gathered for several operators at once.
+        self.candidateNodes = candidateNodes
         self.sourceCode = sourceCode
         self.color = "#FFFFF0"
         self.mutatorType = "GenericMutationOperator"
@@ -44,11 +50,18 @@ class MutationOperator(object):
             self.generateMutations_ = True
         self.javaParseObject = javaParseObject
 
-    def findNodes(self):
+    def findNodes(self, search_children=True):
         """
         Finds all nodes that match the search criteria
         """
-        pass
+        if self.nodeType is None:
+            return
+        if search_children and self.candidateNodes is not None and self.nodeType in self.candidateNodes:
+            self.allNodes = self.candidateNodes[self.nodeType]
+        else:
+            self.allNodes = self.javaParseObject.seekAllNodes(
+                self.sourceTree, self.nodeType, search_children=search_children
+            )
 
     def filterCriteria(self):
         """
@@ -153,35 +166,241 @@ def getAllInstantiableSubclasses(parentClass):
     return allInstantiableSubclasses
 
 
+# the mutation operators of each parent class, resolved by getMutationOperators.
+mutationOperatorRegistry = dict()
+
+
+def getMutationOperators(parentClass):
+    """
+    Returns what getAllInstantiableSubclasses returns, sorted by name so that the order of the mutations does not
+    depend on the process. The classes are only looked up the first time.
+
+    :param parentClass: the class that all its subclasses must be returned
+    :type parentClass: Type[MutationOperator]
+    :return: MutationOperator instantiable subclasses
+    :rtype: tuple
+    """
+    if parentClass not in mutationOperatorRegistry:
+        mutationOperatorRegistry[parentClass] = tuple(
+            sorted(getAllInstantiableSubclasses(parentClass), key=lambda subClass: subClass.__name__)
+        )
+    return mutationOperatorRegistry[parentClass]
+
+
+def normalize_test_name(test_name):
+    """
+    Coverage and JUnit reports use different separators between class, nested class and method.
+
+    :param test_name:
+    :type test_name: str
+    :return: the name with all separators replaced by "."
+    :rtype: str
+    """
+    return test_name.replace("$", ".").replace("#", ".")
+
+
 def parse_junit_xml(xml_file):
+    """
+    Reads the test cases of a JUnit XML report. The report is streamed, and every test case is dropped as soon as it
+    is read, so large reports are not kept in memory.
+
+    :param xml_file:
+    :type xml_file: str
+    :return: (name, time, failure message, error message) of each test case, an empty list if the report cannot be
+        read
+    :rtype: list
+    """
     try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
         results = []
-        for testcase in root.findall("testcase"):
-            name = testcase.get("classname") + "." + testcase.get("name")
-            failures = testcase.findall("failure")
-            failureMessage = ""
-            if len(failures) > 0:
-                failureMessage = failures[0].text
-            errors = testcase.findall("error")
-            errorMessage = ""
-            if len(errors) > 0:
-                errorMessage = errors[0].text
-            time = testcase.get("time")
-            results.append((name, time, failureMessage, errorMessage))
+        root = None
+        depth = 0
+        for event, element in ET.iterparse(xml_file, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            # only the test cases right under the root element are reported.
+            if element.tag == "testcase":
+                name = element.get("classname") + "." + element.get("name")
+                failure = element.find("failure")
+                failureMessage = ""
+                if failure is not None:
+                    failureMessage = failure.text
+                error = element.find("error")
+                errorMessage = ""
+                if error is not None:
+                    errorMessage = error.text
+                results.append((name, element.get("time"), failureMessage, errorMessage))
+            root.clear()
     except Exception as e:
         return []
     return results
 
 
+# output lines that show a test has already failed: surefire's summary and per-test markers, ant's junit task,
+# JUnitCore, and the JUnit console launcher.
+DEFAULT_KILL_PATTERNS = [
+    r"Tests run:.*Failures: [1-9]",
+    r"Tests run:.*Errors: [1-9]",
+    r"<<< (FAILURE|ERROR)!",
+    r"Test .* FAILED",
+    r"^FAILURES!!!",
+    r"\[\s*[1-9][0-9]* tests failed\s*\]",
+]
+
+
+def early_kill_patterns(fail_string=None, extra_patterns=None):
+    """
+    Returns the compiled patterns timeoutAlternative stops a process on.
+
+    :param fail_string: the --fail_string option, matched literally
+    :type fail_string: str
+    :param extra_patterns: additional regular expressions
+    :type extra_patterns: list
+    :return:
+    :rtype: list
+    """
+    patterns = list(DEFAULT_KILL_PATTERNS)
+    if fail_string is not None:
+        patterns.append(re.escape(fail_string))
+    if extra_patterns is not None:
+        patterns += extra_patterns
+    return [re.compile(pattern) for pattern in patterns]
+
+
+def killProcessGroup(pid):
+    """
+    Terminates a process and everything it started.
+
+    :param pid: process id of the group leader
+    :type pid: int
+    """
+    # there is no support for os.killpg on windows, neither does it have SIGKILL.
+    if platform.system() == "Windows":
+        # this utility is not included in windows XP Home edition, however, there is no other alternative either.
+        # therefore, don't run LittleDarwin on windows XP Home edition; he gets sad.
+        subprocess.Popen("taskkill /F /T /PID %i" % pid, shell=True)
+    else:
+        # posix systems all support this call.
+        try:
+            os.killpg(os.getpgid(pid), signal.SIGTERM)
+        except:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+class AsyncProcessRunner:
+    """
+    Runs child processes on a single asyncio event loop in a background thread. Any thread can submit a process
+    and wait for its result; the loop reads the output of all of them, and enforces their timeouts with timer
+    callbacks instead of a watchdog thread per process.
+    """
+
+    BUFFER_SIZE = 64 * 1024
+    OUTPUT_MAX_SIZE = 1024 * 1024 * 100  # 100MB
+    PENDING_LINE_MAX_SIZE = 64 * 1024
+
+    _instance = None
+    _instanceLock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def instance(cls):
+        """
+        :return: the runner shared by all threads
+        :rtype: AsyncProcessRunner
+        """
+        with cls._instanceLock:
+            if cls._instance is None:
+                cls._instance = AsyncProcessRunner()
+            return cls._instance
+
+    def run(self, commandString, workingDirectory, timeout, env=None, inputData=None, killPatterns=None):
+        """
+        Runs a command and blocks the calling thread until it is done.
+
+        :return: whether it timed out, its return code, its output, the kill pattern it was stopped on (or None),
+            and the time it took
+        :rtype: tuple
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._run(commandString, workingDirectory, timeout, env, inputData, killPatterns), self.loop
+        ).result()
+
+    async def _run(self, commandString, workingDirectory, timeout, env, inputData, killPatterns):
+        # a new session puts the process and its children in their own group, so they can be killed together.
+        process = await asyncio.create_subprocess_exec(
+            *commandString, cwd=workingDirectory, env=env, stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            start_new_session=platform.system() != "Windows"
+        )
+        timeStarted = time.time()
+        timedOut = False
+
+        def onTimeout():
+            nonlocal timedOut
+            timedOut = True
+            killProcessGroup(process.pid)
+
+        timer = self.loop.call_later(timeout, onTimeout)
+        if inputData is not None:
+            process.stdin.write(inputData.encode("utf-8") if isinstance(inputData, str) else inputData)
+            process.stdin.close()
+
+        chunks = list()
+        outputSize = 0
+        matchedPattern = None
+        pendingLine = ""
+        try:
+            while True:
+                chunk = await process.stdout.read(self.BUFFER_SIZE)
+                if chunk == b"":
+                    break
+                # the output is kept up to the limit, the rest is read and thrown away.
+                if outputSize < self.OUTPUT_MAX_SIZE:
+                    chunks.append(chunk)
+                    outputSize += len(chunk)
+                if killPatterns is not None and matchedPattern is None:
+                    lines = (pendingLine + chunk.decode("utf-8", errors="ignore")).split("\n")
+                    # the last line may be incomplete; it is scanned once the rest of it arrives.
+                    pendingLine = lines.pop()[-self.PENDING_LINE_MAX_SIZE:]
+                    matchedPattern = next(
+                        (pattern for line in lines for pattern in killPatterns if pattern.search(line)), None
+                    )
+                    if matchedPattern is not None:
+                        killProcessGroup(process.pid)
+            await process.wait()
+        finally:
+            timer.cancel()
+            if process.returncode is None:
+                killProcessGroup(process.pid)
+        return (
+            timedOut,
+            process.returncode,
+            b"".join(chunks).decode("utf-8", errors="ignore"),
+            matchedPattern,
+            time.time() - timeStarted,
+        )
+
+
 def timeoutAlternative(
     commandString,
     workingDirectory,
     timeout,
     failMessage=None,
     inputData=None,
-    activeMutants=list([]), buffer_size=1024
+    activeMutants=list([]), buffer_size=1024,
+    killPatterns=None
 ):
     """
 
@@ -189,36 +408,11 @@ def timeoutAlternative(
     :param workingDirectory: the directory that the command is supposed to run in
     :param timeout: timeout in seconds
     :param inputData: the data that the run process may need. defaults to None.
+    :param killPatterns: compiled patterns. the output is scanned line by line as it arrives, and the process is
+        stopped as soon as a line matches one of them. defaults to None (no scanning).
     :return: returns kill status, process return code and the output of the system
     """
 
-    killCheck = threading.Event()
-
-    # this method is run in another thread when the timeout is expired to kill the process.
-    def killProcess(pipe):
-        """
-
-        :param pipe:
-        :type pipe:
-        """
-        assert isinstance(pipe, subprocess.Popen)
-
-        # there is no support for os.killpg on windows, neither does it have SIGKILL.
-        if platform.system() == "Windows":
-            # this utility is not included in windows XP Home edition, however, there is no other alternative either.
-            # therefore, don't run LittleDarwin on windows XP Home edition; he gets sad.
-            subprocess.Popen("taskkill /F /T /PID %i" % pipe.pid, shell=True)
-        else:
-            # posix systems all support this call.
-            # pipe.terminate()
-            try:
-                os.killpg(os.getpgid(pipe.pid), signal.SIGTERM)
-            except:
-                os.kill(pipe.pid, signal.SIGTERM)
-
-        # we just killed the process. let everyone know.
-        killCheck.set()
-
     # timeout must be int, otherwise problems arise.
     assert isinstance(timeout, int)
 
@@ -239,63 +433,27 @@ def timeoutAlternative(
     my_env = os.environ.copy()
     for activeMutant in activeMutants:
         my_env["MUT" + str(activeMutant)] = "true"
-    # starting the process with the given parameters.
-    if platform.system() != "Windows":
-        process = subprocess.Popen(commandString, cwd=workingDirectory, stdin=subprocess.PIPE, env=my_env,
-                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, preexec_fn=os.setsid)
-    else:  # in Windows
-        process = subprocess.Popen(commandString, cwd=workingDirectory, stdin=subprocess.PIPE, env=my_env,
-                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    timeStarted = time.time()
-    # passing the process and timeout references to threading's timer method, so that it kills the process
-    # if timeout expires.
-    timerWatchdog = threading.Timer(timeout, killProcess, args=[process])
-    timerWatchdog.start()
-
-    buffer_size = 1024
-    output_max_reached = False
-    output_max_size = 1024 * 1024 * 100  # 100MB
-    output_size = 0
-    # getting the output of the process.
-    stdout_str = ""
-    stderr_str = ""
-    output = process.stdout.read(buffer_size)
-    output_err = ""
-    output_err = process.stderr.read(
-        buffer_size) if process.stderr is not None else output_err
-    while process.poll() is None or output != b"":
-        if output and output_max_reached is False:
-            output_size += len(output)
-            stdout_str += output.decode("utf-8", errors="ignore").strip()
-        if output_size > output_max_size:
-            output_max_reached = True
-        output = process.stdout.read(buffer_size)
-        output_err = process.stderr.read(
-            buffer_size) if process.stderr is not None else output_err
-        stderr_str += output_err.decode(
-            "utf-8", errors="ignore").strip() if output_err != "" else output_err
-
-    # do the stuff in the process.
-    process.wait()
-    # if the process is done, no need to kill it.
-    timerWatchdog.cancel()
-
-    isKilled = killCheck.is_set()
-    killCheck.clear()
-    try:
-        process.kill()
-        process.terminate()
-        process.wait()
-    except:
-        print("error killing process")
+
+    isKilled, returncode, stdout_str, matchedPattern, timeDelta = AsyncProcessRunner.instance().run(
+        commandString,
+        workingDirectory,
+        timeout,
+        env=my_env,
+        inputData=inputData,
+        killPatterns=killPatterns,
+    )
 
     if failMessage != None:
         if failMessage in stdout_str:
             isKilled = True
-    timeDelta = time.time() - timeStarted
+    if matchedPattern is not None:
+        stdout_str += "\nLittleDarwin: stopped early, the output matched " + matchedPattern.pattern
+        # the process may have exited on its own before it was stopped.
+        returncode = returncode if returncode else 1
+        if failMessage is not None and matchedPattern.pattern == re.escape(failMessage):
+            isKilled = True
 
     ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
     stdout_str += "\n ================================================ STDERR ================================================ \n"
-    stdout_str += stderr_str
     stdout_str = ansi_escape.sub('', stdout_str)
-    return isKilled, process.returncode, stdout_str, timeDelta
+    return isKilled, returncode, stdout_str, timeDelta
@@ -0,0 +1,168 @@
+import glob
+import io
+import os
+import threading
+
+from littledarwin.JavaParse import JavaParse
+from littledarwin.JavaParser import JavaParser
+from littledarwin.SharedFunctions import normalize_test_name, parse_junit_xml
+
+
+class TestPrioritizer:
+    """
+    Orders the tests that cover a mutant so that the tests most likely to kill it run first. The likelihood is
+    estimated from earlier kills: a test that killed mutants on the same line counts most, then on the same method,
+    then mutants of the same operator. The history is read from the mutant_test table and is extended with the
+    kills observed during the current run.
+    """
+
+    LINE_WEIGHT = 4
+    METHOD_WEIGHT = 2
+    OPERATOR_WEIGHT = 1
+
+    def __init__(self, database):
+        """
+
+        :param database:
+        :type database: Database
+        """
+        self.lock = threading.Lock()
+        self.killsPerLine = dict()
+        self.killsPerMethod = dict()
+        self.killsPerOperator = dict()
+        self.killsPerTest = dict()
+        self.methodRanges = dict()
+        self.mutantOperators = dict()
+        for mutantID, operatorID in database.fetch_mutant_operators():
+            self.mutantOperators.setdefault(mutantID, set()).add(operatorID)
+        for fileName, lineNo, operatorID, testName in database.fetch_kill_history():
+            self._record(fileName, [lineNo], {operatorID}, testName)
+
+    def _methodOfLine(self, fileName, line):
+        """
+        :return: the line range of the innermost method or constructor containing the line, or None
+        :rtype: tuple
+        """
+        if fileName not in self.methodRanges:
+            ranges = list()
+            try:
+                with io.open(fileName, mode="r", errors="replace") as contentFile:
+                    javaParse = JavaParse()
+                    tree = javaParse.parse(contentFile.read())
+                for declarationType in (
+                    JavaParser.MethodDeclarationContext,
+                    JavaParser.ConstructorDeclarationContext,
+                ):
+                    for declaration in javaParse.seekAllNodes(tree, declarationType):
+                        ranges.append((declaration.start.line, declaration.stop.line))
+            except Exception:
+                # without method information, the ordering falls back to lines and operators.
+                pass
+            self.methodRanges[fileName] = ranges
+        enclosing = [r for r in self.methodRanges[fileName] if r[0] <= line <= r[1]]
+        if len(enclosing) == 0:
+            return None
+        return min(enclosing, key=lambda r: r[1] - r[0])
+
+    def _record(self, fileName, lines, operators, testName):
+        testName = normalize_test_name(testName)
+        self.killsPerTest[testName] = self.killsPerTest.get(testName, 0) + 1
+        methods = set()
+        for line in lines:
+            counter = self.killsPerLine.setdefault((fileName, int(line)), dict())
+            counter[testName] = counter.get(testName, 0) + 1
+            methods.add(self._methodOfLine(fileName, int(line)))
+        methods.discard(None)
+        for method in methods:
+            counter = self.killsPerMethod.setdefault((fileName, method), dict())
+            counter[testName] = counter.get(testName, 0) + 1
+        for operator in operators:
+            counter = self.killsPerOperator.setdefault(operator, dict())
+            counter[testName] = counter.get(testName, 0) + 1
+
+    @staticmethod
+    def _parseLines(lines):
+        return [int(line) for line in str(lines).split(",") if line.strip() != ""]
+
+    def recordKill(self, fileName, mutantID, lines, testNames):
+        """
+        Adds the tests that killed a mutant to the history.
+
+        :param fileName: the mutated source file
+        :type fileName: str
+        :param mutantID:
+        :type mutantID: int
+        :param lines: comma separated line numbers of the mutant
+        :type lines: str
+        :param testNames: the failing tests
+        :type testNames: list
+        """
+        with self.lock:
+            for testName in testNames:
+                self._record(
+                    fileName,
+                    self._parseLines(lines),
+                    self.mutantOperators.get(mutantID, set()),
+                    testName,
+                )
+
+    def prioritize(self, fileName, mutantID, lines, test_names):
+        """
+        Returns the covering tests of a mutant, the most likely killers first. Tests without any history keep their
+        original order.
+
+        :param fileName: the mutated source file
+        :type fileName: str
+        :param mutantID:
+        :type mutantID: int
+        :param lines: comma separated line numbers of the mutant
+        :type lines: str
+        :param test_names: the covering tests, as returned by Database.fetch_coverage
+        :type test_names: list
+        :return:
+        :rtype: list
+        """
+        if test_names is None or len(test_names) < 2:
+            return test_names
+        with self.lock:
+            lineCounters = [
+                self.killsPerLine.get((fileName, line), dict()) for line in self._parseLines(lines)
+            ]
+            methods = {self._methodOfLine(fileName, line) for line in self._parseLines(lines)}
+            methods.discard(None)
+            methodCounters = [self.killsPerMethod.get((fileName, method), dict()) for method in methods]
+            operatorCounters = [
+                self.killsPerOperator.get(operator, dict())
+                for operator in self.mutantOperators.get(mutantID, set())
+            ]
+
+            def score(indexedTest):
+                index, test = indexedTest
+                if test == "":
+                    return 0, 0, index
+                testName = normalize_test_name(test[0])
+                likelihood = (
+                    self.LINE_WEIGHT * sum(c.get(testName, 0) for c in lineCounters)
+                    + self.METHOD_WEIGHT * sum(c.get(testName, 0) for c in methodCounters)
+                    + self.OPERATOR_WEIGHT * sum(c.get(testName, 0) for c in operatorCounters)
+                )
+                return -likelihood, -self.killsPerTest.get(testName, 0), index
+
+            return [test for index, test in sorted(enumerate(test_names), key=score)]
+
+    @staticmethod
+    def findKillingTests(reportPath):
+        """
+        Reads the JUnit reports of a mutant and returns the tests that failed.
+
+        :param reportPath: the directory the test reports of the mutant were written to
+        :type reportPath: str
+        :return:
+        :rtype: list
+        """
+        killingTests = list()
+        for xmlFile in glob.glob(os.path.join(reportPath, "**", "*.xml"), recursive=True):
+            for name, time, failureMessage, errorMessage in parse_junit_xml(xmlFile):
+                if failureMessage != "" or errorMessage != "":
+                    killingTests.append(name)
+        return killingTests
@@ -0,0 +1,107 @@
+import glob
+import os
+
+from joblib import Parallel, delayed
+
+from littledarwin.Database import Database
+from littledarwin.SharedFunctions import normalize_test_name, parse_junit_xml
+
+
+class TestReportReader:
+    """
+    Reads the JUnit reports of the mutants into the mutant_test table. The test ids are looked up in a map that is
+    built from the test table once. The mutants are read in chunks: the reports of a chunk are parsed in a process
+    pool when there are enough of them, and its rows are written with a single insert.
+    """
+
+    # mutants whose rows are written together.
+    CHUNK_SIZE = 1000
+    # below this many report files, starting the worker processes takes longer than parsing.
+    POOL_THRESHOLD = 64
+
+    def __init__(self, database, numberOfJobs=1):
+        """
+
+        :param database:
+        :type database: Database
+        :param numberOfJobs: the number of processes that parse the reports
+        :type numberOfJobs: int
+        """
+        self.numberOfJobs = int(numberOfJobs)
+        # at this stage we do not need to have the test method or class separated.
+        self.testIDs = {
+            normalize_test_name(qualifiedName): testID for testID, qualifiedName in database.fetch_data("test")
+        }
+
+    def rows(self, mutantID, results):
+        """
+        :param mutantID:
+        :type mutantID: int
+        :param results: the test cases of a report, as parse_junit_xml returns them
+        :type results: list
+        :return: the mutant_test rows of the test cases
+        :rtype: list
+        """
+        values = []
+        for name, time, failureMessage, errorMessage in results:
+            test_res = Database.RES_ID_SURVIVED_MUTANT
+            error_msg = ""
+            if failureMessage != "":
+                error_msg = failureMessage
+                test_res = Database.RES_ID_KILLED_BY_FAILURE_MUTANT
+            elif errorMessage != "":
+                error_msg = errorMessage
+                test_res = Database.RES_ID_KILLED_BY_ERROR_MUTANT
+            values.append((mutantID, self.testIDs.get(name, str(Database.NO_TEST)), test_res, time, error_msg))
+        return values
+
+    def readReports(self, mutationDatabase, mutantReports):
+        """
+        Adds the test results of the mutants to mutant_test. A mutant without a report directory is recorded as a
+        build failure.
+
+        :param mutationDatabase:
+        :type mutationDatabase: Database
+        :param mutantReports: (mutant id, report directory) of each mutant
+        :type mutantReports: list
+        """
+        for start in range(0, len(mutantReports), self.CHUNK_SIZE):
+            self._readChunk(mutationDatabase, mutantReports[start:start + self.CHUNK_SIZE])
+
+    def _readChunk(self, mutationDatabase, mutantReports):
+        reportFiles = list()
+        missingReports = set()
+        for mutantID, directory in mutantReports:
+            if os.path.exists(directory):
+                reportFiles.extend(
+                    (mutantID, xmlFile)
+                    for xmlFile in glob.glob(str(os.path.join(directory, "**", "*.xml")), recursive=True)
+                )
+            else:
+                missingReports.add(mutantID)
+        if self.numberOfJobs > 1 and len(reportFiles) >= self.POOL_THRESHOLD:
+            # the worker processes are kept between the chunks.
+            parsedReports = Parallel(n_jobs=self.numberOfJobs)(
+                delayed(parse_junit_xml)(xmlFile) for mutantID, xmlFile in reportFiles
+            )
+        else:
+            parsedReports = [parse_junit_xml(xmlFile) for mutantID, xmlFile in reportFiles]
+
+        resultsOfMutant = dict()
+        for (mutantID, xmlFile), results in zip(reportFiles, parsedReports):
+            resultsOfMutant.setdefault(mutantID, list()).extend(self.rows(mutantID, results))
+        values = list()
+        for mutantID, directory in mutantReports:
+            if mutantID in missingReports:
+                values.append(
+                    (
+                        mutantID,
+                        Database.NO_INFO,
+                        Database.RES_ID_BUILD_FAILURE,
+                        "0",
+                        "no results found. Most probably compilation error.",
+                    )
+                )
+            else:
+                values.extend(resultsOfMutant.get(mutantID, list()))
+        mutationDatabase.insert_many("mutant_test", "mutant_id, test_id, result, time, message", values)
@@ -0,0 +1,219 @@
+import os
+import platform
+import queue
+import signal
+import subprocess
+import threading
+import time
+
+import importlib_resources as resources
+
+from littledarwin.IncrementalBuild import IncrementalBuild
+from littledarwin.SharedFunctions import timeoutAlternative
+
+
+class TestRunnerError(Exception):
+    """
+    The runner could not run the tests of a mutant, for a reason that has nothing to do with the mutant.
+    """
+    pass
+
+
+class TestRunnerDaemon:
+    """
+    A long-lived JVM that runs the tests of the project for one worker. The dependencies stay loaded between
+    mutants, and only the project classes are loaded again (from the mutant's overlay) for each run. If a run times
+    out or the runner stops answering, the JVM is killed and started again for the next mutant.
+    """
+
+    MARKER = "##LITTLEDARWIN##"
+    # what the runner reports instead of the results when it could not load the tests.
+    ERROR = "ERROR"
+    RUNNER_CLASS = "LittleDarwinTestRunner"
+
+    def __init__(self, incremental_build, runner_path, working_directory, startup_timeout=60):
+        """
+
+        :param incremental_build: provides the classpath of the project
+        :type incremental_build: IncrementalBuild
+        :param runner_path: directory holding the compiled runner
+        :type runner_path: str
+        :param working_directory: the directory the tests run in
+        :type working_directory: str
+        :param startup_timeout: how long the JVM may take to start, in seconds
+        :type startup_timeout: int
+        """
+        self.incremental_build = incremental_build
+        self.runner_path = runner_path
+        self.working_directory = working_directory
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.lines = None
+
+    @staticmethod
+    def compile_runner(incremental_build, runner_path, timeout=60):
+        """
+        Compiles the runner against the dependencies of the project, unless it is already compiled.
+
+        :param incremental_build:
+        :type incremental_build: IncrementalBuild
+        :param runner_path:
+        :type runner_path: str
+        :param timeout:
+        :type timeout: int
+        :return: True if the runner is available
+        :rtype: bool
+        """
+        class_path = os.path.join(runner_path, TestRunnerDaemon.RUNNER_CLASS + ".class")
+        os.makedirs(runner_path, exist_ok=True)
+        with resources.as_file(
+            resources.files("littledarwin")
+            .joinpath("java")
+            .joinpath(TestRunnerDaemon.RUNNER_CLASS + ".java")
+        ) as source_path:
+            # a runner compiled by an older version may not speak the same protocol.
+            if os.path.isfile(class_path) and os.path.getmtime(class_path) >= os.path.getmtime(source_path):
+                return True
+            isKilled, returncode, output, timeDelta = timeoutAlternative(
+                [
+                    IncrementalBuild.java_tool("javac"),
+                    "-nowarn",
+                    "-d",
+                    runner_path,
+                    "-cp",
+                    os.pathsep.join(incremental_build.dependencies),
+                    str(source_path),
+                ],
+                workingDirectory=runner_path,
+                timeout=timeout,
+            )
+        if isKilled or returncode:
+            print("Compiling the test runner failed:\n" + str(output))
+            return False
+        return True
+
+    def runner_command(self):
+        """
+        :return: the command that starts the runner JVM
+        :rtype: list
+        """
+        return [
+            IncrementalBuild.java_tool("java"),
+            "-cp",
+            os.pathsep.join([self.runner_path] + self.incremental_build.dependencies),
+            self.RUNNER_CLASS,
+        ]
+
+    def start(self):
+        """
+        Starts the runner JVM. run() waits for it to report that it is ready.
+        """
+        command = self.runner_command()
+        if platform.system() != "Windows":
+            self.process = subprocess.Popen(command, cwd=self.working_directory, stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                            preexec_fn=os.setsid)
+        else:
+            self.process = subprocess.Popen(command, cwd=self.working_directory, stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        # lines are read in a separate thread, so that waiting for them can time out.
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_lines, args=(self.process, self.lines), daemon=True).start()
+
+    @staticmethod
+    def _read_lines(process, lines):
+        for line in iter(process.stdout.readline, b""):
+            lines.put(line.decode("utf-8", errors="ignore"))
+        # end of stream: the runner has died.
+        lines.put(None)
+
+    def stop(self):
+        """
+        Kills the runner JVM and everything it started, the same way timeoutAlternative does on a timeout.
+        """
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            if platform.system() == "Windows":
+                subprocess.Popen("taskkill /F /T /PID %i" % self.process.pid, shell=True)
+            else:
+                try:
+                    os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
+                except:
+                    os.kill(self.process.pid, signal.SIGTERM)
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.process = None
+
+    def run(self, overlay_path, test_classes, timeout, failMessage=None, failFast=False):
+        """
+        Runs the given test classes against the overlay. The result has the same shape as timeoutAlternative's.
+        If the runner does not start, can't be reached, or can't load the test classes, TestRunnerError is raised
+        instead: the tests did not run.
+
+        :param overlay_path: directory holding the mutated classes
+        :type overlay_path: str
+        :param test_classes: fully qualified names of the test classes
+        :type test_classes: list
+        :param timeout: timeout in seconds
+        :type timeout: int
+        :param failMessage: a string that marks the run as failed if it appears in the output
+        :type failMessage: str
+        :param failFast: stop at the first failing test
+        :type failFast: bool
+        :return: kill status, return code, output and the time it took
+        :rtype: tuple
+        """
+        if self.process is None or self.process.poll() is not None:
+            self.stop()
+            self.start()
+            # the startup of the JVM does not count towards the timeout of the mutant.
+            found, output, marker = self._read_until_marker(time.time() + self.startup_timeout)
+            if not found:
+                self.stop()
+                raise TestRunnerError("test runner did not start\n" + output)
+        timeStarted = time.time()
+
+        request = "\t".join(
+            ["RUNFAILFAST" if failFast else "RUN", overlay_path, self.incremental_build.test_classes_path, self.incremental_build.classes_path]
+            + list(test_classes)
+        )
+        try:
+            self.process.stdin.write((request + "\n").encode("utf-8"))
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self.stop()
+            raise TestRunnerError("test runner died")
+
+        found, output, marker = self._read_until_marker(timeStarted + timeout)
+        if not found:
+            # either the tests hang or the runner crashed (e.g. a mutant called System.exit). in both cases the state
+            # of the runner can't be trusted anymore.
+            isKilled = time.time() >= timeStarted + timeout
+            self.stop()
+            return isKilled, 1, output, time.time() - timeStarted
+
+        if marker.split()[1:2] == [self.ERROR]:
+            raise TestRunnerError("test runner could not load the tests\n" + output)
+        runCount, failureCount = (int(value) for value in marker.split()[1:3])
+        isKilled = failMessage is not None and failMessage in output
+        return isKilled, 1 if failureCount > 0 else 0, output, time.time() - timeStarted
+
+    def _read_until_marker(self, deadline):
+        """
+        :return: whether the marker was found, the output before it, and the marker line
+        :rtype: tuple
+        """
+        output = []
+        while True:
+            try:
+                line = self.lines.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                return False, "".join(output), None
+            if line is None:
+                return False, "".join(output), None
+            if line.startswith(self.MARKER):
+                return True, "".join(output), line
+            output.append(line)
@@ -0,0 +1,128 @@
+import os
+import shutil
+
+
+class Workspace:
+    """
+    A working copy of the project under test. Each mutant is copied into a workspace, built and tested there, and
+    the original file is put back afterwards. Giving every worker its own workspace lets several mutants be
+    evaluated at the same time without them overwriting each other's sources or build outputs.
+    """
+
+    def __init__(self, buildDir, testDir=None, lineCoverage=None, originalBuildDir=None, name="main"):
+        """
+
+        :param buildDir: build system working directory of this copy
+        :type buildDir: str
+        :param testDir: test project working directory of this copy (defaults to buildDir)
+        :type testDir: str
+        :param lineCoverage: the LineCoverage object that prepares the build file of this copy
+        :type lineCoverage: LineCoverage
+        :param originalBuildDir: build directory of the project this workspace was copied from
+        :type originalBuildDir: str
+        :param name: a short name used in log messages
+        :type name: str
+        """
+        self.buildDir = buildDir
+        self.testDir = buildDir if testDir is None else testDir
+        self.lineCoverage = lineCoverage
+        self.originalBuildDir = buildDir if originalBuildDir is None else originalBuildDir
+        self.name = name
+        self.testRunner = None
+
+    def isCopy(self):
+        """
+        :return: True if this workspace is a copy of the project and not the project itself
+        :rtype: bool
+        """
+        return os.path.abspath(self.buildDir) != os.path.abspath(self.originalBuildDir)
+
+    def contains(self, path):
+        """
+        :param path: a path in the original project
+        :type path: str
+        :return: True if the path can be mapped into this workspace
+        :rtype: bool
+        """
+        relativePath = os.path.relpath(os.path.abspath(path), os.path.abspath(self.originalBuildDir))
+        return not (relativePath == os.pardir or relativePath.startswith(os.pardir + os.sep))
+
+    def mapPath(self, path):
+        """
+        Translates a path in the original project to the same path in this workspace.
+
+        :param path: a path in the original project
+        :type path: str
+        :return: the corresponding path in this workspace
+        :rtype: str
+        """
+        if not self.isCopy():
+            return path
+        return os.path.join(
+            self.buildDir, os.path.relpath(os.path.abspath(path), os.path.abspath(self.originalBuildDir))
+        )
+
+    def mapCommand(self, command):
+        """
+        Rewrites absolute paths pointing into the original project (e.g. "-f /path/to/pom.xml") so that the
+        command runs against this workspace.
+
+        :param command: the command as a list of arguments
+        :type command: list
+        :return: the rewritten command
+        :rtype: list
+        """
+        if not self.isCopy():
+            return command
+        return [self.mapPath(arg) if os.path.isabs(arg) and self.contains(arg) else arg for arg in command]
+
+    def clone(self, targetDir, name):
+        """
+        Copies the project into targetDir and returns a workspace for the copy. LittleDarwin's own results
+        directory is not copied.
+
+        :param targetDir: where to put the copy
+        :type targetDir: str
+        :param name: a short name used in log messages
+        :type name: str
+        :return: the new workspace
+        :rtype: Workspace
+        """
+        if os.path.exists(targetDir):
+            shutil.rmtree(targetDir)
+        shutil.copytree(
+            self.buildDir, targetDir, symlinks=True, ignore=shutil.ignore_patterns("LittleDarwinResults")
+        )
+        workspace = Workspace(targetDir, originalBuildDir=self.originalBuildDir, name=name)
+        workspace.testDir = workspace.mapPath(self.testDir)
+        if self.lineCoverage is not None:
+            workspace.lineCoverage = self.lineCoverage.copy_to(targetDir)
+        return workspace
+
+    @staticmethod
+    def createWorkerWorkspaces(mainWorkspace, workspacesPath, jobs):
+        """
+        Creates one copy of the project per worker.
+
+        :param mainWorkspace: the workspace of the original project
+        :type mainWorkspace: Workspace
+        :param workspacesPath: the directory that holds the copies
+        :type workspacesPath: str
+        :param jobs: number of workers
+        :type jobs: int
+        :return: list of workspaces
+        :rtype: list
+        """
+        os.makedirs(workspacesPath, exist_ok=True)
+        return [
+            mainWorkspace.clone(os.path.join(workspacesPath, "worker-" + str(i)), "worker-" + str(i))
+            for i in range(jobs)
+        ]
+
+    @staticmethod
+    def removeWorkerWorkspaces(workspacesPath):
+        """
+        :param workspacesPath: the directory that holds the copies
+        :type workspacesPath: str
+        """
+        shutil.rmtree(workspacesPath, ignore_errors=True)
@@ -0,0 +1,129 @@
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.util.ArrayList;
+import java.util.List;
+
+import org.junit.runner.Request;
+import org.junit.runner.Result;
+import org.junit.runner.notification.Failure;
+import org.junit.runner.notification.RunListener;
+import org.junit.runner.notification.RunNotifier;
+import org.junit.runner.notification.StoppedByUserException;
+
+/**
+ * Long-lived JUnit runner used by LittleDarwin.
+ *
+ * The dependencies of the project (including JUnit) are on the classpath of this JVM, so they are loaded and
+ * JIT-compiled only once. For every request the project classes are loaded into a fresh class loader with the
+ * mutant's overlay directory in front, so that the mutated classes shadow the original ones.
+ *
+ * Protocol (one request per line on stdin, tab separated):
+ *     RUN &lt;overlay&gt; &lt;test classes&gt; &lt;project classes&gt; &lt;test class&gt;...
+ *     RUNFAILFAST &lt;overlay&gt; &lt;test classes&gt; &lt;project classes&gt; &lt;test class&gt;...
+ *     QUIT
+ * RUNFAILFAST stops at the first failing test. The test classes are run in the given order.
+ * For each RUN the output of the tests is written to stdout, followed by the line
+ *     ##LITTLEDARWIN## &lt;tests run&gt; &lt;failures&gt;
+ * If the request is malformed or a test class can't be loaded, the tests are not run, and the line is
+ *     ##LITTLEDARWIN## ERROR
+ * instead, since that says nothing about the mutant.
+ */
+public class LittleDarwinTestRunner {
+    static final String MARKER = "##LITTLEDARWIN##";
+    static final String ERROR = "ERROR";
+
+    public static void main(String[] args) throws Exception {
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, "UTF-8"));
+        PrintStream protocol = new PrintStream(System.out, true, "UTF-8");
+        protocol.println(MARKER + " READY");
+
+        String line;
+        while ((line = in.readLine()) != null) {
+            String[] request = line.split("\t");
+            if (request.length == 0 || request[0].equals("QUIT")) {
+                break;
+            }
+            boolean failFast = request[0].equals("RUNFAILFAST");
+            if (!(request[0].equals("RUN") || failFast) || request.length < 4) {
+                protocol.println("malformed request: " + line);
+                protocol.println(MARKER + " " + ERROR);
+                continue;
+            }
+
+            ByteArrayOutputStream buffer = new ByteArrayOutputStream();
+            PrintStream capture = new PrintStream(buffer, true, "UTF-8");
+            PrintStream originalOut = System.out;
+            PrintStream originalErr = System.err;
+            System.setOut(capture);
+            System.setErr(capture);
+            int runCount = 0;
+            int failureCount = 0;
+            boolean isLoaded = false;
+            URLClassLoader loader = null;
+            try {
+                loader = new URLClassLoader(new URL[]{
+                        new File(request[1]).toURI().toURL(),
+                        new File(request[2]).toURI().toURL(),
+                        new File(request[3]).toURI().toURL()},
+                        LittleDarwinTestRunner.class.getClassLoader());
+                List<Class<?>> testClasses = new ArrayList<Class<?>>();
+                for (int i = 4; i < request.length; i++) {
+                    // the classes are initialized by JUnit, so that an error in a static initializer is a failure
+                    // of the tests like any other.
+                    testClasses.add(Class.forName(request[i], false, loader));
+                }
+                isLoaded = true;
+                Thread.currentThread().setContextClassLoader(loader);
+                Result result = run(testClasses, failFast);
+                runCount = result.getRunCount();
+                failureCount = result.getFailureCount();
+                for (Failure failure : result.getFailures()) {
+                    capture.println(failure.toString());
+                    capture.println(failure.getTrace());
+                }
+                capture.println("Tests run: " + runCount + ", Failures: " + failureCount);
+            } catch (Throwable t) {
+                t.printStackTrace(capture);
+                failureCount = Math.max(failureCount, 1);
+            } finally {
+                System.setOut(originalOut);
+                System.setErr(originalErr);
+                Thread.currentThread().setContextClassLoader(LittleDarwinTestRunner.class.getClassLoader());
+                if (loader != null) {
+                    loader.close();
+                }
+            }
+            protocol.println(buffer.toString("UTF-8"));
+            if (isLoaded) {
+                protocol.println(MARKER + " " + runCount + " " + failureCount);
+            } else {
+                protocol.println(MARKER + " " + ERROR);
+            }
+        }
+    }
+
+    static Result run(List<Class<?>> testClasses, boolean failFast) {
+        final RunNotifier notifier = new RunNotifier();
+        Result result = new Result();
+        notifier.addListener(result.createListener());
+        if (failFast) {
+            notifier.addListener(new RunListener() {
+                @Override
+                public void testFailure(Failure failure) {
+                    notifier.pleaseStop();
+                }
+            });
+        }
+        try {
+            Request.classes(testClasses.toArray(new Class<?>[0])).getRunner().run(notifier);
+        } catch (StoppedByUserException e) {
+            // the first failure stopped the run.
+        }
+        return result;
+    }
+}
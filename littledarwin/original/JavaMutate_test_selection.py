@@ -9,7 +9,7 @@ from antlr4.tree.Tree import TerminalNodeImpl
 from littledarwin.JavaParse import JavaParse
 from littledarwin.JavaParser import JavaParser
 from littledarwin.Database import Database
-from littledarwin.SharedFunctions import getAllInstantiableSubclasses
+from littledarwin.SharedFunctions import getMutationOperators
 
 sys.setrecursionlimit(100000)
 
@@ -19,6 +19,8 @@ class MutationOperator(object):
 
     instantiable = True
     metaTypes = ["Generic"]
+    # the type of the nodes findNodes looks for.
+    nodeType = None
 
     def __init__(
         self,
@@ -27,8 +29,11 @@ class MutationOperator(object):
         javaParseObject: JavaParse,
         generateMutants=False,
         generateMutations=True,
+        candidateNodes=None,
     ):
         self.sourceTree = sourceTree
+        # the nodes of each type in the tree, if they were gathered for several operators at once.
+        self.candidateNodes = candidateNodes
         self.sourceCode = sourceCode
         self.color = "#FFFFF0"
         self.mutatorType = "GenericMutationOperator"
@@ -47,7 +52,12 @@ class MutationOperator(object):
         """
         Finds all nodes that match the search criteria
         """
-        pass
+        if self.nodeType is None:
+            return
+        if self.candidateNodes is not None and self.nodeType in self.candidateNodes:
+            self.allNodes = self.candidateNodes[self.nodeType]
+        else:
+            self.allNodes = self.javaParseObject.seekAllNodes(self.sourceTree, self.nodeType)
 
     def filterCriteria(self):
         """
@@ -289,6 +299,7 @@ class RemoveMethod(MutationOperator):
 
     instantiable = True
     metaTypes = ["Method", "All"]
+    nodeType = JavaParser.MethodBodyContext
 
     def __init__(
         self,
@@ -297,8 +308,9 @@ class RemoveMethod(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "RemoveMethod"
         self.color = "#FF00D4"
         self.mutableNodesWithTypes = list()
@@ -315,12 +327,6 @@ class RemoveMethod(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.MethodBodyContext
-        )
-
     def filterCriteria(self):
         """ """
         for node in self.allNodes:
@@ -408,6 +414,7 @@ class RemoveNullCheck(MutationOperator):
 
     instantiable = True
     metaTypes = ["Null", "All"]
+    nodeType = JavaParser.ExpressionContext
 
     def __init__(
         self,
@@ -416,8 +423,9 @@ class RemoveNullCheck(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "RemoveNullCheck"
         self.color = "#ADD8E6"
         self.findNodes()
@@ -433,12 +441,6 @@ class RemoveNullCheck(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.ExpressionContext
-        )
-
     def filterCriteria(self):
         """ """
         for node in self.allNodes:
@@ -505,6 +507,7 @@ class NullifyObjectInitialization(MutationOperator):
 
     instantiable = True
     metaTypes = ["Null", "All"]
+    nodeType = JavaParser.CreatorContext
 
     def __init__(
         self,
@@ -513,8 +516,9 @@ class NullifyObjectInitialization(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "NullifyObjectInitialization"
         self.color = "#F08080"
         self.findNodes()
@@ -529,12 +533,6 @@ class NullifyObjectInitialization(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.CreatorContext
-        )
-
     def filterCriteria(self):
         """ """
         for node in self.allNodes:
@@ -597,6 +595,7 @@ class NullifyReturnValue(MutationOperator):
 
     instantiable = True
     metaTypes = ["Null", "All"]
+    nodeType = TerminalNodeImpl
 
     def __init__(
         self,
@@ -605,8 +604,9 @@ class NullifyReturnValue(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "NullifyReturnValue"
         self.color = "#E0FFFF"
         self.findNodes()
@@ -622,12 +622,6 @@ class NullifyReturnValue(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, TerminalNodeImpl
-        )
-
     def filterCriteria(self):
         """ """
         for node in self.allNodes:
@@ -695,6 +689,7 @@ class NullifyInputVariable(MutationOperator):
 
     instantiable = True
     metaTypes = ["Null", "All"]
+    nodeType = JavaParser.MethodDeclarationContext
 
     def __init__(
         self,
@@ -703,8 +698,9 @@ class NullifyInputVariable(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
-        super().__init__(sourceTree, sourceCode, javaParseObject)
+        super().__init__(sourceTree, sourceCode, javaParseObject, candidateNodes=candidateNodes)
         self.mutatorType = "NullifyInputVariable"
         self.color = "#90EE90"
         self.findNodes()
@@ -720,12 +716,6 @@ class NullifyInputVariable(MutationOperator):
         elif self.generateMutations_:
             self.generateMutations()
 
-    def findNodes(self):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.MethodDeclarationContext
-        )
-
     def filterCriteria(self):
         """ """
         def isInLambda(javaParseObject, methodBody, variableName):
@@ -830,6 +820,7 @@ class TraditionalMutationOperator(MutationOperator):
     """ """
 
     metaTypes = ["Traditional", "All"]
+    nodeType = JavaParser.ExpressionContext
 
     def __init__(
         self,
@@ -838,18 +829,14 @@ class TraditionalMutationOperator(MutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "GenericTraditionalMutationOperator"
 
-    def findNodes(self):
-        """ """
-        self.allNodes = self.javaParseObject.seekAllNodes(
-            self.sourceTree, JavaParser.ExpressionContext
-        )
-
     def filterCriteriaBinaryExpression(
         self, node: JavaParser.ExpressionContext, symbolList: List[str]
     ):
@@ -1013,9 +1000,11 @@ class ArithmeticOperatorReplacementBinary(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ArithmeticOperatorReplacementBinary"
         self.color = "#FFB6C1"
@@ -1079,9 +1068,11 @@ class RelationalOperatorReplacement(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "RelationalOperatorReplacement"
         self.color = "#FFA07A"
@@ -1143,9 +1134,11 @@ class ConditionalOperatorReplacement(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ConditionalOperatorReplacement"
         self.color = "#87CEFA"
@@ -1201,9 +1194,11 @@ class LogicalOperatorReplacement(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "LogicalOperatorReplacement"
         self.color = "#F0E68C"
@@ -1259,9 +1254,11 @@ class AssignmentOperatorReplacementShortcut(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "AssignmentOperatorReplacementShortcut"
         self.color = "#B0C4DE"
@@ -1334,9 +1331,11 @@ class ArithmeticOperatorReplacementUnary(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ArithmeticOperatorReplacementUnary"
         self.color = "#DDA0DD"
@@ -1391,9 +1390,11 @@ class ConditionalOperatorDeletion(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ConditionalOperatorDeletion"
         self.color = "#FFD700"
@@ -1445,9 +1446,11 @@ class ArithmeticOperatorReplacementShortcut(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ArithmeticOperatorReplacementShortcut"
         self.color = "#FF00FF"
@@ -1536,9 +1539,11 @@ class ShiftOperatorReplacement(TraditionalMutationOperator):
         javaParseObject: JavaParse,
         generateMutants: bool = False,
         generateMutations: bool = True,
+        candidateNodes: Dict[type, list] = None,
     ):
         super().__init__(
-            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations
+            sourceTree, sourceCode, javaParseObject, generateMutants, generateMutations,
+            candidateNodes=candidateNodes
         )
         self.mutatorType = "ShiftOperatorReplacement"
         self.color = "#9ACD32"
@@ -1681,6 +1686,8 @@ class JavaMutate(object):
         self.mutants = list()
         self.mutations = list()
         self.mutationOperators = list()
+        # the CSS classes of the operators, for the aggregate report.
+        self.operatorStyles = list()
         self.file_name = file_name
 
         if isinstance(javaParseObject, JavaParse):
@@ -1706,18 +1713,33 @@ class JavaMutate(object):
         :param metaTypes:
         :type metaTypes:
         """
-        for MO in getAllInstantiableSubclasses(MutationOperator):
-            for metaType in metaTypes:
-                if metaType in MO.metaTypes:
-                    self.mutationOperators.append(
-                        MO(
-                            self.sourceTree,
-                            self.sourceCode,
-                            self.javaParseObject,
-                            generateMutants,
-                            generateMutations,
-                        )
-                    )
+        operatorClasses = [
+            MO for MO in getMutationOperators(MutationOperator) for metaType in metaTypes if metaType in MO.metaTypes
+        ]
+        # the nodes of all the operators are found in one walk of the tree.
+        candidateNodes = self.javaParseObject.seekAllNodesOfTypes(
+            self.sourceTree, set(MO.nodeType for MO in operatorClasses if MO.nodeType is not None)
+        )
+        for MO in operatorClasses:
+            mO = MO(
+                self.sourceTree,
+                self.sourceCode,
+                self.javaParseObject,
+                generateMutants,
+                generateMutations,
+                candidateNodes,
+            )
+            self.mutationOperators.append(mO)
+            self.operatorStyles.append(mO.cssClass)
+
+    def detach(self):
+        """
+        Drops the parse tree and the mutation operators, which are not needed to write the mutants and the aggregate
+        report, so that the mutations and mutants can be sent to another process.
+        """
+        self.sourceTree = None
+        self.javaParseObject = None
+        self.mutationOperators = list()
 
     def countMutants(self, metaTypes: List[str] = ["Traditional"]):
         """
@@ -1814,9 +1836,10 @@ class JavaMutate(object):
         :rtype: Dict
         """
         mutationTypeCount = dict()
-        file_id = database.fetch_data(
-            "file", columns="id", condition=f"name = '{self.file_name}'"
-        )[0][0]
+        if database is not None:
+            file_id = database.fetch_data(
+                "file", columns="id", condition="name = ?", parameters=(self.file_name,)
+            )[0][0]
         self.instantiateMutationOperators(metaTypes)
 
         for mO in self.mutationOperators:
@@ -1836,12 +1859,7 @@ class JavaMutate(object):
                         )
                         if database is not None:
                             # mutation.mutationID = last_mutation_id
-                            operator_id = database.fetch_data(
-                                "mutation_operator",
-                                "id",
-                                f"name = '{mutation.mutatorType}'",
-                            )
-                            operator_id = operator_id[0][0]
+                            operator_id = database.fetch_operator_id(mutation.mutatorType)
                             database.insert_mutation(
                                 last_mutation_id,
                                 file_id,
@@ -1994,9 +2012,8 @@ class JavaMutate(object):
                         border-radius: 0.3em; padding: 0.5em 0.5em; position: absolute; top: 125%; z-index: 200;}
                     .tooltip:hover .tooltiptext { visibility: visible; } """
 
-        for mo in self.mutationOperators:
-            assert isinstance(mo, MutationOperator)
-            style += mo.cssClass
+        for cssClass in self.operatorStyles:
+            style += cssClass
 
         return style
 
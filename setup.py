@@ -15,7 +15,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     license=__license__,
     packages=setuptools.find_packages(),
-    install_requires=['antlr4-python3-runtime', 'graphviz'],
+    install_requires=['antlr4-python3-runtime', 'graphviz', 'joblib>=1.4'],
     entry_points={'console_scripts': ['littledarwin=littledarwin.__main__:entryPoint', ], },
     classifiers=[
         "Programming Language :: Python :: 3",
@@ -0,0 +1,39 @@
+import optparse
+import tempfile
+import unittest
+
+from littledarwin.BuildBackend import DirectBackend
+from littledarwin.IncrementalBuild import IncrementalBuild
+from littledarwin.Workspace import Workspace
+
+
+class TestDirectBackend(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.backend = DirectBackend(optparse.Values({"isEarlyKillActive": False}), self.tempDir.name)
+        self.backend.launcherPath = "junit-platform-console-standalone.jar"
+        self.backend.incrementalBuild = IncrementalBuild(self.tempDir.name, self.tempDir.name)
+        self.workspace = Workspace(self.tempDir.name)
+
+    def tearDown(self) -> None:
+        self.tempDir.cleanup()
+
+    def selectors(self, test_names):
+        command = self.backend.testCommand(self.workspace, test_names)
+        return command[command.index("--class-path") + 2:]
+
+    def test_selectCoveredTests(self):
+        self.assertEqual(
+            self.selectors([("a/FooTest#t1[2]",), ("a.BarTest",), ("a/FooTest#t1[2]",), ("-",)]),
+            ["--select-method", "a.FooTest#t1", "--select-class", "a.BarTest"],
+        )
+
+    def test_unknownTestsScanTheClassPath(self):
+        scanClassPath = ["--scan-class-path", self.backend.incrementalBuild.test_classes_path]
+        for test_names in (None, [""], [("?",)], [("*",)], [("a.FooTest#t1",), ("?",)]):
+            self.assertEqual(self.selectors(test_names), scanClassPath)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from littledarwin.CoverageIndex import CoverageIndex
+from littledarwin.Database import Database
+
+
+class TestCoverageIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.database = Database(os.path.join(self.tempDir.name, "mutation.db"))
+        self.database.create_tables()
+        fileA = self.database.insert_file("A.java")
+        fileB = self.database.insert_file("B.java")
+        testOne = self.database.insert_data("test", "qualified_name", ["TestA.testOne"])
+        testTwo = self.database.insert_data("test", "qualified_name", ["TestA.testTwo"])
+        self.database.insert_many("test_coverage", "file_id, line_no, test_id", [
+            (fileA, 1, testOne),
+            (fileA, 2, testTwo),
+            (fileA, 3, testOne),
+            (fileA, 3, testTwo),
+            (fileA, 4, Database.INSTURMENTED_NOT_COVERED),
+            (fileA, 5, Database.NO_TEST),
+            (fileB, 1, Database.NO_INFO),
+        ])
+        self.coverageIndex = CoverageIndex(self.database)
+
+    def tearDown(self) -> None:
+        self.database.close_connection()
+        self.tempDir.cleanup()
+
+    def test_lookupCoveredLines(self):
+        bits, flags = self.coverageIndex.lookup("A.java", "1")
+        self.assertEqual(flags, 0)
+        self.assertEqual(self.coverageIndex.tests(bits, flags), [("TestA.testOne",)])
+
+        bits, flags = self.coverageIndex.lookup("A.java", "1,2")
+        self.assertEqual(flags, 0)
+        self.assertEqual(self.coverageIndex.tests(bits, flags), [("TestA.testOne",), ("TestA.testTwo",)])
+
+        self.assertEqual(self.coverageIndex.lookup("A.java", "3"), self.coverageIndex.lookup("A.java", "1,2"))
+
+    def test_lookupSentinelFlags(self):
+        bits, flags = self.coverageIndex.lookup("A.java", "4")
+        self.assertEqual((bits, flags), (0, CoverageIndex.NOT_COVERED))
+        self.assertEqual(self.coverageIndex.tests(bits, flags), [])
+
+        bits, flags = self.coverageIndex.lookup("A.java", "5")
+        self.assertEqual(flags, CoverageIndex.NO_TEST)
+        self.assertEqual(self.coverageIndex.tests(bits, flags), [("?",)])
+
+        bits, flags = self.coverageIndex.lookup("B.java", "1")
+        self.assertEqual(flags, CoverageIndex.NO_INFO)
+        self.assertEqual(self.coverageIndex.tests(bits, flags), [("*",)])
+
+        bits, flags = self.coverageIndex.lookup("A.java", "1,4,5")
+        self.assertEqual(flags, CoverageIndex.NOT_COVERED | CoverageIndex.NO_TEST)
+        self.assertEqual(self.coverageIndex.tests(bits, flags), [("TestA.testOne",), ("?",)])
+
+    def test_lookupNotInstrumented(self):
+        self.assertEqual(self.coverageIndex.lookup("A.java", "42"), (0, CoverageIndex.NOT_INSTRUMENTED))
+        self.assertEqual(self.coverageIndex.lookup("C.java", "1"), (0, CoverageIndex.NOT_INSTRUMENTED))
+        # a line without coverage next to a covered one does not make the mutant uninstrumented.
+        bits, flags = self.coverageIndex.lookup("A.java", "2,42")
+        self.assertEqual(flags, 0)
+        self.assertEqual(self.coverageIndex.tests(bits), [("TestA.testTwo",)])
+
+    def test_matchesDatabaseQuery(self):
+        for fileName, lines in (("A.java", "1"), ("A.java", "2,3"), ("A.java", "4"), ("A.java", "1,5"),
+                                ("B.java", "1")):
+            bits, flags = self.coverageIndex.lookup(fileName, lines)
+            self.assertEqual(
+                sorted(self.coverageIndex.tests(bits, flags)),
+                sorted(test for test in set(self.database.fetch_coverage(fileName, lines)) if test != ("-",)),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from littledarwin.Database import Database
+from littledarwin.JavaMutate import ArithmeticOperatorReplacementBinary
+
+
+class TestDatabase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.databasePath = os.path.join(self.tempDir.name, "mutation.db")
+        self.database = Database(self.databasePath)
+        self.database.create_tables()
+        self.fileID = self.database.insert_file("A.java")
+        self.operatorID = self.database.fetch_operator_id(ArithmeticOperatorReplacementBinary.__name__)
+
+    def tearDown(self) -> None:
+        self.database.close_connection()
+        self.tempDir.cleanup()
+
+    def insertMutants(self, count):
+        for mutantID in range(1, count + 1):
+            self.database.insert_mutation(mutantID, self.fileID, 7, 10, 11, mutantID, "-", self.operatorID)
+            self.database.insert_mutant(mutantID, mutantID)
+
+    def countFromOtherConnection(self, tableName):
+        connection = sqlite3.connect(self.databasePath)
+        try:
+            return connection.execute(f"SELECT COUNT(*) FROM {tableName}").fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_rowsQueuedInTransaction(self):
+        self.database.begin_transaction()
+        self.insertMutants(3)
+
+        self.assertEqual(len(self.database.queued_rows["mutation"][1]), 3)
+        self.assertEqual(len(self.database.queued_rows["mutant"][1]), 3)
+        self.assertEqual(self.countFromOtherConnection("mutant"), 0)
+
+        self.database.commit_transaction()
+
+        self.assertEqual(self.database.queued_rows, dict())
+        self.assertEqual(self.countFromOtherConnection("mutation"), 3)
+        self.assertEqual(self.countFromOtherConnection("mutant"), 3)
+
+    def test_fetchFlushesQueuedRows(self):
+        self.database.begin_transaction()
+        self.insertMutants(2)
+
+        self.assertEqual(self.database.fetch_data("mutant", "id, mutation_id"), [(1, 1), (2, 2)])
+        self.assertEqual(self.database.queued_rows, dict())
+        # flushed, but not committed yet.
+        self.assertEqual(self.countFromOtherConnection("mutant"), 0)
+        self.database.commit_transaction()
+        self.assertEqual(self.countFromOtherConnection("mutant"), 2)
+
+    def test_rowsWrittenRightAwayOutsideTransaction(self):
+        self.insertMutants(2)
+
+        self.assertEqual(self.database.queued_rows, dict())
+        self.assertEqual(self.countFromOtherConnection("mutant"), 2)
+        self.assertEqual(
+            self.database.fetch_mutants(), [("A.java", 1, "1"), ("A.java", 2, "2")]
+        )
+
+    def test_schemaIndexes(self):
+        indexes = {row[0] for row in self.database.fetch_data("sqlite_master", "name", "type='index'")}
+
+        for indexName, _, _ in Database.INDEXES:
+            self.assertIn("idx_" + indexName, indexes)
+        self.assertEqual(self.database.fetch_data("pragma_user_version"), [(Database.SCHEMA_VERSION,)])
+
+    def test_upgradeOlderSchema(self):
+        for indexName, _, _ in Database.INDEXES:
+            self.database.cursor.execute(f"DROP INDEX idx_{indexName}")
+        self.database.cursor.execute("PRAGMA user_version = 0")
+        self.database.conn.commit()
+        self.database.close_connection()
+
+        self.database = Database(self.databasePath)
+
+        indexes = {row[0] for row in self.database.fetch_data("sqlite_master", "name", "type='index'")}
+        for indexName, _, _ in Database.INDEXES:
+            self.assertIn("idx_" + indexName, indexes)
+        self.assertEqual(self.database.fetch_data("pragma_user_version"), [(Database.SCHEMA_VERSION,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
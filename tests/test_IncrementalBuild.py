@@ -0,0 +1,39 @@
+import tempfile
+import unittest
+
+from littledarwin.IncrementalBuild import IncrementalBuild
+
+
+class TestIncrementalBuild(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.incrementalBuild = IncrementalBuild(self.tempDir.name, self.tempDir.name)
+        self.incrementalBuild.test_classes = ["a.BarTest", "a.FooTest"]
+
+    def tearDown(self) -> None:
+        self.tempDir.cleanup()
+
+    def test_selectTestClasses(self):
+        self.assertEqual(
+            self.incrementalBuild.select_test_classes([("a/FooTest#t1",), ("a.BarTest#t2",), ("a.FooTest#t3",)]),
+            ["a.FooTest", "a.BarTest"],
+        )
+
+    def test_selectAllTestClasses(self):
+        for covered_tests in (None, [""], [("a.FooTest#t1",), ""]):
+            self.assertEqual(self.incrementalBuild.select_test_classes(covered_tests), ["a.BarTest", "a.FooTest"])
+
+    def test_unknownTestsSelectAllTestClasses(self):
+        # the markers of lines whose tests are not known are not test classes.
+        for covered_tests in ([("a.FooTest#t1",), ("?",), ("*",)], [("?",)], [("*",)]):
+            self.assertTrue(IncrementalBuild.selects_all_tests(covered_tests))
+            self.assertEqual(self.incrementalBuild.select_test_classes(covered_tests), ["a.BarTest", "a.FooTest"])
+
+    def test_notCoveredMarkerIsSkipped(self):
+        self.assertFalse(IncrementalBuild.selects_all_tests([("a.FooTest#t1",), ("-",)]))
+        self.assertEqual(self.incrementalBuild.select_test_classes([("a.FooTest#t1",), ("-",)]), ["a.FooTest"])
+
+
+if __name__ == '__main__':
+    unittest.main()
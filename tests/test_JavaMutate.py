@@ -0,0 +1,201 @@
+import unittest
+
+from littledarwin.JavaMutate import JavaMutate, Mutation, replaceNodes, recursiveCloneANTLRNodeAndItsChildren
+from littledarwin.JavaParse import JavaParse
+
+
+class TestMutationEncoding(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.javaParse = JavaParse()
+
+        cls.factorialSourceCode = """
+public class Factorial {
+    static final int LIMIT = 10 + 2;
+
+    public static int factorial(int n) {
+        int result = 1;
+        for (int i = 2; i <= n; i++)
+            result *= i;
+        if (n > LIMIT && result != 0) return -result;
+        return result;
+    }
+}
+"""
+
+    def setUp(self) -> None:
+        tree = self.javaParse.parse(self.factorialSourceCode)
+        javaMutate = JavaMutate(tree, self.factorialSourceCode, self.javaParse, "Factorial.java")
+        javaMutate.gatherMutations(["All"])
+        self.mutations = javaMutate.mutations
+
+    def decode(self, mutation):
+        encoded = mutation.encode()
+        # a mutation read from the database has no entry in mutation_dict yet.
+        appliedNodes = Mutation.mutation_dict.pop(mutation.mutationID)
+        try:
+            return Mutation.decode(encoded)
+        finally:
+            Mutation.mutation_dict[mutation.mutationID] = appliedNodes
+
+    def test_encodeDecodeFields(self):
+        self.assertGreater(len(self.mutations), 0)
+        for mutation in self.mutations:
+            decodedMutation = Mutation.decode(mutation.encode())
+
+            for attribute in ("mutationID", "startPos", "endPos", "lineNumber", "nodeID", "mutatorType",
+                              "replacementText", "color"):
+                self.assertEqual(getattr(decodedMutation, attribute), getattr(mutation, attribute))
+            self.assertEqual(decodedMutation.applyMutation(self.factorialSourceCode),
+                             mutation.applyMutation(self.factorialSourceCode))
+
+    def test_encodeDecodeAppliedNodes(self):
+        for mutation in self.mutations:
+            nodeIndexes, nodes, styles = Mutation.mutation_dict[mutation.mutationID]
+            decodedMutation = self.decode(mutation)
+            Mutation.mutation_dict.pop(mutation.mutationID)
+
+            decodedNodeIndexes, decodedNodes, decodedStyles = decodedMutation.appliedNodes()
+
+            self.assertEqual(decodedNodeIndexes, nodeIndexes)
+            self.assertEqual(decodedStyles, styles)
+            self.assertEqual(self.javaParse.trees2Binary(decodedNodes), self.javaParse.trees2Binary(nodes))
+
+    def test_decodedMutationAppliesTheSame(self):
+        for mutation in self.mutations:
+            decodedMutation = self.decode(mutation)
+            tree = self.javaParse.parse(self.factorialSourceCode)
+            mutation.apply_mutation_in_place(tree)
+            mutatedText = tree.getText()
+
+            Mutation.mutation_dict.pop(mutation.mutationID)
+            tree = self.javaParse.parse(self.factorialSourceCode)
+            decodedMutation.apply_mutation_in_place(tree)
+
+            self.assertNotEqual(mutatedText, self.javaParse.parse(self.factorialSourceCode).getText())
+            self.assertEqual(tree.getText(), mutatedText)
+
+    def test_encodeWithoutAppliedNodes(self):
+        mutation = Mutation(3, 4, 2, 17, "ArithmeticOperatorReplacementBinary", "-", mutationID=10 ** 9)
+        decodedMutation = self.decode(mutation)
+        Mutation.mutation_dict.pop(mutation.mutationID)
+
+        self.assertEqual(decodedMutation.nodeID, 17)
+        self.assertEqual(decodedMutation.appliedNodes(), ([], [], []))
+
+    def test_decodeRejectsOtherData(self):
+        encoded = self.mutations[0].encode()
+
+        self.assertRaises(ValueError, Mutation.decode, b"\x80\x04\x95")
+        self.assertRaises(ValueError, Mutation.decode, encoded[:3] + bytes([Mutation.ENCODING_VERSION + 1]) + encoded[4:])
+
+
+def walkIndexes(tree):
+    # the node the walk of findNodeInSubtree and getNode without a NodeTable finds first, for each index in the tree.
+    nodes = dict()
+    stack = [tree]
+    while len(stack) > 0:
+        node = stack.pop()
+        if hasattr(node, "nodeIndex"):
+            nodes.setdefault(node.nodeIndex, node)
+        if node.getChildCount() != 0:
+            stack.extend(node.children)
+    return nodes
+
+
+class TestNodeTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.javaParse = JavaParse()
+
+        cls.nullCheckSourceCode = """
+public class Factorial {
+    public static int factorial(int n, String name) {
+        int result = 1;
+        for (int i = 2; i <= n; i++)
+            result *= i;
+        if (name != null && n > 10) return -result;
+        return result;
+    }
+}
+"""
+
+    def setUp(self) -> None:
+        tree = self.javaParse.parse(self.nullCheckSourceCode)
+        javaMutate = JavaMutate(tree, self.nullCheckSourceCode, self.javaParse, "Factorial.java")
+        javaMutate.gatherMutations(["All"])
+        self.mutations = javaMutate.mutations
+
+    def subtrees(self, tree):
+        stack = [tree]
+        while len(stack) > 0:
+            node = stack.pop()
+            if node.getChildCount() != 0:
+                yield node
+                stack.extend(node.children)
+
+    def assertFindsNodesAsWalk(self, tree, changedNode):
+        """
+        Checks getNode from the root for every index, and findNodeInSubtree from the changed node, its children and
+        the nodes above it.
+        """
+        indexes = range(tree.out_time + 2)
+        lookupParse = JavaParse()
+        nodes = walkIndexes(tree)
+        for index in indexes:
+            self.assertIs(lookupParse.getNode(tree, index), nodes.get(index), index)
+        subtrees = [changedNode] + [
+            child for child in getattr(changedNode, "children", None) or [] if child.getChildCount() != 0]
+        ancestor = changedNode.parentCtx
+        while ancestor is not None:
+            subtrees.append(ancestor)
+            ancestor = ancestor.parentCtx
+        for subtree in subtrees:
+            subtreeNodes = walkIndexes(subtree)
+            # a walk for an index that is not in the subtree visits the whole subtree, so only a few are checked.
+            for index in sorted(subtreeNodes) + [tree.nodeIndex, tree.out_time + 1]:
+                self.assertIs(JavaParse.findNodeInSubtree(subtree, index), subtreeNodes.get(index), index)
+
+    def mutationsOfStyle(self, style):
+        return [mutation for mutation in self.mutations if Mutation.mutation_dict[mutation.mutationID][2] == [style]]
+
+    def test_applyAndReverseMutations(self):
+        for style in (Mutation.STYLE_REPLACE, Mutation.STYLE_APPEND):
+            mutations = self.mutationsOfStyle(style)
+            self.assertGreater(len(mutations), 0, style)
+            for mutation in mutations:
+                tree = self.javaParse.parse(self.nullCheckSourceCode)
+                mutatedNode = walkIndexes(tree)[Mutation.mutation_dict[mutation.mutationID][0][0]]
+                self.assertFindsNodesAsWalk(tree, mutatedNode)
+
+                mutation.apply_mutation_in_place(tree)
+                self.assertFalse(tree.nodeTable.isIntact())
+                self.assertFindsNodesAsWalk(tree, mutatedNode)
+
+                mutation.apply_reverse_mutation_in_place(tree)
+                self.assertFindsNodesAsWalk(tree, mutatedNode)
+                if style == Mutation.STYLE_REPLACE:
+                    self.assertEqual(tree.getText(), self.javaParse.parse(self.nullCheckSourceCode).getText())
+
+    def test_replaceWithClonesThatReuseIndexes(self):
+        tree = self.javaParse.parse(self.nullCheckSourceCode)
+        statements = [node for node in self.subtrees(tree) if type(node).__name__ == "StatementContext"]
+        self.assertGreater(len(statements), 2)
+        first, last = statements[0], statements[-1]
+        firstClone = recursiveCloneANTLRNodeAndItsChildren(first)
+
+        # the indexes of the last statement are now in the tree twice.
+        replaceNodes(first, recursiveCloneANTLRNodeAndItsChildren(last))
+        self.assertEqual(first.getText(), last.getText())
+        self.assertFindsNodesAsWalk(tree, first)
+
+        # a clone of a node put back into its place.
+        replaceNodes(first, firstClone)
+        self.assertFindsNodesAsWalk(tree, first)
+        self.assertEqual(tree.getText(), self.javaParse.parse(self.nullCheckSourceCode).getText())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,16 @@ import unittest
 
 from littledarwin.JavaParse import JavaParse
 from antlr4.error.Errors import ParseCancellationException
+from antlr4.tree.Tree import TerminalNodeImpl
+
+
+def preorder(tree):
+    nodeStack = [tree]
+    while len(nodeStack) > 0:
+        node = nodeStack.pop()
+        yield node
+        if not isinstance(node, TerminalNodeImpl) and node.children is not None:
+            nodeStack.extend(reversed(node.children))
 
 
 class TestJavaParse(unittest.TestCase):
@@ -1146,3 +1156,129 @@ public class SyntaxError {
         except AssertionError as e:
             # it's all good!
             self.assertTrue(True)
+
+    def assertSameTree(self, tree, otherTree):
+        nodes = list(preorder(tree))
+        otherNodes = list(preorder(otherTree))
+        self.assertEqual(len(nodes), len(otherNodes))
+        for node, otherNode in zip(nodes, otherNodes):
+            self.assertIs(type(node), type(otherNode))
+            for attribute in JavaParse.BINARY_TREE_ATTRIBUTES:
+                self.assertEqual(getattr(node, attribute, None), getattr(otherNode, attribute, None))
+            if isinstance(node, TerminalNodeImpl):
+                self.assertEqual(node.symbol.text, otherNode.symbol.text)
+            else:
+                for child in otherNode.children or []:
+                    self.assertIs(child.parentCtx, otherNode)
+
+    def test_binaryTreeRoundTrip(self):
+        for sourceCode in (self.factorialSourceCode, self.java7SourceCode, self.java8SourceCode,
+                           self.methodTypesSourceCode, self.manyStringsSourceCode, ""):
+            tree = self.javaParse.parse(sourceCode)
+            data = self.javaParse.tree2Binary(tree)
+            loadedTree = self.javaParse.binary2Tree(data)
+
+            self.assertSameTree(tree, loadedTree)
+            self.assertEqual(loadedTree.getText(), tree.getText())
+            self.assertEqual(self.javaParse.tree2Binary(loadedTree), data)
+
+    def test_binaryTreesRoundTrip(self):
+        tree = self.javaParse.parse(self.factorialSourceCode)
+        # the subtrees a mutation puts into a tree: rules with their children, and a single token.
+        methods = [node for node in preorder(tree) if type(node).__name__ == "MethodDeclarationContext"]
+        terminal = next(node for node in preorder(tree) if isinstance(node, TerminalNodeImpl))
+        terminal.applied_node_id = 3
+        trees = methods + [terminal]
+
+        loadedTrees = self.javaParse.binary2Trees(self.javaParse.trees2Binary(trees))
+
+        self.assertEqual(len(loadedTrees), len(trees))
+        for subtree, loadedTree in zip(trees, loadedTrees):
+            self.assertIsNone(loadedTree.parentCtx)
+            self.assertSameTree(subtree, loadedTree)
+        self.assertEqual(loadedTrees[-1].applied_node_id, 3)
+
+    def test_binaryTreeRejectsOtherData(self):
+        data = self.javaParse.tree2Binary(self.javaParse.parse(self.factorialSourceCode))
+
+        self.assertRaises(ValueError, self.javaParse.binary2Tree, b'[{"type": "CompilationUnitContext"}]')
+        self.assertRaises(ValueError, self.javaParse.binary2Tree, data[:3] + bytes([99]) + data[4:])
+
+    def test_numerifyPreorder(self):
+        tree = self.javaParse.parse(self.factorialSourceCode)
+        nodes = list(preorder(tree))
+
+        self.assertEqual([node.nodeIndex for node in nodes], list(range(len(nodes))))
+        self.assertEqual(self.javaParse.numerify(tree, 5, 0, 0)[2], 5 + len(nodes) - 1)
+        self.assertEqual([node.nodeIndex for node in nodes], list(range(5, 5 + len(nodes))))
+
+        depths = {id(tree): 0}
+        for node in nodes:
+            if node is not tree:
+                depths[id(node)] = depths[id(node.parentCtx)] + 1
+            self.assertEqual(node.node_depth, depths[id(node)] - 1 if node.getText() == "return" else depths[id(node)])
+            if isinstance(node, TerminalNodeImpl):
+                continue
+            for child in node.children or []:
+                self.assertTrue(self.javaParse.is_ancestor(node, child))
+                self.assertFalse(self.javaParse.is_ancestor(child, node))
+            for child, sibling in zip(node.children or [], (node.children or [])[1:]):
+                self.assertFalse(self.javaParse.is_ancestor(child, sibling))
+                self.assertFalse(self.javaParse.is_ancestor(sibling, child))
+
+    def test_numerifyMutationTypes(self):
+        tree = self.javaParse.parse(
+            "class A { final int S = 2; int f(int x) { x += S; return x * new int[1].length; } }")
+        nodes = list(preorder(tree))
+
+        # the types and contexts the recursive numerify gave the nodes.
+        self.assertEqual([node.mutationType for node in nodes], [
+            0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6, 0, 0, 9, 9, 9, 9, 9, 9,
+            9, 9, 9, 9, 9, 9, 9, 9, 9, 7, 7, 7, 7, 7, 2, 2, 2, 2, 2, 2, 1, 1, 1, 7, 7, 1, 1, 8, 8, 8, 8, 8, 8, 10, 8,
+            10, 10, 10, 10, 10, 10, 10, 10, 10, 10, 10, 8, 8, 7, 7, 0, 0,
+        ])
+        self.assertEqual([node.contextID for node in nodes], [0, 0] + [JavaParse.CLASS_BODY_CONTEXT_ID] * 84 + [0])
+
+    def test_numerifyJSON(self):
+        tree = self.javaParse.parse(self.factorialSourceCode)
+        (tree, description, index) = self.javaParse.numerify(tree, 0, 0, 0, withJSON=True)
+
+        descriptionStack = [description]
+        for node in preorder(tree):
+            nodeDescription = descriptionStack.pop()
+            self.assertEqual(nodeDescription["type"], type(node).__name__)
+            self.assertEqual(nodeDescription["nodeIndex"], node.nodeIndex)
+            self.assertEqual(nodeDescription["mutationType"], node.mutationType)
+            self.assertEqual(nodeDescription["contextID"], node.contextID)
+            if isinstance(node, TerminalNodeImpl):
+                self.assertEqual(nodeDescription["text"], node.getText())
+            else:
+                self.assertEqual(nodeDescription["text"], "None")
+                self.assertEqual(len(nodeDescription["children"]), len(node.children or []))
+                descriptionStack.extend(reversed(nodeDescription["children"]))
+        self.assertEqual(descriptionStack, [])
+        self.assertIsNone(self.javaParse.numerify(tree, 0, 0, 0)[1])
+
+    def test_twoStageParseMatchesLL(self):
+        javaParse = JavaParse()
+        for sourceCode in (self.factorialSourceCode, self.emptyInterfaceSourceCode, self.methodTypesSourceCode,
+                           self.java7SourceCode, self.java8SourceCode, self.manyStringsSourceCode, ""):
+            llTree = javaParse.parse(sourceCode, twoStage=False)
+            twoStageTree = javaParse.parse(sourceCode, twoStage=True)
+
+            self.assertEqual(javaParse.tree2Binary(twoStageTree), javaParse.tree2Binary(llTree))
+            self.assertEqual(javaParse.getMethodRanges(twoStageTree), javaParse.getMethodRanges(llTree))
+            self.assertEqual(javaParse.getInMethodLines(twoStageTree), javaParse.getInMethodLines(llTree))
+
+    def test_twoStageParseReportsSyntaxErrors(self):
+        javaParse = JavaParse()
+
+        self.assertRaises(ParseCancellationException, javaParse.parse, self.issue13Code, twoStage=False)
+        self.assertEqual(javaParse.sllFailures, 0)
+        self.assertRaises(ParseCancellationException, javaParse.parse, self.issue13Code, twoStage=True)
+        # the error is reported by the LL stage.
+        self.assertEqual(javaParse.sllFailures, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,10 +4,29 @@ import sys
 import unittest
 import tempfile
 import base64
+import optparse
 import zipfile
+import sqlite3
 from io import BytesIO
 
 import LittleDarwin
+# the mutation operators are registered in the database when their module is imported.
+import littledarwin.JavaMutate
+from littledarwin.LittleDarwin import LittleDarwin as CoverageLittleDarwin
+
+# a build that runs no tests: the verdict of a mutant depends only on the mutated source files, and every run is
+# logged, one line each.
+fakeBuildScript = '''import hashlib, os, sys
+sourceHash = hashlib.sha256()
+for root, dirs, files in os.walk(os.path.join(sys.argv[2], "src")):
+    dirs.sort()
+    for fileName in sorted(files):
+        with open(os.path.join(root, fileName), "rb") as sourceFile:
+            sourceHash.update(sourceFile.read().split(b"*/", 1)[-1])
+with open(sys.argv[1], "a") as logFile:
+    logFile.write(sourceHash.hexdigest() + "\\n")
+sys.exit(int(sourceHash.hexdigest(), 16) % 2)
+'''
 
 
 class TestLittleDarwin(unittest.TestCase):
@@ -95,6 +114,94 @@ class TestLittleDarwin(unittest.TestCase):
         except SystemExit as e:
             self.assertEqual(int(e.code), 0)
 
+    def runFakeBuild(self, extraArgs):
+        fakeBuildPath = os.path.join(self.tempDir.name, "fakebuild.py")
+        with open(fakeBuildPath, "w") as fakeBuildFile:
+            fakeBuildFile.write(fakeBuildScript)
+        argList = ['-b', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath, '-c',
+                   ",".join([sys.executable, fakeBuildPath, self.buildLogPath, self.videoStoreBuildPath]),
+                   "--initial-build-command", "true"] + extraArgs
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(CoverageLittleDarwin().main(argList), 0)
+
+    def readVerdicts(self):
+        with open(os.path.join(self.videoStoreBuildPath, "LittleDarwinResults", "report.txt"), 'r') as report:
+            return [line for line in report.readlines() if " - killed (" in line]
+
+    def countBuilds(self):
+        with open(self.buildLogPath, 'r') as buildLog:
+            return len(buildLog.readlines())
+
+    def readMutationResults(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        results = dict()
+        for root, dirs, files in os.walk(resultsPath):
+            for fileName in files:
+                if fileName.endswith(".db") or fileName.endswith(".db-wal") or fileName.endswith(".db-shm"):
+                    continue
+                with open(os.path.join(root, fileName), 'r') as resultFile:
+                    results[os.path.relpath(os.path.join(root, fileName), resultsPath)] = resultFile.read()
+        connection = sqlite3.connect(os.path.join(resultsPath, "mutationdatabase.db"))
+        for tableName in ("file", "mutation", "mutant"):
+            results[tableName] = connection.execute("SELECT * FROM " + tableName + " ORDER BY 1, 2").fetchall()
+        connection.close()
+        return results
+
+    def test_VideoStoreParallelGeneration(self):
+        # a second copy of the sources, so that there are enough files for the process pool.
+        shutil.copytree(os.path.join(self.videoStoreSourcePath, "java", "videostore"),
+                        os.path.join(self.videoStoreSourcePath, "java", "videostore2"))
+        argList = ['-m', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]
+
+        self.assertEqual(CoverageLittleDarwin().main(argList + ["-j", "1"]), 0)
+        serialResults = self.readMutationResults()
+        shutil.rmtree(os.path.join(self.videoStoreBuildPath, "LittleDarwinResults"))
+        self.assertEqual(CoverageLittleDarwin().main(argList + ["-j", "3"]), 0)
+        parallelResults = self.readMutationResults()
+
+        self.assertGreater(len(serialResults["mutant"]), 0)
+        self.assertEqual(sorted(parallelResults.keys()), sorted(serialResults.keys()))
+        for key in serialResults.keys():
+            self.assertEqual(parallelResults[key], serialResults[key], key)
+
+    def test_VideoStoreResumeBuild(self):
+        self.buildLogPath = os.path.join(self.tempDir.name, "builds.log")
+        self.assertEqual(
+            CoverageLittleDarwin().main(['-m', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]), 0)
+        self.runFakeBuild([])
+        mutantCount = self.countBuilds()
+        verdicts = self.readVerdicts()
+        self.assertGreater(mutantCount, 0)
+
+        # an interrupted build phase: the verdicts of the last mutants were not committed.
+        connection = sqlite3.connect(
+            os.path.join(self.videoStoreBuildPath, "LittleDarwinResults", "mutationdatabase.db"))
+        connection.execute("DELETE FROM mutant_result WHERE mutant_id >= ?", (mutantCount // 2,))
+        connection.commit()
+        connection.close()
+
+        self.runFakeBuild(["--resume"])
+
+        self.assertEqual(self.countBuilds(), mutantCount + mutantCount - mutantCount // 2)
+        self.assertEqual(self.readVerdicts(), verdicts)
+
+
+class TestMutantTimeout(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.littleDarwin = CoverageLittleDarwin()
+        self.littleDarwin.testTimes = {"a.FooTest.t1": 2.0, "a.BarTest.t2": 6.0}
+        self.options = optparse.Values({"timeout": "60", "timeoutFactor": "2", "timeoutConstant": "1"})
+
+    def test_timeoutOfCoveredTests(self):
+        self.assertEqual(self.littleDarwin.mutantTimeout(self.options, [("a.FooTest#t1",), ("-",)]), 5)
+        # a test without a baseline time gets the global timeout.
+        self.assertEqual(self.littleDarwin.mutantTimeout(self.options, [("a.FooTest#t3",)]), 60)
+
+    def test_unknownTestsRunAllTests(self):
+        for test_names in (None, [""], [("?",)], [("*",)], [("a.FooTest#t1",), ("?",)]):
+            self.assertEqual(self.littleDarwin.mutantTimeout(self.options, test_names), 17)
+
 
 if __name__ == '__main__':
     unittest.main()
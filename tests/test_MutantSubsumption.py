@@ -0,0 +1,108 @@
+import random
+import unittest
+
+from littledarwin.MutantSubsumption import MutantSubsumption
+
+
+class BruteForceSubsumption:
+    """
+    The subsumption relation computed by comparing the test sets of every pair of classes.
+    """
+
+    def __init__(self, killingTests):
+        self.classes = dict()
+        for mutant, tests in killingTests.items():
+            self.classes.setdefault(frozenset(tests), set()).add(mutant)
+
+    def mutants(self, tests):
+        return frozenset(self.classes[tests])
+
+    def subsumed(self, tests):
+        return {otherTests for otherTests in self.classes if tests < otherTests}
+
+    def edges(self):
+        edges = set()
+        for tests in self.classes:
+            subsumed = self.subsumed(tests)
+            for otherTests in subsumed:
+                if not any(middleTests < otherTests for middleTests in subsumed):
+                    edges.add((self.mutants(tests), self.mutants(otherTests)))
+        return edges
+
+    def dominatorMutants(self):
+        return sorted(
+            mutant for tests in self.classes if not any(otherTests < tests for otherTests in self.classes)
+            for mutant in self.classes[tests]
+        )
+
+
+class TestMutantSubsumption(unittest.TestCase):
+
+    def randomKillingTests(self, seed, mutantCount, testCount, maxTests):
+        generator = random.Random(seed)
+        tests = ["Test" + str(index) for index in range(testCount)]
+        return {
+            mutant: generator.sample(tests, generator.randint(1, maxTests))
+            for mutant in generator.sample(range(mutantCount * 3), mutantCount)
+        }
+
+    def assertMatchesBruteForce(self, subsumption, killingTests):
+        reference = BruteForceSubsumption(killingTests)
+        classes = [frozenset(mutants) for mutants in subsumption.classes]
+
+        self.assertEqual(set(classes), {reference.mutants(tests) for tests in reference.classes})
+        self.assertEqual(subsumption.dominatorMutants(), reference.dominatorMutants())
+        self.assertEqual(
+            {(classes[source], classes[target]) for source, target in subsumption.reducedEdges()}, reference.edges()
+        )
+        for classIndex, mutants in enumerate(subsumption.classes):
+            self.assertEqual(
+                subsumption.subsumedCount(classIndex), len(reference.subsumed(frozenset(killingTests[mutants[0]])))
+            )
+
+    def test_matchesBruteForce(self):
+        # few tests give many classes sharing their tests, many tests give few subsets.
+        for seed, mutantCount, testCount, maxTests in ((1, 60, 4, 3), (2, 120, 8, 4), (3, 80, 20, 6), (4, 40, 3, 3)):
+            killingTests = self.randomKillingTests(seed, mutantCount, testCount, maxTests)
+
+            self.assertMatchesBruteForce(MutantSubsumption(killingTests), killingTests)
+
+    def test_addMutantsInAnyOrder(self):
+        killingTests = self.randomKillingTests(5, 100, 7, 4)
+        mutants = list(killingTests.keys())
+        random.Random(6).shuffle(mutants)
+
+        subsumption = MutantSubsumption()
+        addedKillingTests = dict()
+        for mutant in mutants:
+            subsumption.addMutant(mutant, killingTests[mutant])
+            addedKillingTests[mutant] = killingTests[mutant]
+            self.assertEqual(
+                subsumption.dominatorMutants(), BruteForceSubsumption(addedKillingTests).dominatorMutants()
+            )
+        self.assertMatchesBruteForce(subsumption, killingTests)
+
+    def test_sameGraphInAnyOrder(self):
+        killingTests = self.randomKillingTests(7, 50, 6, 3)
+        mutants = list(killingTests.keys())
+        random.Random(8).shuffle(mutants)
+        subsumption = MutantSubsumption()
+        for mutant in mutants:
+            subsumption.addMutant(mutant, killingTests[mutant])
+
+        graph = subsumption.toGraph()
+        otherGraph = MutantSubsumption(killingTests).toGraph()
+
+        self.assertEqual(list(graph.nodes(data=True)), list(otherGraph.nodes(data=True)))
+        self.assertEqual(list(graph.edges), list(otherGraph.edges))
+
+    def test_equivalentMutants(self):
+        subsumption = MutantSubsumption({3: ["TestA"], 1: ["TestA", "TestB"], 2: ["TestB", "TestA"], 4: ["TestC"]})
+
+        self.assertEqual(sorted(subsumption.label(classIndex) for classIndex in range(len(subsumption.classes))),
+                         ["1, 2", "3", "4"])
+        self.assertEqual(subsumption.dominatorMutants(), [3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
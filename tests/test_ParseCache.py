@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+from littledarwin.JavaParse import JavaParse
+from littledarwin.ParseCache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factorialSourceCode = """
+public class Factorial {
+    public static int factorial(int n) {
+         int result = 1;
+         for(int i = 2; i <= n; i++)
+            result *= i;
+         return result;
+    }
+}
+"""
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.cachePath = os.path.join(self.tempDir.name, "cache")
+        self.parseCache = ParseCache(self.cachePath, 1 << 30, "0.10.9")
+
+    def tearDown(self) -> None:
+        self.tempDir.cleanup()
+
+    def sourceCode(self, index):
+        return "class A" + str(index) + " { int f(int x) { return x + " + str(index) + "; } }"
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.cachePath) if name.endswith(ParseCache.SUFFIX))
+
+    def test_missThenHit(self):
+        javaParse = JavaParse()
+        parsedTree = self.parseCache.parse(javaParse, self.factorialSourceCode)
+
+        self.assertEqual((self.parseCache.hits, self.parseCache.misses), (0, 1))
+        self.assertEqual(self.entries(), [os.path.basename(self.parseCache.entryPath(self.factorialSourceCode))])
+
+        loadedTree = self.parseCache.parse(JavaParse(), self.factorialSourceCode)
+
+        self.assertEqual((self.parseCache.hits, self.parseCache.misses), (1, 1))
+        self.assertIsNot(loadedTree, parsedTree)
+        self.assertEqual(javaParse.tree2Binary(loadedTree), javaParse.tree2Binary(parsedTree))
+        self.assertEqual(loadedTree.getText(), parsedTree.getText())
+        self.assertEqual(javaParse.getMethodRanges(loadedTree), javaParse.getMethodRanges(parsedTree))
+        self.assertEqual(javaParse.getInMethodLines(loadedTree), javaParse.getInMethodLines(parsedTree))
+        # the loaded tree is numbered after the trees before it.
+        self.assertGreaterEqual(loadedTree.in_time, parsedTree.out_time)
+        self.assertEqual(loadedTree.out_time - loadedTree.in_time, parsedTree.out_time - parsedTree.in_time)
+
+    def test_changedSourceMisses(self):
+        self.parseCache.parse(JavaParse(), self.factorialSourceCode)
+        self.parseCache.parse(JavaParse(), self.factorialSourceCode.replace("result *= i", "result += i"))
+
+        self.assertEqual((self.parseCache.hits, self.parseCache.misses), (0, 2))
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_otherVersionMisses(self):
+        otherParseCache = ParseCache(self.cachePath, 1 << 30, "0.11.0")
+
+        self.assertNotEqual(
+            otherParseCache.entryPath(self.factorialSourceCode), self.parseCache.entryPath(self.factorialSourceCode)
+        )
+
+    def test_damagedEntryIsReplaced(self):
+        entryPath = self.parseCache.entryPath(self.factorialSourceCode)
+        with open(entryPath, "wb") as entryFile:
+            entryFile.write(ParseCache.MAGIC + b"\x01 not a tree")
+
+        tree = self.parseCache.parse(JavaParse(), self.factorialSourceCode)
+        self.assertIsNotNone(tree)
+        self.assertEqual((self.parseCache.hits, self.parseCache.misses), (0, 1))
+
+        self.parseCache.parse(JavaParse(), self.factorialSourceCode)
+        self.assertEqual((self.parseCache.hits, self.parseCache.misses), (1, 1))
+
+    def test_evictLeastRecentlyUsed(self):
+        entrySize = len(self.parseCache.encode(JavaParse(), JavaParse().parse(self.sourceCode(0))))
+        self.parseCache.maxSize = 4 * entrySize
+        entryPaths = list()
+        for index in range(4):
+            self.parseCache.parse(JavaParse(), self.sourceCode(index))
+            entryPaths.append(self.parseCache.entryPath(self.sourceCode(index)))
+            os.utime(entryPaths[-1], (index, index))
+        self.assertEqual(len(self.entries()), 4)
+
+        # a hit makes the first entry the most recently used one.
+        self.parseCache.parse(JavaParse(), self.sourceCode(0))
+        self.parseCache.parse(JavaParse(), self.sourceCode(4))
+
+        self.assertLessEqual(self.parseCache.size, self.parseCache.maxSize * ParseCache.LOW_WATER_MARK)
+        self.assertTrue(os.path.exists(entryPaths[0]))
+        self.assertFalse(os.path.exists(entryPaths[1]))
+        self.assertFalse(os.path.exists(entryPaths[2]))
+        self.assertTrue(os.path.exists(entryPaths[3]))
+        self.assertTrue(os.path.exists(self.parseCache.entryPath(self.sourceCode(4))))
+
+    def test_checkSizeCountsOtherEntries(self):
+        for index in range(3):
+            self.parseCache.parse(JavaParse(), self.sourceCode(index))
+        otherParseCache = ParseCache(self.cachePath, 1 << 30, "0.10.9")
+        otherParseCache.parse(JavaParse(), self.sourceCode(3))
+        size = otherParseCache.size
+
+        self.parseCache.maxSize = size // 2
+        self.parseCache.checkSize()
+
+        self.assertLessEqual(self.parseCache.size, size // 2 * ParseCache.LOW_WATER_MARK)
+        self.assertEqual(self.parseCache.size, sum(
+            os.path.getsize(os.path.join(self.cachePath, name)) for name in self.entries()))
+
+
+if __name__ == '__main__':
+    unittest.main()
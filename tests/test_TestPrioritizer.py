@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+from littledarwin.Database import Database
+from littledarwin.JavaMutate import ArithmeticOperatorReplacementBinary, RelationalOperatorReplacement
+# imported as a module, so that pytest does not take its class for tests.
+from littledarwin import TestPrioritizer as testPrioritizer
+
+sourceCode = """public class A {
+    int f(int x) {
+        int y = x + 1;
+        return y * 2;
+    }
+
+    int g(int x) {
+        return x - 1;
+    }
+}
+"""
+
+failingReport = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="a.ATest" tests="3" failures="1" errors="1">
+  <properties><property name="java.version" value="11"/></properties>
+  <testcase name="testLine" classname="a.ATest" time="0.01">
+    <failure message="expected 4">expected 4 but was 5</failure>
+  </testcase>
+  <testcase name="testMethod" classname="a.ATest" time="0.02"/>
+  <testcase name="testOperator" classname="a.ATest" time="0.03">
+    <error type="java.lang.NullPointerException">NullPointerException</error>
+  </testcase>
+</testsuite>
+"""
+
+passingReport = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="a.BTest" tests="1" failures="0" errors="0">
+  <testcase name="testOther" classname="a.BTest" time="0.01"/>
+</testsuite>
+"""
+
+
+class TestTestPrioritizer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.tempDir.name, "A.java")
+        with open(self.fileName, "w") as sourceFile:
+            sourceFile.write(sourceCode)
+        self.database = Database(os.path.join(self.tempDir.name, "mutation.db"))
+        self.database.create_tables()
+        self.fileID = self.database.insert_file(self.fileName)
+        self.aorb = self.database.fetch_operator_id(ArithmeticOperatorReplacementBinary.__name__)
+        self.ror = self.database.fetch_operator_id(RelationalOperatorReplacement.__name__)
+        self.testIDs = dict()
+
+        # the killed mutants of an earlier run: line 3 and line 4 are in f, line 8 is in g.
+        self.insertMutant(1, 3, self.aorb, ["a.ATest#testLine"])
+        self.insertMutant(2, 4, self.ror, ["a.ATest#testMethod"])
+        self.insertMutant(3, 8, self.aorb, ["a.ATest#testOperator"])
+        self.insertMutant(4, 8, self.ror, ["a.BTest#testOther"])
+        self.insertMutant(5, 3, self.aorb, [])
+
+    def tearDown(self) -> None:
+        self.database.close_connection()
+        self.tempDir.cleanup()
+
+    def insertMutant(self, mutantID, lineNo, operatorID, killingTests):
+        self.database.insert_mutation(mutantID, self.fileID, 7, 10, 11, lineNo, "-", operatorID)
+        self.database.insert_mutant(mutantID, mutantID)
+        for testName in killingTests:
+            testID = self.testIDs.setdefault(testName, len(self.testIDs) + 1)
+            self.database.insert_data("test", "id,qualified_name", [testID, testName])
+            self.database.insert_data(
+                "mutant_test", "mutant_id, test_id, result, time, message",
+                [mutantID, testID, Database.RES_ID_KILLED_BY_FAILURE_MUTANT, "0.1", "failed"],
+            )
+
+    def test_lineMethodOperatorOrder(self):
+        prioritizer = testPrioritizer.TestPrioritizer(self.database)
+        coveringTests = [
+            ("a.CTest#testNone",), ("a.BTest#testOther",), ("a.ATest#testOperator",), ("a.ATest#testMethod",),
+            ("a.ATest#testLine",),
+        ]
+
+        self.assertEqual(prioritizer.prioritize(self.fileName, 5, "3", coveringTests), [
+            ("a.ATest#testLine",), ("a.ATest#testMethod",), ("a.ATest#testOperator",), ("a.BTest#testOther",),
+            ("a.CTest#testNone",),
+        ])
+
+    def test_equalScoresKeepTheirOrder(self):
+        prioritizer = testPrioritizer.TestPrioritizer(self.database)
+        coveringTests = [("a.CTest#testB",), "", ("a.CTest#testA",), ("a.ATest#testMethod",), ("a.CTest#testC",)]
+
+        self.assertEqual(prioritizer.prioritize(self.fileName, 5, "3", coveringTests), [
+            ("a.ATest#testMethod",), ("a.CTest#testB",), "", ("a.CTest#testA",), ("a.CTest#testC",),
+        ])
+        self.assertEqual(prioritizer.prioritize(self.fileName, 5, "3", [("a.CTest#testA",)]), [("a.CTest#testA",)])
+
+    def test_recordKill(self):
+        prioritizer = testPrioritizer.TestPrioritizer(self.database)
+        # the kills of the current run count as the kills of the earlier runs.
+        prioritizer.recordKill(self.fileName, 5, "3", ["a.CTest.testA"])
+        prioritizer.recordKill(self.fileName, 2, "4", ["a.CTest.testB"])
+        prioritizer.recordKill(self.fileName, 2, "4", ["a.CTest.testB"])
+
+        self.assertEqual(
+            prioritizer.prioritize(self.fileName, 5, "3", [
+                ("a.ATest#testMethod",), ("a.CTest#testB",), ("a.CTest#testA",),
+            ]),
+            [("a.CTest#testA",), ("a.CTest#testB",), ("a.ATest#testMethod",)],
+        )
+
+    def test_findKillingTests(self):
+        reportPath = os.path.join(self.tempDir.name, "5.java-test_reports")
+        os.makedirs(os.path.join(reportPath, "a"))
+        with open(os.path.join(reportPath, "a", "TEST-a.ATest.xml"), "w") as reportFile:
+            reportFile.write(failingReport)
+        with open(os.path.join(reportPath, "TEST-a.BTest.xml"), "w") as reportFile:
+            reportFile.write(passingReport)
+
+        self.assertEqual(
+            sorted(testPrioritizer.TestPrioritizer.findKillingTests(reportPath)),
+            ["a.ATest.testLine", "a.ATest.testOperator"],
+        )
+        self.assertEqual(testPrioritizer.TestPrioritizer.findKillingTests(os.path.join(self.tempDir.name, "none")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import glob
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from littledarwin.Database import Database
+from littledarwin.SharedFunctions import parse_junit_xml
+# imported as a module, so that pytest does not take its class for tests.
+from littledarwin import TestReportReader as testReportReader
+
+failingReport = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="a.ATest" tests="3" failures="1" errors="1">
+  <properties>
+    <property name="java.version" value="11"/>
+  </properties>
+  <testcase name="testLine" classname="a.ATest" time="0.011">
+    <failure message="expected 4" type="java.lang.AssertionError">expected 4 but was 5</failure>
+    <system-out>computing</system-out>
+  </testcase>
+  <testcase name="testError" classname="a.ATest" time="0.002">
+    <error type="java.lang.NullPointerException">NullPointerException</error>
+  </testcase>
+  <testcase name="testUnknown" classname="a.ATest" time="0.003"/>
+</testsuite>
+"""
+
+passingReport = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="a.BTest" tests="2" failures="0" errors="0">
+  <testcase name="testOther" classname="a.BTest" time="0.004"/>
+  <testcase name="testNested" classname="a.BTest.Inner" time="0.005"/>
+</testsuite>
+"""
+
+# only the test cases right under the root element are read.
+nestedReport = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuites>
+  <testsuite name="a.CTest" tests="1">
+    <testcase name="testDeep" classname="a.CTest" time="0.006"/>
+  </testsuite>
+</testsuites>
+"""
+
+
+def elementTreeParseJunitXml(xml_file):
+    # parse_junit_xml as it was before the reports were streamed.
+    try:
+        root = ET.parse(xml_file).getroot()
+        results = []
+        for testcase in root.findall("testcase"):
+            failures = testcase.findall("failure")
+            errors = testcase.findall("error")
+            results.append((
+                testcase.get("classname") + "." + testcase.get("name"),
+                testcase.get("time"),
+                failures[0].text if len(failures) > 0 else "",
+                errors[0].text if len(errors) > 0 else "",
+            ))
+    except Exception as e:
+        return []
+    return results
+
+
+def elementTreeReadReports(database, mutantReports):
+    # the mutant_test rows as they were written for each mutant before the reports were read in chunks.
+    testIDs = {
+        qualifiedName.replace("$", ".").replace("#", "."): testID
+        for testID, qualifiedName in database.fetch_data("test")
+    }
+    for mutantID, directory in mutantReports:
+        if not os.path.exists(directory):
+            database.insert_data("mutant_test", "mutant_id, test_id, result, time, message", [
+                mutantID, Database.NO_INFO, Database.RES_ID_BUILD_FAILURE, "0",
+                "no results found. Most probably compilation error.",
+            ])
+            continue
+        values = []
+        for xmlFile in glob.glob(str(os.path.join(directory, "**", "*.xml")), recursive=True):
+            for name, time, failureMessage, errorMessage in elementTreeParseJunitXml(xmlFile):
+                result, message = Database.RES_ID_SURVIVED_MUTANT, ""
+                if failureMessage != "":
+                    result, message = Database.RES_ID_KILLED_BY_FAILURE_MUTANT, failureMessage
+                elif errorMessage != "":
+                    result, message = Database.RES_ID_KILLED_BY_ERROR_MUTANT, errorMessage
+                values.append((mutantID, testIDs.get(name, str(Database.NO_TEST)), result, time, message))
+        database.insert_many("mutant_test", "mutant_id, test_id, result, time, message", values)
+
+
+class TestTestReportReader(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.database = self.createDatabase("mutation.db")
+        self.elementTreeDatabase = self.createDatabase("elementtree.db")
+
+        self.mutantReports = [
+            (1, self.writeReports(1, {"TEST-a.ATest.xml": failingReport, "a/TEST-a.BTest.xml": passingReport})),
+            # the build of the mutant failed.
+            (2, os.path.join(self.tempDir.name, "2.java-test_reports")),
+            (3, self.writeReports(3, {"TEST-a.BTest.xml": passingReport, "TEST-a.CTest.xml": nestedReport})),
+            (4, self.writeReports(4, {"TEST-a.ATest.xml": failingReport[:200], "TEST-a.BTest.xml": passingReport})),
+            # the tests did not write any report.
+            (5, self.writeReports(5, {})),
+        ]
+
+    def tearDown(self) -> None:
+        self.database.close_connection()
+        self.elementTreeDatabase.close_connection()
+        self.tempDir.cleanup()
+
+    def createDatabase(self, fileName):
+        database = Database(os.path.join(self.tempDir.name, fileName))
+        database.create_tables()
+        for testID, testName in enumerate(
+                ["a.ATest#testLine", "a.ATest#testError", "a.BTest#testOther", "a.BTest$Inner#testNested"], 1):
+            database.insert_data("test", "id,qualified_name", [testID, testName])
+        return database
+
+    def elementTreeRows(self):
+        elementTreeReadReports(self.elementTreeDatabase, self.mutantReports)
+        return self.elementTreeDatabase.fetch_data("mutant_test")
+
+    def writeReports(self, mutantID, reports):
+        directory = os.path.join(self.tempDir.name, str(mutantID) + ".java-test_reports")
+        os.makedirs(directory)
+        for fileName, report in reports.items():
+            os.makedirs(os.path.dirname(os.path.join(directory, fileName)), exist_ok=True)
+            with open(os.path.join(directory, fileName), "w") as reportFile:
+                reportFile.write(report)
+        return directory
+
+    def readRows(self, reader):
+        reader.readReports(self.database, self.mutantReports)
+        return self.database.fetch_data("mutant_test")
+
+    def test_parseJunitXml(self):
+        for report in (failingReport, passingReport, nestedReport, failingReport[:200], "not a report"):
+            xmlFile = os.path.join(self.tempDir.name, "report.xml")
+            with open(xmlFile, "w") as reportFile:
+                reportFile.write(report)
+
+            self.assertEqual(parse_junit_xml(xmlFile), elementTreeParseJunitXml(xmlFile))
+
+        self.assertEqual(parse_junit_xml(os.path.join(self.tempDir.name, "missing.xml")), [])
+
+    def test_testNamesAreNormalized(self):
+        reader = testReportReader.TestReportReader(self.database)
+
+        self.assertEqual(reader.testIDs["a.ATest.testLine"], 1)
+        self.assertEqual(reader.testIDs["a.BTest.Inner.testNested"], 4)
+        self.assertEqual(
+            [row[:3] for row in reader.rows(7, parse_junit_xml(
+                os.path.join(self.mutantReports[0][1], "TEST-a.ATest.xml")))],
+            [
+                (7, 1, Database.RES_ID_KILLED_BY_FAILURE_MUTANT),
+                (7, 2, Database.RES_ID_KILLED_BY_ERROR_MUTANT),
+                (7, str(Database.NO_TEST), Database.RES_ID_SURVIVED_MUTANT),
+            ],
+        )
+
+    def test_rowsMatchElementTreeRows(self):
+        expectedRows = self.elementTreeRows()
+
+        rows = self.readRows(testReportReader.TestReportReader(self.database))
+
+        self.assertEqual(rows, expectedRows)
+        self.assertIn((2, Database.NO_INFO, Database.RES_ID_BUILD_FAILURE, "0",
+                       "no results found. Most probably compilation error."), rows)
+        self.assertNotIn(5, [row[0] for row in rows])
+
+    def test_chunksAndProcessPool(self):
+        expectedRows = self.elementTreeRows()
+        reader = testReportReader.TestReportReader(self.database, numberOfJobs=2)
+        reader.CHUNK_SIZE = 2
+        reader.POOL_THRESHOLD = 1
+
+        self.assertEqual(self.readRows(reader), expectedRows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from littledarwin.IncrementalBuild import IncrementalBuild
+# imported as a module, so that pytest does not take its classes for tests.
+from littledarwin import TestRunnerDaemon as testRunnerDaemon
+
+# answers the requests the way LittleDarwinTestRunner does: the classes named "Missing..." can't be loaded, and the
+# classes named "Failing..." fail.
+fakeRunnerScript = '''import sys
+print("##LITTLEDARWIN## READY", flush=True)
+for line in sys.stdin:
+    request = line.rstrip("\\n").split("\\t")
+    if request[0] == "QUIT":
+        break
+    testClasses = request[4:]
+    if any(testClass.startswith("Missing") for testClass in testClasses):
+        print("java.lang.ClassNotFoundException: " + testClasses[-1])
+        print("##LITTLEDARWIN## ERROR", flush=True)
+        continue
+    failures = len([testClass for testClass in testClasses if testClass.startswith("Failing")])
+    print("Tests run: " + str(len(testClasses)) + ", Failures: " + str(failures))
+    print("##LITTLEDARWIN## " + str(len(testClasses)) + " " + str(failures), flush=True)
+'''
+
+
+class FakeTestRunnerDaemon(testRunnerDaemon.TestRunnerDaemon):
+
+    def runner_command(self):
+        return [sys.executable, os.path.join(self.runner_path, "fakerunner.py")]
+
+
+class TestTestRunnerDaemon(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tempDir.name, "fakerunner.py"), "w") as fakeRunnerFile:
+            fakeRunnerFile.write(fakeRunnerScript)
+        incrementalBuild = IncrementalBuild(self.tempDir.name, self.tempDir.name)
+        self.testRunner = FakeTestRunnerDaemon(incrementalBuild, self.tempDir.name, self.tempDir.name)
+
+    def tearDown(self) -> None:
+        self.testRunner.stop()
+        self.tempDir.cleanup()
+
+    def test_passingAndFailingTests(self):
+        isKilled, returncode, output, timeDelta = self.testRunner.run(self.tempDir.name, ["a.FooTest"], 30)
+        self.assertEqual((isKilled, returncode), (False, 0))
+        self.assertIn("Tests run: 1, Failures: 0", output)
+
+        isKilled, returncode, output, timeDelta = self.testRunner.run(
+            self.tempDir.name, ["a.FooTest", "FailingTest"], 30)
+        self.assertEqual((isKilled, returncode), (False, 1))
+
+    def test_unloadableTestClassIsRunnerError(self):
+        with self.assertRaises(testRunnerDaemon.TestRunnerError) as context:
+            self.testRunner.run(self.tempDir.name, ["a.FooTest", "MissingTest"], 30)
+        self.assertIn("ClassNotFoundException", str(context.exception))
+
+        # the runner is still in step with its requests.
+        isKilled, returncode, output, timeDelta = self.testRunner.run(self.tempDir.name, ["a.FooTest"], 30)
+        self.assertEqual((isKilled, returncode), (False, 0))
+
+    def test_runnerThatDoesNotStart(self):
+        self.testRunner.runner_command = lambda: [sys.executable, "-c", "pass"]
+
+        self.assertRaises(testRunnerDaemon.TestRunnerError, self.testRunner.run, self.tempDir.name, ["a.FooTest"], 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
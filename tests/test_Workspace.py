@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from littledarwin.Workspace import Workspace
+
+
+class TestWorkspace(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.projectPath = os.path.join(self.tempDir.name, "project")
+        os.makedirs(os.path.join(self.projectPath, "src", "main"))
+        os.makedirs(os.path.join(self.projectPath, "LittleDarwinResults"))
+        with open(os.path.join(self.projectPath, "pom.xml"), "w") as pomFile:
+            pomFile.write("<project/>")
+        with open(os.path.join(self.projectPath, "src", "main", "A.java"), "w") as sourceFile:
+            sourceFile.write("class A {}")
+        self.mainWorkspace = Workspace(self.projectPath)
+
+    def tearDown(self) -> None:
+        self.tempDir.cleanup()
+
+    def test_mainWorkspaceKeepsPaths(self):
+        pomPath = os.path.join(self.projectPath, "pom.xml")
+        command = ["mvn", "-f", pomPath, "test"]
+
+        self.assertFalse(self.mainWorkspace.isCopy())
+        self.assertEqual(self.mainWorkspace.mapPath(pomPath), pomPath)
+        self.assertEqual(self.mainWorkspace.mapCommand(command), command)
+
+    def test_mapPath(self):
+        workspace = self.mainWorkspace.clone(os.path.join(self.tempDir.name, "worker-0"), "worker-0")
+
+        self.assertTrue(workspace.isCopy())
+        self.assertEqual(
+            workspace.mapPath(os.path.join(self.projectPath, "src", "main", "A.java")),
+            os.path.join(self.tempDir.name, "worker-0", "src", "main", "A.java"),
+        )
+        self.assertEqual(
+            os.path.normpath(workspace.mapPath(self.projectPath)), os.path.join(self.tempDir.name, "worker-0")
+        )
+        self.assertEqual(os.path.normpath(workspace.testDir), os.path.join(self.tempDir.name, "worker-0"))
+
+    def test_mapCommand(self):
+        workspace = self.mainWorkspace.clone(os.path.join(self.tempDir.name, "worker-0"), "worker-0")
+        outsidePath = os.path.join(self.tempDir.name, "settings.xml")
+        # a directory next to the project that starts with the same name is not inside it.
+        siblingPath = self.projectPath + "-other"
+
+        command = workspace.mapCommand(
+            ["mvn", "-f", os.path.join(self.projectPath, "pom.xml"), "-s", outsidePath, siblingPath, "test"]
+        )
+
+        self.assertEqual(
+            command,
+            ["mvn", "-f", os.path.join(self.tempDir.name, "worker-0", "pom.xml"), "-s", outsidePath, siblingPath,
+             "test"],
+        )
+
+    def test_cloneSkipsResults(self):
+        workspaces = Workspace.createWorkerWorkspaces(
+            self.mainWorkspace, os.path.join(self.tempDir.name, "workspaces"), 2
+        )
+
+        self.assertEqual([workspace.name for workspace in workspaces], ["worker-0", "worker-1"])
+        for workspace in workspaces:
+            self.assertTrue(os.path.isfile(os.path.join(workspace.buildDir, "src", "main", "A.java")))
+            self.assertFalse(os.path.exists(os.path.join(workspace.buildDir, "LittleDarwinResults")))
+            self.assertEqual(workspace.originalBuildDir, self.projectPath)
+
+        Workspace.removeWorkerWorkspaces(os.path.join(self.tempDir.name, "workspaces"))
+        self.assertFalse(os.path.exists(os.path.join(self.tempDir.name, "workspaces")))
+
+
+if __name__ == '__main__':
+    unittest.main()